@@ -1,6 +1,10 @@
 """Handle admin commands sent via DM."""
 
 import discord
+from dispatcher import OutboundDispatcher, dispatch
+from metrics import metrics
+from reminder_commands import handle_reminder_command
+from upcoming import handle_upcoming_command
 
 
 async def handle_server_list_command(message, bot):
@@ -13,7 +17,7 @@ async def handle_server_list_command(message, bot):
     """
     try:
         if not bot.guilds:
-            await message.channel.send("I'm not in any servers right now.")
+            await dispatch(bot, message.channel, "I'm not in any servers right now.")
             return
         
         server_list = []
@@ -42,17 +46,32 @@ async def handle_server_list_command(message, bot):
             
             for i, chunk in enumerate(chunks):
                 if i == 0:
-                    await message.channel.send(chunk)
+                    await dispatch(bot, message.channel, chunk)
                 else:
-                    await message.channel.send(f"**Continued...**\n\n{chunk}")
+                    await dispatch(bot, message.channel, f"**Continued...**\n\n{chunk}")
         else:
-            await message.channel.send(response)
+            await dispatch(bot, message.channel, response)
             
     except Exception as e:
-        await message.channel.send(f"Sorry, there was an error getting the server list: {e}")
+        await dispatch(bot, message.channel, f"Sorry, there was an error getting the server list: {e}")
         print(f"Error in server list command: {e}")
 
 
+async def handle_stats_command(message, bot):
+    """
+    Handle the !stats command via DM.
+    
+    Args:
+        message: The Discord message object
+        bot: The Discord bot instance
+    """
+    lines = [metrics.format()]
+    dispatcher = getattr(bot, 'dispatcher', None)
+    if isinstance(dispatcher, OutboundDispatcher):
+        lines.append(dispatcher.format_stats())
+    await dispatch(bot, message.channel, "```\n" + "\n".join(lines)[:1900] + "\n```")
+
+
 async def handle_dm_commands(message, bot, admin_id):
     """
     Handle all DM commands.
@@ -62,12 +81,20 @@ async def handle_dm_commands(message, bot, admin_id):
         bot: The Discord bot instance
         admin_id: The ID of the admin user
     """
+    # Reminder and schedule commands are open to everyone
+    if await handle_reminder_command(message, bot):
+        return
+    if await handle_upcoming_command(message, bot):
+        return
+    
     if message.author.id != admin_id:
-        await message.channel.send("Hi! I'm here to defeat the Sun!")
+        await dispatch(bot, message.channel, "Hi! I'm here to defeat the Sun!")
         return
     
     if message.content.lower() in ['!servers', '!serverlist', '!guilds']:
         await handle_server_list_command(message, bot)
+    elif message.content.lower() == '!stats':
+        await handle_stats_command(message, bot)
     else:
         # For other DMs, just acknowledge
-        await message.channel.send("Hi! I'm here to defeat the Sun!")
+        await dispatch(bot, message.channel, "Hi! I'm here to defeat the Sun!")
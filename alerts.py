@@ -0,0 +1,106 @@
+"""Typed alert events classified from RM2 global shouts."""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from constants import (
+    EVENT_LEAD_MINUTES,
+    PRIORITY_URGENT,
+    PRIORITY_SOON,
+    PRIORITY_LATER,
+    PRIORITY_BULK,
+)
+
+
+def priority_for_lead(lead_minutes: Optional[float]) -> int:
+    """
+    Map the minutes until an event to a delivery priority class.
+
+    Args:
+        lead_minutes: Minutes between the alert and the event, or None if it has no lead time
+
+    Returns:
+        int: One of the PRIORITY_* classes from constants
+    """
+    if lead_minutes is None:
+        return PRIORITY_BULK
+    if lead_minutes <= 5:
+        return PRIORITY_URGENT
+    if lead_minutes <= 20:
+        return PRIORITY_SOON
+    return PRIORITY_LATER
+
+
+@dataclass(frozen=True)
+class AlertEvent:
+    """
+    An RM2 shout parsed once into everything needed to alert any guild.
+
+    The body is rendered up front, so delivering to a guild only needs that
+    guild's role mention.
+    """
+    event_type: str
+    role_name: str
+    body: str
+    map: Optional[str] = None
+    player: Optional[str] = None
+    next_event_time: Optional[datetime] = None
+
+    @property
+    def priority(self) -> int:
+        """Delivery priority class, based on the event type's lead time."""
+        if self.event_type not in EVENT_LEAD_MINUTES:
+            return PRIORITY_LATER
+        return priority_for_lead(EVENT_LEAD_MINUTES[self.event_type])
+
+    def render(self, role_mention: str) -> str:
+        """Render the alert message for a guild given its role mention."""
+        return f"{role_mention} {self.body}"
+
+
+# Discord's message limit, leaving room for the role mention
+MAX_DIGEST_BODY_LENGTH = 1900
+
+
+def _join_entries(entries, limit):
+    """Join digest entries with commas, ending in "and N more" if they don't fit in limit."""
+    text = ""
+    for i, entry in enumerate(entries):
+        candidate = entry if not text else f"{text}, {entry}"
+        if len(candidate) > limit:
+            return f"{text}, and {len(entries) - i} more"
+        text = candidate
+    return text
+
+
+def merge_alert_events(events):
+    """
+    Merge a burst of alerts for the same role into one digest AlertEvent.
+
+    Args:
+        events: Non-empty list of AlertEvents, oldest first
+
+    Returns:
+        AlertEvent: The single event if there is only one, otherwise a digest
+    """
+    first = events[0]
+    if len(events) == 1:
+        return first
+
+    limit = MAX_DIGEST_BODY_LENGTH - 100
+    event_types = {event.event_type for event in events}
+    if event_types == {"outlaw"}:
+        entries = _join_entries([f"{event.player} at {event.map}" for event in events], limit)
+        body = f"{len(events)} players became outlaws: {entries}!"
+    elif event_types == {"open_pvp_battle"}:
+        entries = _join_entries([event.map for event in events], limit)
+        body = f"{len(events)} Open PvP Battles start in 30 minutes in: {entries}!"
+    else:
+        body = _join_entries([event.body for event in events], limit)
+
+    return AlertEvent(
+        event_type=first.event_type,
+        role_name=first.role_name,
+        body=body,
+        next_event_time=first.next_event_time,
+    )
@@ -2,10 +2,24 @@
 from constants import SEASONAL_EVENT_ROLE_NAME
 
 
-# Message templates for 15-minute advance announcements
-# Use {role} for role mention and {timestamp} for Discord timestamp
+# Names shown for event types, e.g. by !upcoming
+EVENT_NAMES = {
+    "big_santa": "Big Santa",
+}
+
+# Advance announcement templates per event type, keyed by lead time in minutes
+# Use {role} for role mention, {timestamp} for Discord timestamp and {minutes}
+# for the minutes left when it's sent
 ANNOUNCEMENT_TEMPLATES = {
-    "big_santa": "{role} Big Santa will spawn in 15 minutes!",
-    # Add more event types here as needed,
+    "big_santa": {
+        15: "{role} Big Santa will spawn in {minutes} minutes!",
+    },
+    # Add more event types or lead times here as needed,
 }
 
+# DM templates for per-user reminders (see reminders.py); event types listed
+# here are the ones users can subscribe to with !remind
+# Use {minutes} for the time left and {timestamp} for Discord timestamp
+DM_REMINDER_TEMPLATES = {
+    "big_santa": "Reminder: Big Santa will spawn in {minutes} minutes, at {timestamp}!",
+}
@@ -0,0 +1,156 @@
+"""
+Benchmark AnnouncementScheduler at 1k, 10k and 100k pending announcements.
+
+Measures schedule, cancel, tick, save and load times plus memory per entry,
+using the same mocking as test_scheduler.py (a MagicMock bot with no guilds
+and the background task patched out). Run with:
+
+    python benchmark_scheduler.py [sizes...]
+"""
+import asyncio
+import contextlib
+import gc
+import io
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+from unittest.mock import MagicMock, patch
+
+from scheduler import AnnouncementScheduler, ScheduledAnnouncement
+
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+
+
+@dataclass
+class PlainAnnouncement:
+    """ScheduledAnnouncement's fields without __slots__, for comparing memory per entry."""
+    event_type: str
+    announcement_time: datetime
+    event_time: datetime
+    role_name: str
+    message_template: str
+    guild_id: Optional[int] = None
+    recurrence: Optional[object] = None
+    group_id: Optional[str] = None
+    kind: str = "channel"
+    id: str = ""
+
+
+def make_bot():
+    """Create a mock Discord bot"""
+    bot = MagicMock()
+    bot.guilds = []
+    return bot
+
+
+def make_scheduler(storage_file):
+    """Create a scheduler with its background task disabled"""
+    with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', storage_file):
+        with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+            mock_task.start = MagicMock()
+            return AnnouncementScheduler(make_bot())
+
+
+def bytes_per_record(cls, size, now):
+    """Average memory allocated per record when building size of them."""
+    gc.collect()
+    tracemalloc.start()
+    records = [
+        cls(
+            event_type=f"event_{i}",
+            announcement_time=now + timedelta(seconds=i),
+            event_time=now + timedelta(seconds=i, minutes=15),
+            role_name="test-role",
+            message_template="{role} Test {timestamp}",
+            id=f"{i:032x}"
+        )
+        for i in range(size)
+    ]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del records
+    return allocated / size
+
+
+def timed(results, name, size, func):
+    start = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - start
+    results.append((name, size, elapsed))
+    return value
+
+
+async def run_size(size, results):
+    """Benchmark one schedule size inside a running event loop, as in production."""
+    tick = AnnouncementScheduler.check_announcements.coro
+    now = datetime.now()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        storage_file = f"{tmp}/announcements.json"
+        scheduler = make_scheduler(storage_file)
+
+        def schedule_all():
+            for i in range(size):
+                scheduler.schedule(
+                    event_type=f"event_{i}",
+                    announcement_time=now + timedelta(hours=1, seconds=i),
+                    event_time=now + timedelta(hours=1, seconds=i, minutes=15),
+                    role_name="test-role",
+                    message_template="{role} Test {timestamp}",
+                    replace=False
+                )
+
+        timed(results, "schedule", size, schedule_all)
+        await scheduler.journal.flush()
+
+        ids = [a.id for a in list(scheduler.announcements.values())[::10]]
+        timed(results, "cancel 10%", size, lambda: [scheduler.cancel_id(i) for i in ids])
+
+        # make a tenth of what's left due, then time one tick that sends them
+        due = list(scheduler.announcements.values())[::10]
+        for announcement in due:
+            scheduler.cancel_id(announcement.id)
+            announcement.announcement_time = now - timedelta(seconds=1)
+            scheduler.announcements.append(announcement)
+        with patch('scheduler.get_next_event_time', return_value="<t:0:F>"), \
+                contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            await tick(scheduler)
+            results.append(("tick (10% due)", size, time.perf_counter() - start))
+
+        timed(results, "idle tick lookup", size, scheduler.announcements.next_time)
+
+        start = time.perf_counter()
+        scheduler.save_to_file()
+        await scheduler.journal.flush()
+        results.append(("save snapshot", size, time.perf_counter() - start))
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = timed(results, "load", size, lambda: make_scheduler(storage_file))
+        assert len(loaded.announcements) == len(scheduler.announcements)
+
+
+def main(sizes):
+    results = []
+    now = datetime.now()
+    for size in sizes:
+        asyncio.run(run_size(size, results))
+
+    print(f"{'operation':<20}{'entries':>10}{'total ms':>12}{'us/entry':>12}")
+    for name, size, elapsed in results:
+        print(f"{name:<20}{size:>10}{elapsed * 1000:>12.2f}{elapsed * 1e6 / size:>12.3f}")
+
+    size = max(sizes)
+    print()
+    print(f"memory per record at {size} entries:")
+    print(f"  ScheduledAnnouncement (slots): {bytes_per_record(ScheduledAnnouncement, size, now):.0f} bytes")
+    print(f"  plain dataclass:               {bytes_per_record(PlainAnnouncement, size, now):.0f} bytes")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -1,5 +1,6 @@
 import discord
 from constants import *
+from subscription_panel import setup_menu_content, SETUP_MENU_HEADER
 
 
 # create the setup channel in the guild if it doesn't exist
@@ -107,13 +108,43 @@ async def ensure_all_alert_roles(guild):
 
 EXPECTED_REACTIONS = [emoji for _, _, _, emoji in ROLE_CONFIGS]
 
-async def create_setup_message(setup_channel):
-    setup_message_content = "React to subscribe/unsubscribe to different rm2 alerts:\n" + "\n".join([f"{emoji} - {reason}" for _, reason, _, emoji in ROLE_CONFIGS])
+SETUP_REACTIONS_HEADER = "React to subscribe/unsubscribe to different rm2 alerts"
+
+
+async def create_setup_message(setup_channel, view=None):
+    """
+    Post the setup message, or bring the bot's existing one up to date.
+
+    Args:
+        setup_channel: The rm2-alerts-setup channel
+        view: SubscriptionView to post a select menu instead of reaction roles;
+            an existing reaction message is converted and its reactions cleared
+            (if the bot may manage messages there)
+
+    Returns:
+        The setup message
+    """
+    if view is not None:
+        setup_message_content = setup_menu_content()
+    else:
+        setup_message_content = f"{SETUP_REACTIONS_HEADER}:\n" + "\n".join([f"{emoji} - {reason}" for _, reason, _, emoji in ROLE_CONFIGS])
     async for message in setup_channel.history(limit=50):
-        if message.author == setup_channel.guild.me and "React to subscribe/unsubscribe to different rm2 alerts" in message.content:
-            # Update content if needed
-            if message.content != setup_message_content:
-                message = await message.edit(content=setup_message_content)
+        if message.author == setup_channel.guild.me and (
+                SETUP_REACTIONS_HEADER in message.content or SETUP_MENU_HEADER in message.content):
+            if view is not None:
+                # Menu messages carry no reactions
+                if message.content != setup_message_content or not message.components:
+                    message = await message.edit(content=setup_message_content, view=view)
+                if message.reactions:
+                    try:
+                        await message.clear_reactions()
+                    except discord.Forbidden:
+                        # needs Manage Messages; the old reactions just do nothing now
+                        print(f"Couldn't clear the old reactions in {setup_channel.guild.name}")
+                return message
+            # Update content if needed (this also drops a menu)
+            if message.content != setup_message_content or message.components:
+                message = await message.edit(content=setup_message_content, view=None)
             # Add missing reactions
             current_reactions = [str(reaction.emoji) for reaction in message.reactions]
             for emoji in EXPECTED_REACTIONS:
@@ -126,6 +157,8 @@ async def create_setup_message(setup_channel):
             return message  # Return the found/updated message
 
     # If no setup message found, create a new one
+    if view is not None:
+        return await setup_channel.send(setup_message_content, view=view)
     message = await setup_channel.send(setup_message_content)
     for emoji in EXPECTED_REACTIONS:
         await message.add_reaction(emoji)
@@ -133,8 +166,15 @@ async def create_setup_message(setup_channel):
 
 
 # set up all required channels and roles for a guild
-async def setup_guild_infrastructure(guild):
-    """Set up all required channels and roles for a guild"""
+async def setup_guild_infrastructure(guild, setup_messages=None, view=None):
+    """
+    Set up all required channels and roles for a guild
+    
+    Args:
+        guild: The Discord guild object
+        setup_messages: Optional SetupMessageIndex to register the guild's setup message in
+        view: Optional SubscriptionView; the setup message gets a select menu instead of reactions
+    """
     # Ensure setup channel exists
     setup_channel = await ensure_setup_channel(guild)
     if not setup_channel:
@@ -151,6 +191,8 @@ async def setup_guild_infrastructure(guild):
         return False
     
     # Create setup message
-    await create_setup_message(setup_channel)
+    setup_message = await create_setup_message(setup_channel, view)
+    if setup_messages is not None:
+        setup_messages.add_message(setup_message)
     
     return True
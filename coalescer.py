@@ -0,0 +1,87 @@
+"""Coalescing of high-frequency alert bursts into digest messages."""
+import asyncio
+
+from constants import COALESCE_WINDOW_SECONDS
+from alerts import merge_alert_events
+from metrics import metrics
+
+
+class AlertCoalescer:
+    """
+    Throttles alerts per role with a trailing digest.
+
+    The first alert for a role is delivered right away and opens a window.
+    Alerts arriving while the window is open are buffered, and when it
+    closes they are delivered as one merged message per guild. The window
+    keeps reopening while alerts keep arriving, so a sustained burst costs
+    one message per guild per window instead of one per alert.
+
+    With ``record`` and ``discard``, buffered alerts are made durable as
+    they arrive (the outbox replays them after a crash) and closed once the
+    digest carrying them has been delivered.
+    """
+
+    def __init__(self, deliver, windows: dict = COALESCE_WINDOW_SECONDS, record=None, discard=None):
+        """
+        Initialize the coalescer.
+
+        Args:
+            deliver: Coroutine function that fans an AlertEvent out to every guild
+            windows: Mapping of role name to coalescing window in seconds
+            record: Coroutine function storing a buffered AlertEvent, returning an id (or None)
+            discard: Coroutine function closing the recorded ids of alerts sent in a digest
+        """
+        self._deliver = deliver
+        self._windows = windows
+        self._record = record
+        self._discard = discard
+        # role name -> buffered events and the ids record returned for them
+        self._pending: dict[str, list] = {}
+        self._recorded: dict[str, list] = {}
+        self._open: dict[str, asyncio.Task] = {}
+
+    def pending(self, role_name: str) -> int:
+        """Number of alerts buffered for a role's open window."""
+        return len(self._pending.get(role_name, ()))
+
+    async def submit(self, event):
+        """
+        Deliver an alert now, or buffer it if its role's window is open.
+
+        Args:
+            event: The classified AlertEvent
+        """
+        window = self._windows.get(event.role_name, 0)
+        if window <= 0:
+            await self._deliver(event)
+            return
+
+        if event.role_name in self._open:
+            self._pending.setdefault(event.role_name, []).append(event)
+            metrics.increment("alerts_coalesced")
+            if self._record is not None:
+                alert_id = await self._record(event)
+                if alert_id is not None:
+                    self._recorded.setdefault(event.role_name, []).append(alert_id)
+            return
+
+        self._open[event.role_name] = asyncio.create_task(self._run_window(event.role_name, window))
+        await self._deliver(event)
+
+    async def _run_window(self, role_name: str, window: float):
+        """Flush the role's buffered alerts every window until one passes with none."""
+        try:
+            while True:
+                await asyncio.sleep(window)
+                events = self._pending.pop(role_name, None)
+                alert_ids = self._recorded.pop(role_name, [])
+                if not events:
+                    break
+                try:
+                    await self._deliver(merge_alert_events(events))
+                    if alert_ids and self._discard is not None:
+                        await self._discard(alert_ids)
+                except Exception as e:
+                    print(f"Error delivering coalesced {role_name} alerts: {e}")
+        finally:
+            self._open.pop(role_name, None)
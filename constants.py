@@ -44,6 +44,129 @@ ROLE_CONFIGS = [
 ]
 
 
+# alert delivery
+# maximum number of guilds an alert is delivered to at the same time
+FANOUT_CONCURRENCY = 25
+
+# outbound rate limits, kept just inside Discord's documented limits:
+# 50 requests per second globally, 5 messages per 5 seconds per channel
+GLOBAL_RATE_LIMIT = 50
+GLOBAL_RATE_PERIOD = 1.0
+ROUTE_RATE_LIMIT = 5
+ROUTE_RATE_PERIOD = 5.0
+
+# delivery priority classes, lowest value drains first
+PRIORITY_URGENT = 0  # event starts within 5 minutes
+PRIORITY_SOON = 1    # event starts within 20 minutes
+PRIORITY_LATER = 2   # event starts in 30 minutes or more
+PRIORITY_BULK = 3    # no lead time (e.g. outlaw spam), shed first under overload
+
+# minutes between an alert and the event it announces (None = informational only)
+EVENT_LEAD_MINUTES = {
+    "food_shop_war": 15,
+    "hq_war": 5,
+    "pvp_tournament": 20,
+    "uni": 5,
+    "battle_dimension": 30,
+    "battle_match": 30,
+    "battle_simulation": 5,
+    "freedom_village": 30,
+    "monster_invasion": 30,
+    "open_pvp_battle": 30,
+    "outlaw": None,
+    "friendly_hallowvern": 0,
+    "thanksgiving_feast": 0,
+    "big_santa": 0,
+    "giant_kasham": 0,
+}
+
+# load shedding for PRIORITY_BULK sends once this many sends are waiting for budget
+# policy: "reject_new" drops the incoming send, "drop_oldest" drops the oldest
+# queued bulk send instead, "off" never sheds
+SHED_QUEUE_DEPTH = 40
+SHED_POLICY = "reject_new"
+
+# guilds with no alerts channel or no Send Messages permission are skipped,
+# and re-probed after an exponentially growing delay between these bounds
+HEALTH_BACKOFF_BASE_SECONDS = 60
+HEALTH_BACKOFF_MAX_SECONDS = 6 * 60 * 60
+
+# what to do with guilds where nobody has the alert's role (opt-in):
+# "off" delivers as usual, "skip" doesn't post there at all, "demote" posts
+# there only after every guild with subscribers has been delivered to
+EMPTY_ROLE_POLICY = "off"
+
+# seconds over which bursts of alerts for a role are merged into one digest
+# message per guild; 0 or missing sends every alert on its own
+COALESCE_WINDOW_SECONDS = {
+    OUTLAW_ROLE_NAME: 30,
+    PVP_BATTLE_ROLE_NAME: 15,
+}
+
+# durable outbox of in-flight alert deliveries, replayed on startup while the
+# alert is still useful: until OUTBOX_EVENT_MARGIN_SECONDS before its event
+# starts, or for OUTBOX_MIN_WINDOW_SECONDS if it has no lead time
+OUTBOX_FILE = "alert_outbox.db"
+OUTBOX_MIN_WINDOW_SECONDS = 5 * 60
+OUTBOX_EVENT_MARGIN_SECONDS = 60
+
+# retries for Discord 5xx errors and timeouts, with exponential backoff and full jitter
+RETRY_ATTEMPTS = 4
+RETRY_BASE_SECONDS = 1.0
+RETRY_MAX_SECONDS = 15.0
+
+# global shouts already handled are remembered this long (by message id and by
+# normalized content) so reconnect replays and repeated lines alert only once
+DEDUP_TTL_SECONDS = 120
+DEDUP_MAX_ENTRIES = 1024
+
+# the announcement scheduler sleeps until the next announcement is due, but
+# never longer than this, so wall clock changes are picked up
+SCHEDULER_IDLE_SECONDS = 60
+
+# scheduled announcement changes are appended to a journal, which is folded
+# into a fresh snapshot once it holds this many records
+JOURNAL_COMPACT_RECORDS = 200
+
+# minutes an announcement may be overdue (e.g. after a restart) and still be
+# sent, as long as its event hasn't started; staler ones are dropped
+DEFAULT_CATCH_UP_GRACE_MINUTES = 10
+CATCH_UP_GRACE_MINUTES = {
+    "big_santa": 14,
+}
+
+# per-user DM reminders before scheduled events (see reminders.py)
+REMINDERS_FILE = "reminder_subscriptions.db"
+REMINDER_MAX_LEAD_MINUTES = 120
+# reminder batches are uncapped and paced by the dispatcher's global limit alone
+DM_WORKERS = 8
+# notices (subscription confirmations) get their own workers, budget and bounded queue
+DM_NOTICE_WORKERS = 2
+DM_RATE_LIMIT = 20
+DM_RATE_PERIOD = 2.0
+DM_QUEUE_MAX = 10_000
+# users whose DMs failed with Forbidden / NotFound aren't tried again for this long
+DM_UNREACHABLE_TTL_SECONDS = 6 * 3600
+
+# events listed by !upcoming (see upcoming.py)
+UPCOMING_MAX_EVENTS = 10
+
+# rotating bot log, written by a background listener (see main.py)
+LOG_FILE = "discord.log"
+LOG_MAX_BYTES = 10 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+
+# post the setup message with a subscription select menu instead of reaction roles
+SETUP_SUBSCRIPTION_MENU = True
+
+# a member's setup reactions within this many seconds are applied as one role edit
+ROLE_UPDATE_DEBOUNCE_SECONDS = 3.0
+
+# event loop lag monitoring (see loop_monitor.py)
+LOOP_LAG_CHECK_SECONDS = 1.0
+LOOP_LAG_WARN_SECONDS = 0.1
+
+
 # rm2 server variables
 RM2_SERVER_ID = 859685499441512478
 RM2_SERVER_CHANNEL_ID_GLOBAL = 939091598216675338
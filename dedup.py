@@ -0,0 +1,76 @@
+"""Idempotency check for RM2 global shouts, so one shout never alerts twice."""
+import hashlib
+import time
+from collections import OrderedDict
+
+from constants import DEDUP_TTL_SECONDS, DEDUP_MAX_ENTRIES
+from metrics import metrics
+
+
+def content_key(content: str) -> str:
+    """Hash a shout's content after normalizing case and whitespace."""
+    normalized = " ".join(content.lower().split())
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class RecentMessages:
+    """
+    Bounded LRU of recently handled shouts with a TTL.
+
+    A shout is a duplicate if its message id, or its normalized content, was
+    seen within the TTL. Gateway resumes redeliver the same message id, and
+    the shout account occasionally repeats a line under a new id.
+    """
+
+    def __init__(self, ttl: float = DEDUP_TTL_SECONDS, max_entries: int = DEDUP_MAX_ENTRIES, clock=time.monotonic):
+        """
+        Initialize the cache.
+
+        Args:
+            ttl: Seconds a handled shout is remembered
+            max_entries: Maximum number of keys kept; the least recently seen are evicted first
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._clock = clock
+        self._seen: OrderedDict = OrderedDict()
+
+    def __len__(self):
+        return len(self._seen)
+
+    def _fresh(self, key, now: float) -> bool:
+        seen_at = self._seen.get(key)
+        if seen_at is None:
+            return False
+        if now - seen_at >= self._ttl:
+            del self._seen[key]
+            return False
+        return True
+
+    def _remember(self, key, now: float):
+        self._seen[key] = now
+        self._seen.move_to_end(key)
+        while len(self._seen) > self._max_entries:
+            self._seen.popitem(last=False)
+
+    def check_and_add(self, message_id: int, content: str) -> bool:
+        """
+        Record a shout, reporting whether it was already handled.
+
+        Args:
+            message_id: The Discord message id
+            content: The message content
+
+        Returns:
+            bool: True if the shout is a duplicate and should be ignored
+        """
+        now = self._clock()
+        id_key = ("id", message_id)
+        hash_key = ("content", content_key(content))
+        if self._fresh(id_key, now) or self._fresh(hash_key, now):
+            metrics.increment("shouts_deduplicated")
+            return True
+        self._remember(id_key, now)
+        self._remember(hash_key, now)
+        return False
@@ -0,0 +1,277 @@
+"""Rate-limit-aware outbound dispatcher that every alert, announcement and DM goes through."""
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from constants import (
+    GLOBAL_RATE_LIMIT,
+    GLOBAL_RATE_PERIOD,
+    ROUTE_RATE_LIMIT,
+    ROUTE_RATE_PERIOD,
+    PRIORITY_LATER,
+    PRIORITY_BULK,
+    SHED_QUEUE_DEPTH,
+    SHED_POLICY,
+)
+from metrics import metrics
+
+
+# idle route buckets are pruned once there are more than this many
+MAX_IDLE_ROUTE_BUCKETS = 10_000
+
+
+class DeliveryShed(Exception):
+    """Raised when a low-priority send is dropped because the queue is overloaded."""
+
+
+class TokenBucket:
+    """Token bucket holding up to ``capacity`` tokens, refilled evenly over ``period`` seconds."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity: int, period: float, now: float):
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def _refill(self, now: float):
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def delay(self, now: float) -> float:
+        """Seconds until a token is available (0 if one is available now)."""
+        self._refill(now)
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self, now: float):
+        """Take one token; call only after delay() returned 0."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+@dataclass(order=True)
+class _Ticket:
+    """A send waiting for rate-limit budget, ordered by priority class then arrival."""
+    priority: int
+    seq: int
+    route: object = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+    enqueued_at: float = field(compare=False)
+
+
+class OutboundDispatcher:
+    """
+    Single gate for outbound messages, enforcing a global budget plus one
+    token bucket per route (channel or DM recipient).
+
+    Sends that can't go out immediately wait in a queue; a pump grants them
+    budget as it refills, so a burst is paced here instead of piling into
+    discord.py's 429 handling. A new send wakes the pump, so one for an idle
+    route isn't held up by another route's refill delay. Higher priority classes always drain first,
+    and once the queue is deeper than shed_depth, PRIORITY_BULK sends are
+    shed according to shed_policy. Queue depth and wait times are recorded
+    in metrics.
+    """
+
+    def __init__(
+        self,
+        global_limit: int = GLOBAL_RATE_LIMIT,
+        global_period: float = GLOBAL_RATE_PERIOD,
+        route_limit: int = ROUTE_RATE_LIMIT,
+        route_period: float = ROUTE_RATE_PERIOD,
+        shed_depth: int = SHED_QUEUE_DEPTH,
+        shed_policy: str = SHED_POLICY,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            global_limit: Requests allowed per global_period across all routes
+            global_period: Length of the global window in seconds
+            route_limit: Requests allowed per route_period for one route
+            route_period: Length of the per-route window in seconds
+            shed_depth: Queue depth at which PRIORITY_BULK sends start being shed
+            shed_policy: "reject_new", "drop_oldest" or "off"
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self._clock = clock
+        self._global = TokenBucket(global_limit, global_period, clock())
+        self._route_limit = route_limit
+        self._route_period = route_period
+        self._shed_depth = shed_depth
+        self._shed_policy = shed_policy
+        self._routes: dict[object, TokenBucket] = {}
+        self._queue: list[_Ticket] = []
+        self._seq = itertools.count()
+        self._pump_task = None
+        # set when a send is queued, to cut the pump's sleep short
+        self._wakeup = asyncio.Event()
+        self.max_queue_depth = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of sends currently waiting for budget."""
+        return len(self._queue)
+
+    async def send(self, destination, content=None, *, route=None, priority=PRIORITY_LATER, **kwargs):
+        """
+        Send a message once rate-limit budget allows it.
+
+        Args:
+            destination: Anything with an async send() (channel, user, member)
+            content: Message content
+            route: Rate-limit route key (defaults to the destination's id)
+            priority: PRIORITY_* class; lower values are sent first
+            **kwargs: Passed through to destination.send
+
+        Returns:
+            The sent discord.Message
+
+        Raises:
+            DeliveryShed: The send was dropped by the overload policy
+        """
+        if route is None:
+            route = getattr(destination, "id", id(destination))
+        await self.acquire(route, priority)
+        return await destination.send(content, **kwargs)
+
+    async def acquire(self, route, priority: int = PRIORITY_LATER):
+        """Wait until one request on the given route may be made."""
+        now = self._clock()
+        if not self._queue and self._global.delay(now) == 0 and self._bucket(route, now).delay(now) == 0:
+            self._take(route, now)
+            metrics.observe("dispatch_wait_seconds", 0.0)
+            return
+
+        if priority >= PRIORITY_BULK and len(self._queue) >= self._shed_depth:
+            self._shed()
+
+        ticket = _Ticket(priority, next(self._seq), route, asyncio.get_running_loop().create_future(), now)
+        heapq.heappush(self._queue, ticket)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        metrics.increment("dispatch_queued")
+        if self._pump_task is None or self._pump_task.done():
+            self._pump_task = asyncio.create_task(self._pump())
+        else:
+            self._wakeup.set()
+        # a cancelled waiter is skipped by the pump
+        await ticket.future
+
+    def _shed(self):
+        """
+        Apply the shed policy for an incoming bulk send on a full queue.
+
+        Raises:
+            DeliveryShed: The incoming send is the one being dropped
+        """
+        if self._shed_policy == "off":
+            return
+        if self._shed_policy == "drop_oldest":
+            oldest = min(
+                (ticket for ticket in self._queue if ticket.priority >= PRIORITY_BULK and not ticket.future.done()),
+                key=lambda ticket: ticket.seq,
+                default=None,
+            )
+            if oldest is not None:
+                self._queue.remove(oldest)
+                heapq.heapify(self._queue)
+                oldest.future.set_exception(DeliveryShed("dropped oldest bulk send"))
+                metrics.increment("dispatch_shed")
+                return
+        metrics.increment("dispatch_shed")
+        raise DeliveryShed("queue overloaded")
+
+    def _bucket(self, route, now: float) -> TokenBucket:
+        bucket = self._routes.get(route)
+        if bucket is None:
+            if len(self._routes) >= MAX_IDLE_ROUTE_BUCKETS:
+                self._prune(now)
+            bucket = self._routes[route] = TokenBucket(self._route_limit, self._route_period, now)
+        return bucket
+
+    def _prune(self, now: float):
+        """Drop route buckets that are full again, which behave like new ones."""
+        self._routes = {route: bucket for route, bucket in self._routes.items() if not bucket.is_full(now)}
+
+    def _take(self, route, now: float):
+        self._global.consume(now)
+        self._routes[route].consume(now)
+        metrics.increment("dispatch_sent")
+
+    def _next_ready(self, now: float):
+        """
+        Pop the first queued ticket whose route has budget.
+
+        Returns:
+            tuple: (ticket or None, seconds until some blocked route refills)
+        """
+        blocked = []
+        ready = None
+        wait = None
+        while self._queue:
+            ticket = heapq.heappop(self._queue)
+            if ticket.future.done():
+                continue
+            delay = self._bucket(ticket.route, now).delay(now)
+            if delay == 0:
+                ready = ticket
+                break
+            blocked.append(ticket)
+            wait = delay if wait is None else min(wait, delay)
+        for ticket in blocked:
+            heapq.heappush(self._queue, ticket)
+        return ready, wait or 0.0
+
+    async def _pump(self):
+        """Grant budget to queued sends in order until the queue is empty."""
+        while self._queue:
+            now = self._clock()
+            wait = self._global.delay(now)
+            if wait == 0:
+                ticket, wait = self._next_ready(now)
+                if ticket is not None:
+                    self._take(ticket.route, now)
+                    metrics.observe("dispatch_wait_seconds", now - ticket.enqueued_at)
+                    ticket.future.set_result(None)
+                    continue
+                if not self._queue:
+                    break
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def format_stats(self) -> str:
+        """Render queue depth alongside the dispatcher metrics."""
+        return f"dispatch_queue_depth: {self.queue_depth} (max {self.max_queue_depth})"
+
+
+async def dispatch(bot, destination, content=None, **kwargs):
+    """
+    Send through the bot's dispatcher, or directly if it isn't set up yet.
+
+    Args:
+        bot: The Discord bot instance
+        destination: Channel, user or member to send to
+        content: Message content
+        **kwargs: Passed through to send
+    """
+    dispatcher = getattr(bot, "dispatcher", None)
+    if isinstance(dispatcher, OutboundDispatcher):
+        return await dispatcher.send(destination, content, **kwargs)
+    # route and priority only mean something to the dispatcher
+    kwargs.pop("route", None)
+    kwargs.pop("priority", None)
+    return await destination.send(content, **kwargs)
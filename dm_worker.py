@@ -0,0 +1,239 @@
+"""Worker pool that sends DMs through the outbound dispatcher in the background."""
+import asyncio
+import time
+from typing import Optional
+
+import discord
+from constants import (
+    DM_WORKERS,
+    DM_NOTICE_WORKERS,
+    DM_RATE_LIMIT,
+    DM_RATE_PERIOD,
+    DM_QUEUE_MAX,
+    DM_UNREACHABLE_TTL_SECONDS,
+    GLOBAL_RATE_LIMIT,
+    GLOBAL_RATE_PERIOD,
+    PRIORITY_LATER,
+)
+from dispatcher import dispatch, DeliveryShed, TokenBucket
+from metrics import metrics
+
+
+class DMWorkerPool:
+    """
+    Background workers draining two queues of DMs: reminders and notices.
+
+    Reminder batches go on an unbounded queue drained by ``workers`` tasks
+    and paced only by the dispatcher's limits, so a batch for every
+    subscriber is sent in full; DMs still queued when their event starts
+    are dropped instead of sent late. Single notices (subscription
+    confirmations and the like) have their own bounded queue, workers and
+    token bucket, so a reminder burst can neither crowd them out nor use up
+    their budget. A notice already waiting for the same user and key is
+    replaced rather than queued twice. Users whose DMs are closed are
+    remembered for DM_UNREACHABLE_TTL_SECONDS and skipped.
+    """
+
+    def __init__(
+        self,
+        bot,
+        workers: int = DM_WORKERS,
+        notice_workers: int = DM_NOTICE_WORKERS,
+        rate_limit: int = DM_RATE_LIMIT,
+        rate_period: float = DM_RATE_PERIOD,
+        max_queued: int = DM_QUEUE_MAX,
+        unreachable_ttl: float = DM_UNREACHABLE_TTL_SECONDS,
+        clock=time.monotonic
+    ):
+        """
+        Initialize the pool; workers start with the first DM.
+
+        Args:
+            bot: The Discord bot instance
+            workers: Number of reminder DMs in flight at once
+            notice_workers: Number of notices in flight at once
+            rate_limit: Notices allowed per rate_period
+            rate_period: Length of the notice budget window in seconds
+            max_queued: Notices that can wait at once; more are dropped
+            unreachable_ttl: Seconds to skip a user after their DMs failed for a lasting reason
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self.bot = bot
+        self._worker_count = workers
+        self._notice_worker_count = notice_workers
+        self._clock = clock
+        self._budget = TokenBucket(rate_limit, rate_period, clock())
+        self._unreachable_ttl = unreachable_ttl
+        # user id -> when they become worth trying again
+        self._unreachable: dict[int, float] = {}
+        # (user id, key) -> (user or user id, content); the notice queue holds the keys
+        self._pending: dict[tuple, tuple] = {}
+        self._notices: asyncio.Queue = asyncio.Queue(max_queued)
+        # (user id, content, clock time after which it isn't worth sending)
+        self._reminders: asyncio.Queue = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def backlog(self) -> int:
+        """Number of DMs waiting for a worker."""
+        return self._notices.qsize() + self._reminders.qsize()
+
+    def is_unreachable(self, user_id: int) -> bool:
+        """Whether a user's DMs recently failed for a lasting reason."""
+        until = self._unreachable.get(user_id)
+        if until is None:
+            return False
+        if until <= self._clock():
+            del self._unreachable[user_id]
+            return False
+        return True
+
+    def send(self, user, content: str, key=None):
+        """
+        Queue one notice DM.
+
+        Args:
+            user: User or member object, or a user id
+            content: Message content
+            key: DMs to the same user with the same key replace each other while
+                waiting (defaults to the content, so only exact repeats collapse)
+        """
+        user_id = user if isinstance(user, int) else user.id
+        if self._skip_unreachable(user_id):
+            return
+        pending_key = (user_id, content if key is None else key)
+        if pending_key in self._pending:
+            self._pending[pending_key] = (user, content)
+            metrics.increment("dm_deduplicated")
+            return
+        try:
+            self._notices.put_nowait(pending_key)
+        except asyncio.QueueFull:
+            metrics.increment("dm_queue_full")
+            return
+        self._pending[pending_key] = (user, content)
+        self._start_workers()
+
+    def send_batch(self, user_ids, content: str, expires_in: Optional[float] = None):
+        """
+        Queue the same reminder DM for many users.
+
+        The reminder queue has no cap, so every user in the batch gets the
+        DM; at the dispatcher's global rate a batch of n takes about
+        n / GLOBAL_RATE_LIMIT periods, which is printed if it won't fit.
+
+        Args:
+            user_ids: Ids of the users to DM
+            content: Message content
+            expires_in: Seconds until the DM is no longer worth sending (the
+                event starts); DMs still queued then are dropped
+        """
+        user_ids = [user_id for user_id in user_ids if not self._skip_unreachable(user_id)]
+        if not user_ids:
+            return
+        deadline = None if expires_in is None else self._clock() + expires_in
+        if expires_in is not None:
+            needed = (self._reminders.qsize() + len(user_ids)) / GLOBAL_RATE_LIMIT * GLOBAL_RATE_PERIOD
+            if needed > expires_in:
+                print(f"Reminder DMs for {len(user_ids)} user(s) may take {needed:.0f}s, "
+                      f"longer than the {expires_in:.0f}s left before the event")
+        for user_id in user_ids:
+            self._reminders.put_nowait((user_id, content, deadline))
+        self._start_workers()
+
+    def _skip_unreachable(self, user_id: int) -> bool:
+        if self.is_unreachable(user_id):
+            metrics.increment("dm_skipped_unreachable")
+            return True
+        return False
+
+    def _start_workers(self):
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work_reminders()) for _ in range(self._worker_count)]
+            self._workers += [asyncio.create_task(self._work_notices()) for _ in range(self._notice_worker_count)]
+
+    async def join(self):
+        """Wait until every queued DM has been attempted."""
+        await self._reminders.join()
+        await self._notices.join()
+
+    def close(self):
+        """Stop the workers, abandoning queued DMs."""
+        for worker in self._workers:
+            worker.cancel()
+        self._workers = []
+
+    async def _work_reminders(self):
+        while True:
+            user_id, content, deadline = await self._reminders.get()
+            try:
+                if deadline is not None and self._clock() >= deadline:
+                    metrics.increment("dm_expired")
+                    continue
+                await self._send(user_id, content)
+            finally:
+                self._reminders.task_done()
+
+    async def _work_notices(self):
+        while True:
+            pending_key = await self._notices.get()
+            try:
+                user, content = self._pending.pop(pending_key)
+                await self._wait_for_budget()
+                await self._send(user, content)
+            finally:
+                self._notices.task_done()
+
+    async def _wait_for_budget(self):
+        while True:
+            delay = self._budget.delay(self._clock())
+            if delay <= 0:
+                self._budget.consume(self._clock())
+                return
+            await asyncio.sleep(delay)
+
+    async def _send(self, user, content: str):
+        user_id = user if isinstance(user, int) else user.id
+        if self._skip_unreachable(user_id):
+            return
+        try:
+            if isinstance(user, int):
+                user = self.bot.get_user(user_id) or await self.bot.fetch_user(user_id)
+            await dispatch(self.bot, user, content, priority=PRIORITY_LATER)
+            metrics.increment("dm_sent")
+        except discord.Forbidden:
+            # DMs closed or no shared server any more
+            metrics.increment("dm_forbidden")
+            self._unreachable[user_id] = self._clock() + self._unreachable_ttl
+        except discord.NotFound:
+            metrics.increment("dm_not_found")
+            self._unreachable[user_id] = self._clock() + self._unreachable_ttl
+        except DeliveryShed:
+            metrics.increment("dm_shed")
+        except Exception as e:
+            metrics.increment("dm_error")
+            print(f"Error sending DM to {user_id}: {e}")
+
+
+async def notify(bot, user, content: str, key=None):
+    """
+    DM a user through the bot's worker pool without waiting for the send.
+
+    Falls back to sending directly (and waiting) if the pool isn't set up
+    yet; a failure there is printed rather than raised, since a notice
+    isn't worth failing the caller over.
+
+    Args:
+        bot: The Discord bot instance
+        user: User or member to DM
+        content: Message content
+        key: Passed to DMWorkerPool.send
+    """
+    dm_workers = getattr(bot, 'dm_workers', None)
+    if isinstance(dm_workers, DMWorkerPool):
+        dm_workers.send(user, content, key=key)
+        return
+    try:
+        await dispatch(bot, user, content)
+    except discord.HTTPException as e:
+        print(f"Couldn't DM {getattr(user, 'id', user)}: {e}")
@@ -1,4 +1,5 @@
 """Event handlers for Discord bot events"""
+import asyncio
 from datetime import datetime, timezone, timedelta
 
 import discord
@@ -7,7 +8,6 @@ from constants import (
     RM2_SERVER_ID, 
     DEV_SERVER_ID, 
     ALERTS_SETUP_CHANNEL_NAME, 
-    ROLE_CONFIGS,
     ALERTS_CHANNEL_NAME,
     FSWAR_ROLE_NAME,
     HQWAR_ROLE_NAME,
@@ -20,22 +20,116 @@ from constants import (
     PVP_BATTLE_ROLE_NAME,
     RM2_SERVER_CHANNEL_ID_GLOBAL,
     RM2_GLOBAL_SHOUT_USER_ID,
-    OUTLAW_ROLE_NAME
+    OUTLAW_ROLE_NAME,
+    SETUP_SUBSCRIPTION_MENU
 )
 from channel_manager import setup_guild_infrastructure
-from special_events import handle_seasonal_event
+from special_events import classify_seasonal_event, schedule_follow_up
 from admin_commands import handle_dm_commands
+from upcoming import handle_upcoming_command
 from utils import get_role_mention
+from fanout import fan_out, report_results
+from alerts import AlertEvent
 from scheduler import AnnouncementScheduler
+from routing import GuildRoutingTable, ALERT_ROLE_NAMES, MISSING_PERMISSION, ROLE_TOO_HIGH
+from dispatcher import OutboundDispatcher
+from guild_health import GuildHealthRegistry
+from subscribers import SubscriberIndex
+from coalescer import AlertCoalescer
+from outbox import AlertOutbox, with_retries
+from dedup import RecentMessages
+from reminders import ReminderSubscriptions
+from dm_worker import DMWorkerPool, notify
+from writebehind import WriteBehind
+from loop_monitor import LoopLagMonitor
+from setup_messages import SetupMessageIndex, EMOJI_ROLES
+from role_updates import RoleUpdateBatcher
+from subscription_panel import SubscriptionView
 
 
 async def handle_ready(bot, environment):
     """Handle when the bot is ready and connected"""
     print(f"ENVIRONMENT: {environment}")
     
-    # Initialize the announcement scheduler
-    bot.scheduler = AnnouncementScheduler(bot)
-    print("Announcement scheduler initialized")
+    # Build the routing table used to find alert channels and role mentions
+    if getattr(bot, 'routes', None) is None:
+        bot.routes = GuildRoutingTable()
+    bot.routes.rebuild(bot.guilds)
+    print(f"Routing table built for {len(bot.routes)} guild(s)")
+    
+    # Every alert, announcement and DM goes out through one dispatcher
+    if getattr(bot, 'dispatcher', None) is None:
+        bot.dispatcher = OutboundDispatcher()
+    
+    # Remembers guilds that can't receive alerts so they aren't retried on every shout
+    if getattr(bot, 'guild_health', None) is None:
+        bot.guild_health = GuildHealthRegistry()
+    
+    # Track who holds each alert role so empty roles can be skipped (see EMPTY_ROLE_POLICY)
+    if getattr(bot, 'subscribers', None) is None:
+        bot.subscribers = SubscriberIndex()
+    bot.subscribers.rebuild(bot.guilds)
+    
+    # Remembers recently handled global shouts so none alerts twice
+    if getattr(bot, 'recent_messages', None) is None:
+        bot.recent_messages = RecentMessages()
+    
+    # State files are written by one background thread instead of the event loop
+    if getattr(bot, 'writer', None) is None:
+        bot.writer = WriteBehind()
+    
+    # Pending alert deliveries survive restarts here
+    if getattr(bot, 'outbox', None) is None:
+        bot.outbox = AlertOutbox()
+    
+    # Merges bursts of outlaw / Open PvP alerts (see COALESCE_WINDOW_SECONDS);
+    # buffered alerts go in the outbox until their digest is delivered
+    if getattr(bot, 'coalescer', None) is None:
+        bot.coalescer = AlertCoalescer(
+            lambda event: deliver_alert(bot, event),
+            record=lambda event: record_alert(bot, event),
+            discard=lambda alert_ids: discard_alerts(bot, alert_ids)
+        )
+    
+    # Per-user DM reminders, sent by a worker pool through the dispatcher
+    if getattr(bot, 'reminders', None) is None:
+        bot.reminders = ReminderSubscriptions(writer=bot.writer)
+    if getattr(bot, 'dm_workers', None) is None:
+        bot.dm_workers = DMWorkerPool(bot)
+    
+    # Reactions only matter on setup messages; this index drops the rest at once
+    if getattr(bot, 'setup_messages', None) is None:
+        bot.setup_messages = SetupMessageIndex()
+    bot.setup_messages.rebuild(bot.guilds)
+    
+    # Select menu on the setup messages; registered on every start so menus posted before still work
+    if SETUP_SUBSCRIPTION_MENU and getattr(bot, 'subscription_view', None) is None:
+        bot.subscription_view = SubscriptionView(bot)
+        bot.add_view(bot.subscription_view)
+    
+    # Collects each member's setup reactions into one role edit
+    if getattr(bot, 'role_updates', None) is None:
+        bot.role_updates = RoleUpdateBatcher(bot)
+    
+    # Report anything that blocks the event loop (see LOOP_LAG_WARN_SECONDS)
+    if getattr(bot, 'loop_monitor', None) is None:
+        bot.loop_monitor = LoopLagMonitor()
+        bot.loop_monitor.start(name_callbacks=environment == "dev")
+    
+    # Initialize the announcement scheduler; on_ready fires again after a failed
+    # resume, and a second scheduler would share (and corrupt) the journal
+    if getattr(bot, 'scheduler', None) is None:
+        bot.scheduler = AnnouncementScheduler(
+            bot,
+            routes=bot.routes,
+            dispatcher=bot.dispatcher,
+            health=bot.guild_health,
+            subscribers=bot.subscribers,
+            reminders=bot.reminders,
+            dm_workers=bot.dm_workers,
+            writer=bot.writer
+        )
+        print("Announcement scheduler initialized")
     
     # only setup on my test server in development
     if environment == "dev":
@@ -43,7 +137,7 @@ async def handle_ready(bot, environment):
         guild = bot.get_guild(DEV_SERVER_ID)
         print(f"DEV: guild: {guild.name}")
         print(f"Setting up infrastructure for {guild.name}")
-        success = await setup_guild_infrastructure(guild)
+        success = await setup_guild_infrastructure(guild, bot.setup_messages, getattr(bot, 'subscription_view', None))
         if success:
             print(f"DEV: Successfully set up infrastructure for {guild.name}")
         else:
@@ -55,20 +149,36 @@ async def handle_ready(bot, environment):
                 print(f"Skipping setup infrastructure for {guild.name} because it's the rm2 server")
                 continue
             print(f"Setting up infrastructure for {guild.name}")
-            success = await setup_guild_infrastructure(guild)
+            # one guild's failure mustn't keep the rest (and the outbox replay) from running
+            try:
+                success = await setup_guild_infrastructure(guild, bot.setup_messages, getattr(bot, 'subscription_view', None))
+            except Exception as e:
+                print(f"Error setting up infrastructure for {guild.name}: {e}")
+                success = False
             if success:
                 print(f"Successfully set up infrastructure for {guild.name}")
             else:
                 print(f"Failed to set up infrastructure for {guild.name}")
     
+    # Finish any alert fan-out a restart interrupted
+    await replay_outbox(bot)
+    
     print(f"{bot.user.name} is here to defeat the Sun!")
 
 
-async def handle_guild_join(guild):
+async def handle_guild_join(bot, guild):
     """Handle when the bot joins a new guild"""
     try:
         print(f"Joined new guild: {guild.name} (ID: {guild.id})")
         
+        routes = getattr(bot, 'routes', None)
+        if routes is not None:
+            routes.refresh(guild)
+        subscribers = getattr(bot, 'subscribers', None)
+        if subscribers is not None:
+            subscribers.refresh(guild)
+        revive_guild(bot, guild.id)
+        
         # Skip setup for rm2 server
         if guild.id == RM2_SERVER_ID:
             print(f"Skipping setup infrastructure for {guild.name} because it's the rm2 server")
@@ -76,7 +186,9 @@ async def handle_guild_join(guild):
         
         # Set up infrastructure for the new guild
         print(f"Setting up infrastructure for new guild: {guild.name}")
-        success = await setup_guild_infrastructure(guild)
+        success = await setup_guild_infrastructure(
+            guild, getattr(bot, 'setup_messages', None), getattr(bot, 'subscription_view', None)
+        )
         
         if success:
             print(f"Successfully set up infrastructure for {guild.name}")
@@ -86,51 +198,186 @@ async def handle_guild_join(guild):
         print(f"Error setting up infrastructure for new guild {guild.name}: {e}")
 
 
+async def handle_guild_remove(bot, guild):
+    """Handle when the bot leaves or is removed from a guild"""
+    print(f"Removed from guild: {guild.name} (ID: {guild.id})")
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.remove(guild.id)
+    subscribers = getattr(bot, 'subscribers', None)
+    if subscribers is not None:
+        subscribers.remove_guild(guild.id)
+    setup_messages = getattr(bot, 'setup_messages', None)
+    if setup_messages is not None:
+        setup_messages.remove_guild(guild.id)
+
+
+def revive_guild(bot, guild_id):
+    """Let the next alert probe a guild again after something that could fix it changed"""
+    health = getattr(bot, 'guild_health', None)
+    if health is not None:
+        health.revive(guild_id)
+
+
+async def handle_guild_channel_create(bot, channel):
+    """Keep the routing table and guild health current when a channel is created"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_channel_change(channel)
+    setup_messages = getattr(bot, 'setup_messages', None)
+    if setup_messages is not None:
+        setup_messages.on_channel_change(channel)
+    if channel.name == ALERTS_CHANNEL_NAME:
+        revive_guild(bot, channel.guild.id)
+
+
+async def handle_guild_channel_update(bot, before, after):
+    """Keep the routing table and guild health current when a channel is renamed or changed"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_channel_change(after, before_name=before.name)
+    setup_messages = getattr(bot, 'setup_messages', None)
+    if setup_messages is not None:
+        setup_messages.on_channel_change(after, before_name=before.name)
+    # renames and permission overwrite changes can both fix delivery
+    if after.name == ALERTS_CHANNEL_NAME:
+        revive_guild(bot, after.guild.id)
+
+
+async def handle_guild_channel_delete(bot, channel):
+    """Keep the routing table current when a channel is deleted"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_channel_change(channel)
+    setup_messages = getattr(bot, 'setup_messages', None)
+    if setup_messages is not None:
+        setup_messages.on_channel_change(channel, deleted=True)
+
+
+def refresh_subscribers(bot, role, before_name=None):
+    """Re-index a guild's subscribers after one of its alert roles was created, renamed or deleted"""
+    subscribers = getattr(bot, 'subscribers', None)
+    if subscribers is not None and (role.name in ALERT_ROLE_NAMES or before_name in ALERT_ROLE_NAMES):
+        subscribers.refresh(role.guild)
+
+
+async def handle_guild_role_create(bot, role):
+    """Keep the routing table current when a role is created"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_role_change(role)
+    refresh_subscribers(bot, role)
+
+
+async def handle_guild_role_update(bot, before, after):
+    """Keep the routing table and guild health current when a role is renamed or changed"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_role_change(after, before_name=before.name)
+    if before.name != after.name:
+        refresh_subscribers(bot, after, before_name=before.name)
+    # a permission change on any of the bot's roles (@everyone included) can restore Send Messages
+    me = after.guild.me
+    if before.permissions != after.permissions and me is not None and after in me.roles:
+        revive_guild(bot, after.guild.id)
+
+
+async def handle_guild_role_delete(bot, role):
+    """Keep the routing table current when a role is deleted"""
+    routes = getattr(bot, 'routes', None)
+    if routes is not None:
+        routes.on_role_change(role)
+    refresh_subscribers(bot, role)
+
+
+async def handle_member_update(bot, before, after):
+    """Track alert role changes, and revive a guild's alert delivery when the bot itself gets new roles"""
+    if before.roles == after.roles:
+        return
+    if after.id == bot.user.id:
+        revive_guild(bot, after.guild.id)
+        routes = getattr(bot, 'routes', None)
+        if routes is not None:
+            routes.invalidate_permissions(after.guild.id)
+        return
+    subscribers = getattr(bot, 'subscribers', None)
+    if subscribers is not None:
+        subscribers.on_member_update(before, after)
+
+
+def is_setup_reaction(bot, payload) -> bool:
+    """Whether a reaction event could be on a setup message (one set lookup when the index exists)"""
+    setup_messages = getattr(bot, 'setup_messages', None)
+    if isinstance(setup_messages, SetupMessageIndex):
+        return setup_messages.accepts(payload.message_id, payload.channel_id)
+    # no index yet (before on_ready): fall back to checking the channel
+    if not payload.channel_id:
+        return False
+    channel = bot.get_channel(payload.channel_id)
+    return channel is not None and channel.name == ALERTS_SETUP_CHANNEL_NAME
+
+
+def role_routes(bot, guild) -> GuildRoutingTable:
+    """The bot's routing table, or a throwaway one for this guild if there isn't one yet"""
+    routes = getattr(bot, 'routes', None)
+    if isinstance(routes, GuildRoutingTable):
+        return routes
+    routes = GuildRoutingTable()
+    routes.refresh(guild)
+    return routes
+
+
 async def handle_raw_reaction_add(bot, payload):
     """Handle when a reaction is added to a message"""
     try:
-        # Check if the reaction is in a rm2-alerts-setup channel
-        if payload.channel_id:
-            channel = bot.get_channel(payload.channel_id)
-            if channel and channel.name == ALERTS_SETUP_CHANNEL_NAME:
-                guild = bot.get_guild(payload.guild_id)
-                user = guild.get_member(payload.user_id)
-                
-                # Don't assign role to the bot itself
-                if user == bot.user:
-                    return
-                
-                # Map emojis to role names
-                emoji_to_role = {emoji: role_name for role_name, _, _, emoji in ROLE_CONFIGS}
-                # map emojis to readable names
-                emoji_to_readable_name = {emoji: reason for _, reason, _, emoji in ROLE_CONFIGS}
-                
-                if payload.emoji.name in emoji_to_role:
-                    role_name = emoji_to_role[payload.emoji.name]
-                    role = discord.utils.get(guild.roles, name=role_name)
-                    
-                    if not role:
-                        await user.send(f"Sorry, the {role_name} role doesn't exist in {guild.name}. Please ask an administrator to create it.")
-                        return
-                    
-                    # Check if bot has Manage Roles permission
-                    if not guild.me.guild_permissions.manage_roles:
-                        await user.send(f"Sorry, I don't have the 'Manage Roles' permission in {guild.name}. Please ask an administrator to give me this permission.")
-                        return
-                    
-                    # Check if bot can assign this specific role (role hierarchy)
-                    if role.position >= guild.me.top_role.position:
-                        await user.send(f"Sorry, I can't assign the {role_name} role in {guild.name} because it's higher than my role. Please ask an administrator to move my role higher in the role list.")
-                        return
-                    
-                    try:
-                        await user.add_roles(role)
-                        await user.send(f"You have subscribed to {emoji_to_readable_name[payload.emoji.name]} alerts in {guild.name}!")
-                    except discord.Forbidden as e:
-                        await user.send(f"Sorry, I don't have permission to assign the {role_name} role in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission.")
-                    except Exception as e:
-                        await user.send(f"Sorry, there was an error assigning the role in {guild.name}. Please try again later.")
-                        print(f"Error assigning role in {guild.name}: {e}")
+        if not is_setup_reaction(bot, payload):
+            return
+        emoji_role = EMOJI_ROLES.get(payload.emoji.name)
+        # Don't assign role to the bot itself
+        if emoji_role is None or payload.user_id == bot.user.id:
+            return
+        
+        guild = bot.get_guild(payload.guild_id)
+        # the gateway sends the member with reaction adds in guilds
+        user = payload.member or guild.get_member(payload.user_id)
+        role_name = emoji_role.role_name
+        routes = role_routes(bot, guild)
+        role = routes.alert_role(guild, role_name)
+        
+        if not role:
+            await notify(bot, user, f"Sorry, the {role_name} role doesn't exist in {guild.name}. Please ask an administrator to create it.")
+            return
+        
+        status = routes.manage_status(guild, role_name)
+        # Check if bot has Manage Roles permission
+        if status == MISSING_PERMISSION:
+            await notify(bot, user, f"Sorry, I don't have the 'Manage Roles' permission in {guild.name}. Please ask an administrator to give me this permission.")
+            return
+        
+        # Check if bot can assign this specific role (role hierarchy)
+        if status == ROLE_TOO_HIGH:
+            await notify(bot, user, f"Sorry, I can't assign the {role_name} role in {guild.name} because it's higher than my role. Please ask an administrator to move my role higher in the role list.")
+            return
+        
+        # Quick successive reactions are applied as one role edit (see ROLE_UPDATE_DEBOUNCE_SECONDS)
+        role_updates = getattr(bot, 'role_updates', None)
+        if isinstance(role_updates, RoleUpdateBatcher):
+            role_updates.submit(guild, user, role, emoji_role.readable_name, wanted=True)
+            return
+        
+        try:
+            await user.add_roles(role)
+            subscribers = getattr(bot, 'subscribers', None)
+            if subscribers is not None:
+                subscribers.add(guild.id, role_name, user.id)
+            await notify(bot, user, f"You have subscribed to {emoji_role.readable_name} alerts in {guild.name}!", key=("subscription", guild.id, role_name))
+        except discord.Forbidden as e:
+            # the cached permission check was out of date
+            routes.invalidate_permissions(guild.id)
+            await notify(bot, user, f"Sorry, I don't have permission to assign the {role_name} role in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission.")
+        except Exception as e:
+            await notify(bot, user, f"Sorry, there was an error assigning the role in {guild.name}. Please try again later.")
+            print(f"Error assigning role in {guild.name}: {e}")
     except Exception as e:
         print(f"Error in handle_raw_reaction_add: {e}")
 
@@ -138,149 +385,134 @@ async def handle_raw_reaction_add(bot, payload):
 async def handle_raw_reaction_remove(bot, payload):
     """Handle when a reaction is removed from a message"""
     try:
-        if payload.channel_id:
-            channel = bot.get_channel(payload.channel_id)
-            # Check if the reaction is in a rm2-alerts-setup channel
-            if channel and channel.name == ALERTS_SETUP_CHANNEL_NAME:
-                guild = bot.get_guild(payload.guild_id)
-                user = guild.get_member(payload.user_id)
-                
-                # Map emojis to role names
-                emoji_to_role = {emoji: role_name for role_name, _, _, emoji in ROLE_CONFIGS}
-                # map emojis to readable names
-                emoji_to_readable_name = {emoji: reason for _, reason, _, emoji in ROLE_CONFIGS}
-                
-                if payload.emoji.name in emoji_to_role:
-                    role_name = emoji_to_role[payload.emoji.name]
-                    role = discord.utils.get(guild.roles, name=role_name)
-                    
-                    if role:
-                        try:
-                            await user.remove_roles(role)
-                            await user.send(f"You have unsubscribed from {emoji_to_readable_name[payload.emoji.name]} alerts in {guild.name}!")
-                        except discord.Forbidden:
-                            await user.send(f"Sorry, I don't have permission to remove the {role_name} role in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission.")
-                        except Exception as e:
-                            await user.send(f"Sorry, there was an error removing the role in {guild.name}. Please try again later.")
-                            print(f"Error removing role in {guild.name}: {e}")
-                    else:
-                        await user.send(f"The {role_name} role doesn't exist in {guild.name}.")
+        if not is_setup_reaction(bot, payload):
+            return
+        emoji_role = EMOJI_ROLES.get(payload.emoji.name)
+        if emoji_role is None:
+            return
+        
+        guild = bot.get_guild(payload.guild_id)
+        # reaction removes don't carry the member, so use the member cache
+        user = guild.get_member(payload.user_id)
+        role_name = emoji_role.role_name
+        routes = role_routes(bot, guild)
+        role = routes.alert_role(guild, role_name)
+        
+        role_updates = getattr(bot, 'role_updates', None)
+        if role and isinstance(role_updates, RoleUpdateBatcher):
+            role_updates.submit(guild, user, role, emoji_role.readable_name, wanted=False)
+        elif role:
+            try:
+                await user.remove_roles(role)
+                subscribers = getattr(bot, 'subscribers', None)
+                if subscribers is not None:
+                    subscribers.remove(guild.id, role_name, user.id)
+                await notify(bot, user, f"You have unsubscribed from {emoji_role.readable_name} alerts in {guild.name}!", key=("subscription", guild.id, role_name))
+            except discord.Forbidden:
+                routes.invalidate_permissions(guild.id)
+                await notify(bot, user, f"Sorry, I don't have permission to remove the {role_name} role in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission.")
+            except Exception as e:
+                await notify(bot, user, f"Sorry, there was an error removing the role in {guild.name}. Please try again later.")
+                print(f"Error removing role in {guild.name}: {e}")
+        else:
+            await notify(bot, user, f"The {role_name} role doesn't exist in {guild.name}.")
     except Exception as e:
         print(f"Error in handle_raw_reaction_remove: {e}")
 
 
-async def handle_foodshop_war(message, guild, alert_channel):
-    """Send Food Shop War alerts to the provided channel when applicable."""
-    content = message.content.lower()
-    announcements = {
-        "**food shop war is starting in 15 minutes in street 2!**": "Food Shop War (street 2) starts in 15 minutes!",
-        "**food shop war is starting in 15 minutes in signus ax-1!**": "Food Shop War (Signus AX-1) starts in 15 minutes!",
-        "**food shop war is starting in 15 minutes in downtown 4!**": "Food Shop War (Downtown 4) starts in 15 minutes!",
-    }
-
-    announcement = announcements.get(content)
-    if not announcement:
-        return
-
-    role_mention = get_role_mention(guild, FSWAR_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} {announcement}")
+# Food Shop War shouts (lowercased) -> alert body
+FOODSHOP_WAR_ANNOUNCEMENTS = {
+    "**food shop war is starting in 15 minutes in street 2!**": "Food Shop War (street 2) starts in 15 minutes!",
+    "**food shop war is starting in 15 minutes in signus ax-1!**": "Food Shop War (Signus AX-1) starts in 15 minutes!",
+    "**food shop war is starting in 15 minutes in downtown 4!**": "Food Shop War (Downtown 4) starts in 15 minutes!",
+}
 
+# Uni shouts (lowercased) -> alert body
+UNI_ANNOUNCEMENTS = {
+    "**sky skirmish complete, join the uni raid within 5 minutes (solo or as a group)!**": "Uni open for 5 minutes",
+    "**sky dungeon skirmish complete, join the uni sky dungeon raid within 5 minutes (solo or as a group)!**": "Uni Dungeon open for 5 minutes",
+}
 
-async def handle_hq_war(message, guild, alert_channel):
-    """Send HQ War alerts when applicable."""
-    if message.content.lower() != "**hq war starting in 5 minutes!**":
-        return
 
-    role_mention = get_role_mention(guild, HQWAR_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} HQ War starts in 5 minutes!")
+def parse_foodshop_war(content, lowered):
+    """Parse a Food Shop War shout into an AlertEvent, or None."""
+    announcement = FOODSHOP_WAR_ANNOUNCEMENTS.get(lowered)
+    if not announcement:
+        return None
+    return AlertEvent("food_shop_war", FSWAR_ROLE_NAME, announcement)
 
 
-async def handle_pvp_tournament(message, guild, alert_channel):
-    """Send PvP Tournament alerts when applicable."""
-    if (
-        message.content.lower()
-        != "**pvp tournament starts in 20 minutes, please opt in in the special battle arena!**"
-    ):
-        return
+def parse_hq_war(content, lowered):
+    """Parse an HQ War shout into an AlertEvent, or None."""
+    if lowered != "**hq war starting in 5 minutes!**":
+        return None
+    return AlertEvent("hq_war", HQWAR_ROLE_NAME, "HQ War starts in 5 minutes!")
 
-    role_mention = get_role_mention(guild, PVP_TOURNAMENT_ROLE_NAME)
-    await alert_channel.send(
-        f"{role_mention} PvP Tournament starts in 20 minutes!  Opt in!"
-    )
 
+def parse_pvp_tournament(content, lowered):
+    """Parse a PvP Tournament shout into an AlertEvent, or None."""
+    if lowered != "**pvp tournament starts in 20 minutes, please opt in in the special battle arena!**":
+        return None
+    return AlertEvent("pvp_tournament", PVP_TOURNAMENT_ROLE_NAME, "PvP Tournament starts in 20 minutes!  Opt in!")
 
-async def handle_uni_events(message, guild, alert_channel):
-    """Send Uni event alerts when applicable."""
-    content = message.content.lower()
-    announcements = {
-        "**sky skirmish complete, join the uni raid within 5 minutes (solo or as a group)!**": "Uni open for 5 minutes",
-        "**sky dungeon skirmish complete, join the uni sky dungeon raid within 5 minutes (solo or as a group)!**": "Uni Dungeon open for 5 minutes",
-    }
 
-    announcement = announcements.get(content)
+def parse_uni_events(content, lowered):
+    """Parse a Uni / Uni Dungeon shout into an AlertEvent, or None."""
+    announcement = UNI_ANNOUNCEMENTS.get(lowered)
     if not announcement:
-        return
+        return None
+    return AlertEvent("uni", UNI_ROLE_NAME, announcement)
 
-    role_mention = get_role_mention(guild, UNI_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} {announcement}")
 
+def parse_battle_dimension(content, lowered):
+    """Parse a Battle Dimension shout into an AlertEvent, or None."""
+    if lowered != "**battle dimension starts in 30 minutes!**":
+        return None
+    return AlertEvent("battle_dimension", BD_ROLE_NAME, "Battle Dimension opens in 30 minutes")
 
-async def handle_battle_dimension(message, guild, alert_channel):
-    """Send Battle Dimension alerts when applicable."""
-    if message.content.lower() != "**battle dimension starts in 30 minutes!**":
-        return
 
-    role_mention = get_role_mention(guild, BD_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} Battle Dimension opens in 30 minutes")
+def parse_battle_match(content, lowered):
+    """Parse a Battle Match shout into an AlertEvent, or None."""
+    if lowered != "**battle match opens in 30 minutes!**":
+        return None
+    return AlertEvent("battle_match", BM_ROLE_NAME, "Battle Match opens in 30 minutes!")
 
-async def handle_battle_match(message, guild, alert_channel):
-    """Send Battle Match alerts when applicable."""
-    if message.content.lower() != "**battle match opens in 30 minutes!**":
-        return
-
-    role_mention = get_role_mention(guild, BM_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} Battle Match opens in 30 minutes!")
-
-async def handle_battle_simulation(message, guild, alert_channel):
-    """Send Battle Simulation alerts when applicable."""
-    if message.content.lower() != "**battle simulation opens in 5 minutes!**":
-        return
 
-    role_mention = get_role_mention(guild, BSIM_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} Battle Simulation opens in 5 minutes!")
+def parse_battle_simulation(content, lowered):
+    """Parse a Battle Simulation shout into an AlertEvent, or None."""
+    if lowered != "**battle simulation opens in 5 minutes!**":
+        return None
+    return AlertEvent("battle_simulation", BSIM_ROLE_NAME, "Battle Simulation opens in 5 minutes!")
 
-async def handle_freedom_village(message, guild, alert_channel):
-    """Send Freedom Village alerts when applicable."""
-    if (
-        message.content.lower()
-        != "**sky city is launching an attack on freedom village in 30 minutes!**"
-    ):
-        return
 
-    role_mention = get_role_mention(guild, FV_ROLE_NAME)
+def parse_freedom_village(content, lowered):
+    """Parse a Freedom Village shout into an AlertEvent, or None."""
+    if lowered != "**sky city is launching an attack on freedom village in 30 minutes!**":
+        return None
     when = datetime.now(timezone.utc) + timedelta(minutes=30)
     timestamp = int(when.timestamp())
-    await alert_channel.send(
-        f"{role_mention} Freedom Village in 30 minutes at <t:{timestamp}:f>!"
+    return AlertEvent(
+        "freedom_village",
+        FV_ROLE_NAME,
+        f"Freedom Village in 30 minutes at <t:{timestamp}:f>!",
+        next_event_time=when,
     )
 
 
-async def handle_monster_invasion(message, guild, alert_channel):
-    """Send Monster Invasion alerts when applicable."""
-    if message.content.lower() != "**monster invasion starts in 30 minutes!**":
-        return
+def parse_monster_invasion(content, lowered):
+    """Parse a Monster Invasion shout into an AlertEvent, or None."""
+    if lowered != "**monster invasion starts in 30 minutes!**":
+        return None
+    return AlertEvent("monster_invasion", MI_ROLE_NAME, "Monster Invasion starts in 30 minutes!")
 
-    role_mention = get_role_mention(guild, MI_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} Monster Invasion starts in 30 minutes!")
 
-
-async def handle_open_pvp_battle(message, guild, alert_channel):
-    """Send Open PvP Battle alerts, including the map, when applicable."""
-    if not message.content.lower().startswith("**open pvp battle starts in 30 minutes in"):
-        return
+def parse_open_pvp_battle(content, lowered):
+    """Parse an Open PvP Battle shout, including the map, into an AlertEvent, or None."""
+    if not lowered.startswith("**open pvp battle starts in 30 minutes in"):
+        return None
 
     try:
-        words = message.content.split()
+        words = content.split()
         # Find the index of the second "in" and extract everything after it until the trailing "!**"
         in_index = -1
         in_count = 0
@@ -294,30 +526,223 @@ async def handle_open_pvp_battle(message, guild, alert_channel):
         if in_index != -1 and in_index + 1 < len(words):
             map_words = words[in_index + 1:]
             map = " ".join(map_words).replace("!**", "")  # Exclude the trailing "!**"
-            role_mention = get_role_mention(guild, PVP_BATTLE_ROLE_NAME)
-            await alert_channel.send(f"{role_mention} Open PvP Battle starts in 30 minutes in {map}!")
-        else:
-            print(f"Could not parse map from message: {message.content}")
+            return AlertEvent(
+                "open_pvp_battle",
+                PVP_BATTLE_ROLE_NAME,
+                f"Open PvP Battle starts in 30 minutes in {map}!",
+                map=map,
+            )
+        print(f"Could not parse map from message: {content}")
     except Exception as e:
         print(f"Error parsing open PvP battle map: {e}")
+    return None
 
 
-async def handle_outlaw(message, guild, alert_channel):
-    """Send alerts for outlaw notifications when applicable."""
-    if not message.content.lower().startswith("**player "):
-        return
+def parse_outlaw(content, lowered):
+    """Parse an outlaw shout, including player and map, into an AlertEvent, or None."""
+    if not lowered.startswith("**player "):
+        return None
 
     try:
-        words = message.content.split()
+        words = content.split()
         if len(words) >= 6 and words[2:6] == ["became", "an", "outlaw", "at"]:
             player_name = words[1]
             map = " ".join(words[6:]).replace("!**", "")
-            role_mention = get_role_mention(guild, OUTLAW_ROLE_NAME)
-            await alert_channel.send(f"{role_mention} {player_name} became an outlaw at {map}!")
-        else:
-            print(f"Could not parse player name or map from message: {message.content}")
+            return AlertEvent(
+                "outlaw",
+                OUTLAW_ROLE_NAME,
+                f"{player_name} became an outlaw at {map}!",
+                map=map,
+                player=player_name,
+            )
+        print(f"Could not parse player name or map from message: {content}")
     except Exception as e:
         print(f"Error parsing outlaw message: {e}")
+    return None
+
+
+# Parsers tried in order by classify_message; each takes (content, lowered content)
+ALERT_PARSERS = (
+    parse_foodshop_war,
+    parse_hq_war,
+    parse_pvp_tournament,
+    parse_uni_events,
+    parse_battle_dimension,
+    parse_battle_match,
+    parse_battle_simulation,
+    parse_freedom_village,
+    parse_monster_invasion,
+    parse_open_pvp_battle,
+    parse_outlaw,
+)
+
+
+def classify_message(content):
+    """
+    Classify an RM2 global shout into an AlertEvent.
+
+    The content is lowercased once and every parser (including the active
+    seasonal event) is tried until one matches.
+
+    Args:
+        content: The raw message content
+
+    Returns:
+        AlertEvent or None if the shout isn't an alert
+    """
+    lowered = content.lower()
+    for parser in ALERT_PARSERS:
+        event = parser(content, lowered)
+        if event:
+            return event
+    return classify_seasonal_event(content, lowered)
+
+
+async def send_alert(event, guild, alert_channel, routes=None, dispatcher=None):
+    """Send an AlertEvent to a guild's alert channel with the guild's role mention."""
+    if event is None:
+        return
+    role_mention = get_role_mention(guild, event.role_name, routes)
+    if dispatcher is not None:
+        await dispatcher.send(alert_channel, event.render(role_mention), priority=event.priority)
+    else:
+        await alert_channel.send(event.render(role_mention))
+
+
+async def handle_foodshop_war(message, guild, alert_channel):
+    """Send Food Shop War alerts to the provided channel when applicable."""
+    await send_alert(parse_foodshop_war(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_hq_war(message, guild, alert_channel):
+    """Send HQ War alerts when applicable."""
+    await send_alert(parse_hq_war(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_pvp_tournament(message, guild, alert_channel):
+    """Send PvP Tournament alerts when applicable."""
+    await send_alert(parse_pvp_tournament(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_uni_events(message, guild, alert_channel):
+    """Send Uni event alerts when applicable."""
+    await send_alert(parse_uni_events(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_battle_dimension(message, guild, alert_channel):
+    """Send Battle Dimension alerts when applicable."""
+    await send_alert(parse_battle_dimension(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_battle_match(message, guild, alert_channel):
+    """Send Battle Match alerts when applicable."""
+    await send_alert(parse_battle_match(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_battle_simulation(message, guild, alert_channel):
+    """Send Battle Simulation alerts when applicable."""
+    await send_alert(parse_battle_simulation(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_freedom_village(message, guild, alert_channel):
+    """Send Freedom Village alerts when applicable."""
+    await send_alert(parse_freedom_village(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_monster_invasion(message, guild, alert_channel):
+    """Send Monster Invasion alerts when applicable."""
+    await send_alert(parse_monster_invasion(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_open_pvp_battle(message, guild, alert_channel):
+    """Send Open PvP Battle alerts, including the map, when applicable."""
+    await send_alert(parse_open_pvp_battle(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def handle_outlaw(message, guild, alert_channel):
+    """Send alerts for outlaw notifications when applicable."""
+    await send_alert(parse_outlaw(message.content, message.content.lower()), guild, alert_channel)
+
+
+async def record_alert(bot, event):
+    """
+    Store an alert in the outbox for all alert guilds without delivering it yet.
+
+    Args:
+        bot: The Discord bot instance
+        event: The AlertEvent
+
+    Returns:
+        int: The outbox id, or None without an outbox
+    """
+    outbox = getattr(bot, 'outbox', None)
+    if not isinstance(outbox, AlertOutbox):
+        return None
+    guild_ids = [guild.id for guild in bot.guilds if guild.id != RM2_SERVER_ID]
+    return await asyncio.to_thread(outbox.record, event, guild_ids)
+
+
+async def discard_alerts(bot, alert_ids):
+    """Close outbox alerts that were delivered as part of a digest"""
+    outbox = getattr(bot, 'outbox', None)
+    if isinstance(outbox, AlertOutbox):
+        await asyncio.to_thread(outbox.discard, alert_ids)
+
+
+async def deliver_alert(bot, event, guilds=None, alert_id=None):
+    """
+    Fan a classified AlertEvent out to every guild's alerts channel.
+
+    With an outbox on the bot, each target guild is recorded as pending
+    first and cleared as it's delivered, so a restart can finish the job.
+
+    Args:
+        bot: The Discord bot instance
+        event: The AlertEvent to deliver
+        guilds: Guilds to deliver to (defaults to all of the bot's guilds)
+        alert_id: Outbox id when replaying an alert that's already recorded
+    """
+    routes = getattr(bot, 'routes', None)
+    dispatcher = getattr(bot, 'dispatcher', None)
+    health = getattr(bot, 'guild_health', None)
+    subscribers = getattr(bot, 'subscribers', None)
+    outbox = getattr(bot, 'outbox', None)
+    if not isinstance(outbox, AlertOutbox):
+        outbox = None
+    if guilds is None:
+        guilds = [guild for guild in bot.guilds if guild.id != RM2_SERVER_ID]
+    if outbox is not None and alert_id is None:
+        alert_id = await asyncio.to_thread(outbox.record, event, [guild.id for guild in guilds])
+
+    async def deliver(guild, alert_channel):
+        await with_retries(lambda: send_alert(event, guild, alert_channel, routes, dispatcher))
+        if outbox is not None:
+            await asyncio.to_thread(outbox.mark_done, alert_id, guild.id)
+
+    results = await fan_out(
+        guilds,
+        deliver,
+        routes,
+        health,
+        role_name=event.role_name,
+        subscribers=subscribers
+    )
+    if outbox is not None:
+        await asyncio.to_thread(outbox.finish, alert_id, results)
+    report_results(f"{event.event_type} alert", results)
+    return results
+
+
+async def replay_outbox(bot):
+    """Deliver alerts a previous run classified but didn't finish sending"""
+    outbox = getattr(bot, 'outbox', None)
+    if not isinstance(outbox, AlertOutbox):
+        return
+    for alert_id, event, guild_ids in await asyncio.to_thread(outbox.pending):
+        outbox.claim(alert_id)
+        guilds = [guild for guild in bot.guilds if guild.id in guild_ids]
+        print(f"Replaying {event.event_type} alert to {len(guilds)} guild(s) from the outbox")
+        await deliver_alert(bot, event, guilds=guilds, alert_id=alert_id)
 
 
 async def handle_message(bot, message, admin_id):
@@ -331,39 +756,27 @@ async def handle_message(bot, message, admin_id):
         return
     
     if message.author.id == RM2_GLOBAL_SHOUT_USER_ID and message.channel.id == RM2_SERVER_CHANNEL_ID_GLOBAL:
-        for guild in bot.guilds:
-            if guild.id == RM2_SERVER_ID:
-                continue
-            alert_channel = discord.utils.get(guild.channels, name=ALERTS_CHANNEL_NAME)
-            if alert_channel:
-                try:
-                    await handle_foodshop_war(message, guild, alert_channel)
-                    await handle_hq_war(message, guild, alert_channel)
-                    await handle_pvp_tournament(message, guild, alert_channel)
-                    await handle_uni_events(message, guild, alert_channel)
-                    await handle_battle_dimension(message, guild, alert_channel)
-                    await handle_battle_match(message, guild, alert_channel)
-                    await handle_battle_simulation(message, guild, alert_channel)
-                    await handle_freedom_village(message, guild, alert_channel)
-                    await handle_monster_invasion(message, guild, alert_channel)
-                    await handle_open_pvp_battle(message, guild, alert_channel)
-                    await handle_outlaw(message, guild, alert_channel)
-
-                    # Pass scheduler if it exists (may not be initialized yet)
-                    scheduler = getattr(bot, 'scheduler', None)
-                    await handle_seasonal_event(message, guild, alert_channel, scheduler)
-
-
-
-
-                except discord.Forbidden:
-                    print(f"Bot doesn't have permission to send messages in {guild.name}'s alerts channel")
-                except Exception as e:
-                    print(f"Error sending alert to {guild.name}: {e}")
-            else:
-                print(f"Could not find 'rm2-alerts' channel in guild: {guild.name}")
-
-    await bot.process_commands(message)
+        # Drop shouts already handled (gateway resumes, repeated lines)
+        recent = getattr(bot, 'recent_messages', None)
+        if isinstance(recent, RecentMessages) and recent.check_and_add(message.id, message.content):
+            print(f"Ignoring duplicate global shout {message.id}")
+            return
 
+        # Classify the shout once; each guild then only adds its role mention
+        event = classify_message(message.content)
+        if event:
+            # Pass scheduler if it exists (may not be initialized yet)
+            scheduler = getattr(bot, 'scheduler', None)
+            schedule_follow_up(event, scheduler)
+
+            # High-frequency alert types are merged into digests by the coalescer
+            coalescer = getattr(bot, 'coalescer', None)
+            if isinstance(coalescer, AlertCoalescer):
+                await coalescer.submit(event)
+            else:
+                await deliver_alert(bot, event)
 
+    if await handle_upcoming_command(message, bot):
+        return
 
+    await bot.process_commands(message)
@@ -0,0 +1,150 @@
+"""Concurrent delivery of alerts to every guild the bot is in."""
+import asyncio
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional
+
+import discord
+from constants import ALERTS_CHANNEL_NAME, RM2_SERVER_ID, FANOUT_CONCURRENCY, EMPTY_ROLE_POLICY
+from metrics import metrics
+from dispatcher import DeliveryShed
+
+
+# per-guild delivery outcomes
+SENT = "sent"
+FORBIDDEN = "forbidden"
+MISSING_CHANNEL = "missing_channel"
+ERROR = "error"
+SHED = "shed"
+BACKOFF = "backoff"
+NO_SUBSCRIBERS = "no_subscribers"
+
+
+@dataclass(frozen=True)
+class DeliveryResult:
+    """Outcome of delivering one alert to one guild."""
+    guild_id: int
+    guild_name: str
+    status: str
+    error: Optional[str] = None
+
+
+def can_send(alert_channel, guild) -> bool:
+    """Check the bot's cached Send Messages permission in the alerts channel without a REST call."""
+    if not isinstance(alert_channel, discord.abc.GuildChannel):
+        return True
+    return alert_channel.permissions_for(guild.me).send_messages
+
+
+async def fan_out(
+    guilds,
+    deliver,
+    routes=None,
+    health=None,
+    role_name: Optional[str] = None,
+    subscribers=None,
+    empty_role_policy: str = EMPTY_ROLE_POLICY,
+    concurrency: int = FANOUT_CONCURRENCY,
+):
+    """
+    Deliver an alert to the alerts channel of every guild at once.
+
+    At most ``concurrency`` guilds are being delivered to at any moment. The
+    RM2 server itself is always skipped, as are guilds the health registry
+    is backing off. With a subscriber index, guilds where nobody holds the
+    alert's role are skipped or delivered last, per empty_role_policy.
+
+    Args:
+        guilds: Iterable of Discord guild objects
+        deliver: Coroutine function called as deliver(guild, alert_channel)
+        routes: Optional GuildRoutingTable used to look up each guild's alerts channel
+        health: Optional GuildHealthRegistry that records outcomes and backs off broken guilds
+        role_name: The role the alert mentions, used with subscribers
+        subscribers: Optional SubscriberIndex used to find guilds with no one in role_name
+        empty_role_policy: "off", "skip" or "demote" (see constants.EMPTY_ROLE_POLICY)
+        concurrency: Maximum number of guilds delivered to concurrently
+
+    Returns:
+        dict: Mapping of guild id to DeliveryResult (status SENT, FORBIDDEN,
+        MISSING_CHANNEL, ERROR, SHED when the dispatcher dropped the send,
+        BACKOFF when the guild was skipped as broken, or NO_SUBSCRIBERS)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def attempt(guild):
+        if routes is not None:
+            alert_channel = routes.alert_channel(guild)
+        else:
+            alert_channel = discord.utils.get(guild.channels, name=ALERTS_CHANNEL_NAME)
+        if not alert_channel:
+            return DeliveryResult(guild.id, guild.name, MISSING_CHANNEL)
+        if not can_send(alert_channel, guild):
+            return DeliveryResult(guild.id, guild.name, FORBIDDEN, "missing Send Messages permission")
+
+        async with semaphore:
+            try:
+                await deliver(guild, alert_channel)
+            except discord.Forbidden as e:
+                return DeliveryResult(guild.id, guild.name, FORBIDDEN, str(e))
+            except DeliveryShed as e:
+                return DeliveryResult(guild.id, guild.name, SHED, str(e))
+            except Exception as e:
+                return DeliveryResult(guild.id, guild.name, ERROR, str(e))
+        return DeliveryResult(guild.id, guild.name, SENT)
+
+    async def deliver_to_guild(guild):
+        if health is None:
+            return await attempt(guild)
+        if not health.should_attempt(guild.id):
+            return DeliveryResult(guild.id, guild.name, BACKOFF)
+
+        result = await attempt(guild)
+        if result.status == SENT:
+            health.record_success(guild.id)
+        elif result.status in (MISSING_CHANNEL, FORBIDDEN):
+            entry = health.record_failure(guild.id, result.status)
+            if entry.failures == 1:
+                print(f"Backing off alerts for {guild.name}: {result.status}")
+        return result
+
+    targets = [guild for guild in guilds if guild.id != RM2_SERVER_ID]
+    empty = []
+    if subscribers is not None and role_name is not None and empty_role_policy in ("skip", "demote"):
+        subscribed = []
+        for guild in targets:
+            if subscribers.count(guild.id, role_name) == 0:
+                empty.append(guild)
+            else:
+                subscribed.append(guild)
+        targets = subscribed
+
+    results = list(await asyncio.gather(*(deliver_to_guild(guild) for guild in targets)))
+    if empty_role_policy == "demote":
+        results += await asyncio.gather(*(deliver_to_guild(guild) for guild in empty))
+    else:
+        results += [DeliveryResult(guild.id, guild.name, NO_SUBSCRIBERS) for guild in empty]
+    return {result.guild_id: result for result in results}
+
+
+def summarize_results(results: dict) -> str:
+    """
+    Summarize fan-out results as a single line of per-status counts.
+
+    Args:
+        results: Mapping of guild id to DeliveryResult, as returned by fan_out
+
+    Returns:
+        str: e.g. "sent=120, missing_channel=3, forbidden=1"
+    """
+    counts = Counter(result.status for result in results.values())
+    return ", ".join(f"{status}={count}" for status, count in counts.most_common())
+
+
+def report_results(label: str, results: dict):
+    """Print a one-line summary of a fan-out, plus the guilds that errored."""
+    print(f"{label} delivered to {len(results)} guild(s): {summarize_results(results)}")
+    for status, count in Counter(result.status for result in results.values()).items():
+        metrics.increment(f"fanout_{status}", count)
+    for result in results.values():
+        if result.status == ERROR:
+            print(f"Error sending {label} to {result.guild_name}: {result.error}")
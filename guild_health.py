@@ -0,0 +1,81 @@
+"""Per-guild delivery health, so broken guilds are backed off instead of retried on every alert."""
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from constants import HEALTH_BACKOFF_BASE_SECONDS, HEALTH_BACKOFF_MAX_SECONDS
+
+
+@dataclass
+class GuildHealth:
+    """Last failed delivery to a guild and when it may be probed again."""
+    status: str
+    failures: int
+    retry_at: float
+
+
+class GuildHealthRegistry:
+    """
+    Remembers guilds whose last delivery failed for a lasting reason (no
+    alerts channel, no Send Messages permission) and skips them until an
+    exponentially growing re-probe delay has passed. Channel, role and
+    member events that could fix a guild revive it right away.
+    """
+
+    def __init__(
+        self,
+        base_delay: float = HEALTH_BACKOFF_BASE_SECONDS,
+        max_delay: float = HEALTH_BACKOFF_MAX_SECONDS,
+        clock=time.monotonic,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            base_delay: Seconds before the first re-probe of a broken guild
+            max_delay: Upper bound on the re-probe delay in seconds
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._clock = clock
+        self._broken: dict[int, GuildHealth] = {}
+
+    def __len__(self):
+        return len(self._broken)
+
+    def get(self, guild_id: int) -> Optional[GuildHealth]:
+        """Get the health entry for a broken guild, or None if it's healthy."""
+        return self._broken.get(guild_id)
+
+    def should_attempt(self, guild_id: int) -> bool:
+        """Whether delivery to the guild should be attempted now."""
+        entry = self._broken.get(guild_id)
+        return entry is None or self._clock() >= entry.retry_at
+
+    def record_success(self, guild_id: int):
+        """Mark a guild healthy after a successful delivery."""
+        self._broken.pop(guild_id, None)
+
+    def record_failure(self, guild_id: int, status: str) -> GuildHealth:
+        """
+        Record a lasting delivery failure and schedule the next re-probe.
+
+        Args:
+            guild_id: The guild that failed
+            status: The fan-out status describing the failure
+
+        Returns:
+            GuildHealth: The updated entry
+        """
+        entry = self._broken.get(guild_id)
+        failures = entry.failures + 1 if entry else 1
+        delay = min(self._base_delay * 2 ** (failures - 1), self._max_delay)
+        entry = GuildHealth(status=status, failures=failures, retry_at=self._clock() + delay)
+        self._broken[guild_id] = entry
+        return entry
+
+    def revive(self, guild_id: int):
+        """Forget a guild's failures so the next alert probes it immediately."""
+        if self._broken.pop(guild_id, None) is not None:
+            print(f"Reviving alert delivery for guild {guild_id}")
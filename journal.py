@@ -0,0 +1,249 @@
+"""Append-only journal plus compacted snapshot for persisting scheduled announcements."""
+import asyncio
+import json
+import os
+import threading
+from typing import Optional
+
+from constants import JOURNAL_COMPACT_RECORDS
+from writebehind import WriteBehind
+
+
+class AnnouncementJournal:
+    """
+    Persists the schedule as a snapshot file plus a journal of changes since.
+
+    Each change appends one small JSON line (add, cancel or fired) to
+    ``<path>.journal``, so persisting costs the size of the change, not the
+    schedule. Once the journal holds JOURNAL_COMPACT_RECORDS records, or as
+    many records as there are announcements if that is more, it is folded
+    into a fresh snapshot, written to a temporary file and renamed over the
+    old one. Records carry sequence numbers and the snapshot
+    remembers the last one it includes, so a crash between the rename and
+    truncating the journal can't apply a record twice.
+
+    While an event loop is running, changes made in one loop iteration are
+    handed to a WriteBehind thread as one batch (with one fsync), and batches
+    still queued there are merged; otherwise they are written immediately.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        compact_after: int = JOURNAL_COMPACT_RECORDS,
+        writer: Optional[WriteBehind] = None
+    ):
+        """
+        Initialize the journal.
+
+        Args:
+            path: Snapshot file; the journal is kept next to it
+            compact_after: Journal records after which a new snapshot is taken
+            writer: Background writer shared with other state files (a private one is built if omitted)
+        """
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self._compact_after = compact_after
+        self.writer = writer if writer is not None else WriteBehind()
+        self._seq = 0
+        self._journal_records = 0
+        # pending changes are handed over to the writer thread under this lock
+        self._lock = threading.Lock()
+        self._buffer: list[str] = []
+        self._snapshot = None
+        self._submit_scheduled = False
+
+    def load(self) -> list[dict]:
+        """
+        Read the snapshot and replay the journal on top of it.
+
+        A torn last line (the process died mid-append) is ignored and cut
+        off the journal, so later appends start on a clean line.
+
+        Returns:
+            list: Announcement dicts, as produced by ScheduledAnnouncement.to_dict
+
+        Raises:
+            json.JSONDecodeError: The snapshot itself is corrupt
+        """
+        items = []
+        snapshot_seq = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            # older files are a plain list of announcements
+            if isinstance(data, dict):
+                snapshot_seq = data["seq"]
+                items = data["announcements"]
+            else:
+                items = data
+        self._seq = snapshot_seq
+        # keyed by id so replaying a removal doesn't scan the whole schedule;
+        # announcements from before ids existed get a placeholder key
+        items = {item.get("id") or f"legacy-{i}": item for i, item in enumerate(items)}
+
+        if os.path.exists(self.journal_path):
+            good_end = 0
+            torn = False
+            newline_missing = False
+            with open(self.journal_path, 'rb') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError):
+                        torn = True
+                        break
+                    good_end += len(line)
+                    newline_missing = not line.endswith(b"\n")
+                    self._journal_records += 1
+                    self._seq = max(self._seq, record["seq"])
+                    if record["seq"] > snapshot_seq:
+                        apply_record(items, record)
+            # the next append must start on a fresh line, or it would be
+            # glued to the fragment and lost along with everything after it
+            if torn:
+                print(f"Dropping torn record at the end of {self.journal_path}")
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good_end)
+            elif newline_missing:
+                with open(self.journal_path, 'ab') as f:
+                    f.write(b"\n")
+        return list(items.values())
+
+    def exists(self) -> bool:
+        """Whether there is anything on disk to load."""
+        return os.path.exists(self.path) or os.path.exists(self.journal_path)
+
+    def append(self, op: str, **fields):
+        """
+        Record one change to the schedule.
+
+        Args:
+            op: "add" (with announcement=dict), "cancel" (with event_type),
+                "remove" / "fired" (with the announcement's id), or
+                "replace_group" (with group_id and announcements=list of dicts)
+            **fields: The record's fields
+        """
+        self._seq += 1
+        line = json.dumps({"seq": self._seq, "op": op, **fields}, ensure_ascii=False)
+        with self._lock:
+            self._buffer.append(line)
+        self._journal_records += 1
+        self._schedule_flush()
+
+    def needs_compaction(self, live_count: int = 0) -> bool:
+        """
+        Whether the journal has grown enough to fold into a snapshot.
+
+        Args:
+            live_count: Current number of scheduled announcements; the journal
+                may grow to this many records too, so the O(n) snapshot is
+                amortized over at least n changes
+        """
+        return self._journal_records >= max(self._compact_after, live_count)
+
+    def compact(self, items: list[dict]):
+        """
+        Replace the snapshot with the given schedule and empty the journal.
+
+        Args:
+            items: Every scheduled announcement, as dicts
+        """
+        # the snapshot covers everything buffered so far
+        with self._lock:
+            self._buffer = []
+            self._snapshot = (self._seq, items)
+        self._journal_records = 0
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # keep the order with batches the writer thread still has queued
+            self.writer.wait()
+            self._write_pending()
+            return
+        # let the rest of this loop iteration's changes join the batch
+        if not self._submit_scheduled:
+            self._submit_scheduled = True
+            loop.call_soon(self._submit)
+
+    def _submit(self):
+        self._submit_scheduled = False
+        self.writer.submit(self.path, self._write_pending)
+
+    def _write_pending(self):
+        """
+        Write whatever is pending (runs on the writer thread).
+
+        If the write fails, the snapshot and records are put back in front
+        of anything pending since, so the next write still includes them.
+        """
+        snapshot, lines = self._take_pending()
+        try:
+            self._write(snapshot, lines)
+        except Exception:
+            with self._lock:
+                # a newer snapshot already covers everything that failed
+                if self._snapshot is None:
+                    self._snapshot = snapshot
+                    self._buffer = lines + self._buffer
+            raise
+
+    async def flush(self):
+        """Wait until every change so far is on disk."""
+        while self._submit_scheduled:
+            await asyncio.sleep(0)
+        await self.writer.flush()
+
+    def _take_pending(self):
+        """Hand the pending snapshot and records to a writer."""
+        with self._lock:
+            snapshot, self._snapshot = self._snapshot, None
+            lines, self._buffer = self._buffer, []
+        return snapshot, lines
+
+    def _write(self, snapshot, lines):
+        """Write a snapshot, if any, then journal records."""
+        if snapshot is not None:
+            self._write_snapshot(*snapshot)
+        if lines:
+            with open(self.journal_path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _write_snapshot(self, seq: int, items: list[dict]):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"seq": seq, "announcements": items}, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        # records up to seq are now in the snapshot and skipped on load
+        open(self.journal_path, 'w', encoding='utf-8').close()
+
+
+def apply_record(items: dict[str, dict], record: dict):
+    """Apply one journal record to announcement dicts keyed by id, in place."""
+    if record["op"] == "add":
+        announcement = record["announcement"]
+        items[announcement.get("id") or f"legacy-seq-{record['seq']}"] = announcement
+    elif record["op"] == "cancel":
+        for key in [key for key, item in items.items() if item["event_type"] == record["event_type"]]:
+            del items[key]
+    elif record["op"] == "replace_group":
+        for key in [key for key, item in items.items() if item.get("group_id") == record["group_id"]]:
+            del items[key]
+        for announcement in record["announcements"]:
+            items[announcement["id"]] = announcement
+    elif record["op"] in ("remove", "fired") and "id" in record:
+        items.pop(record["id"], None)
+    elif record["op"] == "fired":
+        # records from before announcements had ids
+        for key, item in items.items():
+            if (item["event_type"] == record["event_type"]
+                    and item["announcement_time"] == record["announcement_time"]):
+                del items[key]
+                break
@@ -0,0 +1,74 @@
+"""Event loop lag monitor, to catch callbacks that block the loop."""
+import asyncio
+import time
+
+from constants import LOOP_LAG_CHECK_SECONDS, LOOP_LAG_WARN_SECONDS
+from metrics import metrics
+
+
+class LoopLagMonitor:
+    """
+    Sleeps in a loop and reports how late the event loop wakes it up.
+
+    Anything that blocks the loop (file I/O, heavy CPU work) delays every
+    other task, heartbeats included, by the same amount, so lateness past
+    the threshold is printed and counted. Optionally turns on asyncio's debug
+    mode, which also logs the name of each slow callback (costly, so meant
+    for development).
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_LAG_CHECK_SECONDS,
+        threshold: float = LOOP_LAG_WARN_SECONDS,
+        clock=time.monotonic
+    ):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between checks
+            threshold: Lag in seconds worth reporting
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self.interval = interval
+        self.threshold = threshold
+        self._clock = clock
+        self._task = None
+
+    def start(self, name_callbacks: bool = False):
+        """
+        Start monitoring the running event loop.
+
+        Args:
+            name_callbacks: Also log each callback slower than the threshold by name (asyncio debug mode)
+        """
+        loop = asyncio.get_running_loop()
+        if name_callbacks:
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.threshold
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = self._clock()
+            await asyncio.sleep(self.interval)
+            self.record(self._clock() - started - self.interval)
+
+    def record(self, lag: float):
+        """
+        Record one measurement.
+
+        Args:
+            lag: Seconds the loop woke the monitor late
+        """
+        metrics.observe("loop_lag_seconds", lag)
+        if lag >= self.threshold:
+            metrics.increment("loop_lag_warnings")
+            print(f"Event loop was blocked for {lag * 1000:.0f} ms")
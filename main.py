@@ -1,9 +1,26 @@
 import discord
 from discord.ext import commands
 import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import queue
 from dotenv import load_dotenv
 import os
-from event_handlers import handle_guild_join, handle_ready, handle_raw_reaction_add, handle_raw_reaction_remove, handle_message
+from constants import LOG_FILE, LOG_MAX_BYTES, LOG_BACKUP_COUNT
+from event_handlers import (
+    handle_guild_join,
+    handle_guild_remove,
+    handle_guild_channel_create,
+    handle_guild_channel_update,
+    handle_guild_channel_delete,
+    handle_guild_role_create,
+    handle_guild_role_update,
+    handle_guild_role_delete,
+    handle_member_update,
+    handle_ready,
+    handle_raw_reaction_add,
+    handle_raw_reaction_remove,
+    handle_message,
+)
 
 
 load_dotenv()
@@ -11,7 +28,14 @@ token = os.getenv("DISCORD_TOKEN")
 admin_id = int(os.getenv("ADMIN_USER_ID"))
 ENVIRONMENT = os.getenv("ENVIRONMENT")
 
-handler = logging.FileHandler(filename="discord.log", encoding="utf-8", mode="w")
+# discord.py logs at DEBUG level from the event loop; records are queued there
+# and written (and rotated) by a listener thread so the loop never waits on disk
+log_queue = queue.SimpleQueue()
+file_handler = RotatingFileHandler(
+    filename=LOG_FILE, encoding="utf-8", maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+)
+log_listener = QueueListener(log_queue, file_handler)
+handler = QueueHandler(log_queue)
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -28,7 +52,47 @@ async def on_ready():
 
 @bot.event
 async def on_guild_join(guild):
-    await handle_guild_join(guild)
+    await handle_guild_join(bot, guild)
+
+
+@bot.event
+async def on_guild_remove(guild):
+    await handle_guild_remove(bot, guild)
+
+
+@bot.event
+async def on_guild_channel_create(channel):
+    await handle_guild_channel_create(bot, channel)
+
+
+@bot.event
+async def on_guild_channel_update(before, after):
+    await handle_guild_channel_update(bot, before, after)
+
+
+@bot.event
+async def on_guild_channel_delete(channel):
+    await handle_guild_channel_delete(bot, channel)
+
+
+@bot.event
+async def on_guild_role_create(role):
+    await handle_guild_role_create(bot, role)
+
+
+@bot.event
+async def on_guild_role_update(before, after):
+    await handle_guild_role_update(bot, before, after)
+
+
+@bot.event
+async def on_guild_role_delete(role):
+    await handle_guild_role_delete(bot, role)
+
+
+@bot.event
+async def on_member_update(before, after):
+    await handle_member_update(bot, before, after)
 
 
 @bot.event
@@ -46,4 +110,12 @@ async def on_message(message):
     await handle_message(bot, message, admin_id)
 
 
-bot.run(token, log_handler=handler, log_level=logging.DEBUG)
+log_listener.start()
+try:
+    bot.run(token, log_handler=handler, log_level=logging.DEBUG)
+finally:
+    # finish any state writes still queued
+    writer = getattr(bot, 'writer', None)
+    if writer is not None:
+        writer.close()
+    log_listener.stop()
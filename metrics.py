@@ -0,0 +1,58 @@
+"""In-process counters and timings for the bot's delivery paths."""
+from collections import Counter
+from dataclasses import dataclass
+
+
+@dataclass
+class Timing:
+    """Running count, total and maximum of an observed value."""
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+
+
+class Metrics:
+    """Named counters and timings, readable through the !stats admin command."""
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.timings: dict[str, Timing] = {}
+
+    def increment(self, name: str, amount: int = 1):
+        """Add to a counter."""
+        self.counters[name] += amount
+
+    def observe(self, name: str, value: float):
+        """Record one observation of a timing."""
+        timing = self.timings.get(name)
+        if timing is None:
+            timing = self.timings[name] = Timing()
+        timing.observe(value)
+
+    def reset(self):
+        """Clear all counters and timings."""
+        self.counters.clear()
+        self.timings.clear()
+
+    def format(self) -> str:
+        """Render every counter and timing, one per line."""
+        lines = [f"{name}: {count}" for name, count in sorted(self.counters.items())]
+        lines += [
+            f"{name}: n={timing.count} mean={timing.mean:.3f} max={timing.max:.3f}"
+            for name, timing in sorted(self.timings.items())
+        ]
+        return "\n".join(lines) if lines else "No metrics recorded yet."
+
+
+# shared registry for the whole process
+metrics = Metrics()
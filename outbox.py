@@ -0,0 +1,266 @@
+"""Durable outbox of alert deliveries, so a restart mid fan-out doesn't lose the remaining guilds."""
+import asyncio
+import json
+import math
+import random
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, replace
+from datetime import datetime
+
+import discord
+from constants import (
+    EVENT_LEAD_MINUTES,
+    OUTBOX_EVENT_MARGIN_SECONDS,
+    OUTBOX_FILE,
+    OUTBOX_MIN_WINDOW_SECONDS,
+    RETRY_ATTEMPTS,
+    RETRY_BASE_SECONDS,
+    RETRY_MAX_SECONDS,
+)
+from alerts import AlertEvent
+from fanout import ERROR
+from metrics import metrics
+
+
+def useful_window(event: AlertEvent) -> float:
+    """
+    Seconds after classification during which an alert is still worth delivering.
+
+    Args:
+        event: The classified AlertEvent
+
+    Returns:
+        float: Until OUTBOX_EVENT_MARGIN_SECONDS before the event starts, or
+            OUTBOX_MIN_WINDOW_SECONDS for alerts without a lead time
+    """
+    lead_minutes = EVENT_LEAD_MINUTES.get(event.event_type)
+    if not lead_minutes:
+        return OUTBOX_MIN_WINDOW_SECONDS
+    return max(lead_minutes * 60 - OUTBOX_EVENT_MARGIN_SECONDS, 0)
+
+
+def retime_event(event: AlertEvent, elapsed: float) -> AlertEvent:
+    """
+    Update the minutes left in an alert's body for a late delivery.
+
+    Args:
+        event: The classified AlertEvent, whose body counts down from its lead time
+        elapsed: Seconds since it was classified
+
+    Returns:
+        AlertEvent: The event, with e.g. "starts in 5 minutes" turned into
+            "starts in 2 minutes" (unchanged if no time has been lost)
+    """
+    lead_minutes = EVENT_LEAD_MINUTES.get(event.event_type)
+    if not lead_minutes:
+        return event
+    minutes_left = max(math.ceil((lead_minutes * 60 - elapsed) / 60), 1)
+    if minutes_left >= lead_minutes:
+        return event
+    left = f"{minutes_left} minute" if minutes_left == 1 else f"{minutes_left} minutes"
+    return replace(event, body=re.sub(rf"\b{lead_minutes} minutes\b", left, event.body, count=1))
+
+
+def _encode_event(event: AlertEvent) -> str:
+    data = asdict(event)
+    if event.next_event_time is not None:
+        data["next_event_time"] = event.next_event_time.isoformat()
+    return json.dumps(data)
+
+
+def _decode_event(text: str) -> AlertEvent:
+    data = json.loads(text)
+    if data.get("next_event_time"):
+        data["next_event_time"] = datetime.fromisoformat(data["next_event_time"])
+    return AlertEvent(**data)
+
+
+class AlertOutbox:
+    """
+    SQLite-backed (WAL mode) record of which guilds still need an alert.
+
+    A pending row is written for every target guild when an alert is
+    classified and removed once that guild has been delivered to or has
+    failed for a lasting reason. Rows left behind by a crash or restart are
+    handed back by pending() until the alert's useful window has passed,
+    with the minutes left in their text brought up to date.
+
+    The methods block on SQLite commits, so the bot calls them through
+    asyncio.to_thread; a lock keeps those threads off the connection at once.
+    """
+
+    def __init__(self, path: str = OUTBOX_FILE, clock=time.time):
+        """
+        Initialize the outbox, creating the database if needed.
+
+        Args:
+            path: SQLite database file
+            clock: Wall clock function, since rows must outlive the process (overridable for tests)
+        """
+        self._clock = clock
+        self._in_flight: set[int] = set()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL survives process crashes without an fsync per write
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS alerts ("
+                "id INTEGER PRIMARY KEY, event TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS deliveries ("
+                "alert_id INTEGER NOT NULL, guild_id INTEGER NOT NULL, "
+                "PRIMARY KEY (alert_id, guild_id)) WITHOUT ROWID"
+            )
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def record(self, event: AlertEvent, guild_ids) -> int:
+        """
+        Store an alert and a pending delivery for each target guild.
+
+        Args:
+            event: The classified AlertEvent
+            guild_ids: Ids of the guilds the alert will be delivered to
+
+        Returns:
+            int: The outbox id of the alert
+        """
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                "INSERT INTO alerts (event, expires_at) VALUES (?, ?)",
+                (_encode_event(event), self._clock() + useful_window(event)),
+            )
+            alert_id = cursor.lastrowid
+            self._db.executemany(
+                "INSERT OR IGNORE INTO deliveries (alert_id, guild_id) VALUES (?, ?)",
+                [(alert_id, guild_id) for guild_id in guild_ids],
+            )
+            self._in_flight.add(alert_id)
+        return alert_id
+
+    def claim(self, alert_id: int):
+        """Mark a replayed alert as being delivered, so pending() doesn't hand it out twice."""
+        with self._lock:
+            self._in_flight.add(alert_id)
+
+    def mark_done(self, alert_id: int, guild_id: int):
+        """Remove a guild's pending delivery after it was sent."""
+        with self._lock, self._db:
+            self._db.execute(
+                "DELETE FROM deliveries WHERE alert_id = ? AND guild_id = ?", (alert_id, guild_id)
+            )
+
+    def finish(self, alert_id: int, results: dict):
+        """
+        Settle an alert after its fan-out.
+
+        Deliveries that errored stay pending for the next replay; everything
+        else (sent, or skipped for a lasting reason) is removed.
+
+        Args:
+            alert_id: The outbox id of the alert
+            results: Mapping of guild id to DeliveryResult, as returned by fan_out
+        """
+        retry = [guild_id for guild_id, result in results.items() if result.status == ERROR]
+        placeholders = ", ".join("?" * len(retry))
+        with self._lock, self._db:
+            self._db.execute(
+                f"DELETE FROM deliveries WHERE alert_id = ? AND guild_id NOT IN ({placeholders})",
+                (alert_id, *retry),
+            )
+            self._db.execute(
+                "DELETE FROM alerts WHERE id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM deliveries WHERE alert_id = ?)",
+                (alert_id, alert_id),
+            )
+            self._in_flight.discard(alert_id)
+
+    def discard(self, alert_ids):
+        """
+        Drop alerts whose content went out another way, e.g. merged into a digest.
+
+        Args:
+            alert_ids: Outbox ids of the alerts
+        """
+        alert_ids = list(alert_ids)
+        placeholders = ", ".join("?" * len(alert_ids))
+        with self._lock, self._db:
+            self._db.execute(f"DELETE FROM deliveries WHERE alert_id IN ({placeholders})", alert_ids)
+            self._db.execute(f"DELETE FROM alerts WHERE id IN ({placeholders})", alert_ids)
+            self._in_flight.difference_update(alert_ids)
+
+    def pending(self) -> list:
+        """
+        Get the alerts that still have undelivered guilds, dropping expired ones.
+
+        Returns:
+            list: (alert_id, AlertEvent, set of guild ids) tuples, oldest first
+        """
+        with self._lock:
+            with self._db:
+                expired = self._db.execute(
+                    "DELETE FROM alerts WHERE expires_at <= ?", (self._clock(),)
+                ).rowcount
+                self._db.execute(
+                    "DELETE FROM deliveries WHERE alert_id NOT IN (SELECT id FROM alerts)"
+                )
+            guilds: dict[int, set] = {}
+            for alert_id, guild_id in self._db.execute("SELECT alert_id, guild_id FROM deliveries"):
+                guilds.setdefault(alert_id, set()).add(guild_id)
+            alerts = []
+            for alert_id, text, expires_at in self._db.execute("SELECT id, event, expires_at FROM alerts ORDER BY id"):
+                if alert_id not in guilds or alert_id in self._in_flight:
+                    continue
+                # replays say how long is actually left, not the original lead time
+                event = _decode_event(text)
+                elapsed = self._clock() - (expires_at - useful_window(event))
+                alerts.append((alert_id, retime_event(event, elapsed), guilds[alert_id]))
+        if expired:
+            print(f"Dropped {expired} expired alert(s) from the outbox")
+        return alerts
+
+
+def is_transient(error: Exception) -> bool:
+    """Whether a send failure is worth retrying (Discord 5xx or a timeout)."""
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return isinstance(error, discord.HTTPException) and error.status >= 500
+
+
+async def with_retries(
+    send,
+    attempts: int = RETRY_ATTEMPTS,
+    base_delay: float = RETRY_BASE_SECONDS,
+    max_delay: float = RETRY_MAX_SECONDS,
+):
+    """
+    Call a send coroutine function, retrying transient failures.
+
+    Retries sleep for a random time up to an exponentially growing delay
+    (full jitter), so guilds that failed together don't retry together.
+
+    Args:
+        send: Coroutine function taking no arguments
+        attempts: Total number of tries
+        base_delay: Upper bound of the first retry's delay in seconds
+        max_delay: Upper bound of any retry's delay in seconds
+
+    Returns:
+        Whatever send returns
+    """
+    for attempt in range(attempts):
+        try:
+            return await send()
+        except Exception as e:
+            if attempt == attempts - 1 or not is_transient(e):
+                raise
+            metrics.increment("send_retries")
+            await asyncio.sleep(random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
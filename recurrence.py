@@ -0,0 +1,146 @@
+"""Recurrence rules for events that run on a fixed rotation."""
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Optional
+
+
+# a seasonal rule gives up after skipping this many out-of-season occurrences
+MAX_SEASON_JUMPS = 3
+
+
+@dataclass(frozen=True)
+class IntervalRule:
+    """
+    Every ``minutes`` minutes counted from ``anchor``, optionally until a cutoff.
+
+    Args:
+        minutes: Minutes between occurrences
+        anchor: Any one occurrence
+        until: No occurrences after this time
+    """
+    minutes: int
+    anchor: datetime
+    until: Optional[datetime] = None
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """The first occurrence strictly after the given time, or None if there isn't one."""
+        step = timedelta(minutes=self.minutes)
+        if after < self.anchor:
+            candidate = self.anchor
+        else:
+            candidate = self.anchor + step * ((after - self.anchor) // step + 1)
+        if self.until is not None and candidate > self.until:
+            return None
+        return candidate
+
+    def to_dict(self):
+        return {
+            "kind": "interval",
+            "minutes": self.minutes,
+            "anchor": self.anchor.isoformat(),
+            "until": self.until.isoformat() if self.until else None
+        }
+
+
+@dataclass(frozen=True)
+class DailyRule:
+    """
+    Fixed times of day, optionally only on some weekdays.
+
+    Args:
+        times: Times of day the event starts
+        weekdays: Weekdays it runs on (Monday is 0), or None for every day
+    """
+    times: tuple[time, ...]
+    weekdays: Optional[frozenset[int]] = None
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """The first occurrence strictly after the given time, or None if there isn't one."""
+        for days in range(8):
+            day = after.date() + timedelta(days=days)
+            if self.weekdays is not None and day.weekday() not in self.weekdays:
+                continue
+            for start in sorted(self.times):
+                candidate = datetime.combine(day, start)
+                if candidate > after:
+                    return candidate
+        return None
+
+    def to_dict(self):
+        return {
+            "kind": "daily",
+            "times": [start.isoformat() for start in self.times],
+            "weekdays": sorted(self.weekdays) if self.weekdays is not None else None
+        }
+
+
+@dataclass(frozen=True)
+class SeasonalRule:
+    """
+    Another rule, limited to a yearly date window (which may wrap past New Year).
+
+    Args:
+        rule: The rule giving occurrences within the season
+        start: (month, day) the season starts, inclusive
+        end: (month, day) the season ends, inclusive
+    """
+    rule: object
+    start: tuple[int, int]
+    end: tuple[int, int]
+
+    def in_season(self, moment: datetime) -> bool:
+        month_day = (moment.month, moment.day)
+        if self.start <= self.end:
+            return self.start <= month_day <= self.end
+        return month_day >= self.start or month_day <= self.end
+
+    def next_after(self, after: datetime) -> Optional[datetime]:
+        """The first in-season occurrence strictly after the given time, or None if there isn't one."""
+        candidate = self.rule.next_after(after)
+        for _ in range(MAX_SEASON_JUMPS):
+            if candidate is None or self.in_season(candidate):
+                return candidate
+            season_start = datetime(candidate.year, *self.start)
+            if season_start <= candidate:
+                season_start = datetime(candidate.year + 1, *self.start)
+            candidate = self.rule.next_after(season_start - timedelta(microseconds=1))
+        return candidate if candidate is not None and self.in_season(candidate) else None
+
+    def to_dict(self):
+        return {
+            "kind": "seasonal",
+            "rule": self.rule.to_dict(),
+            "start": list(self.start),
+            "end": list(self.end)
+        }
+
+
+def rule_from_dict(data: dict):
+    """
+    Rebuild a recurrence rule from its to_dict() form.
+
+    Args:
+        data: Dictionary loaded from JSON
+
+    Returns:
+        IntervalRule, DailyRule or SeasonalRule
+    """
+    if data["kind"] == "interval":
+        return IntervalRule(
+            minutes=data["minutes"],
+            anchor=datetime.fromisoformat(data["anchor"]),
+            until=datetime.fromisoformat(data["until"]) if data.get("until") else None
+        )
+    if data["kind"] == "daily":
+        weekdays = data.get("weekdays")
+        return DailyRule(
+            times=tuple(time.fromisoformat(start) for start in data["times"]),
+            weekdays=frozenset(weekdays) if weekdays is not None else None
+        )
+    if data["kind"] == "seasonal":
+        return SeasonalRule(
+            rule=rule_from_dict(data["rule"]),
+            start=tuple(data["start"]),
+            end=tuple(data["end"])
+        )
+    raise ValueError(f"Unknown recurrence rule: {data['kind']}")
@@ -0,0 +1,82 @@
+"""Handle the reminder commands any user can send via DM."""
+
+from constants import REMINDER_MAX_LEAD_MINUTES
+from announcement_templates import DM_REMINDER_TEMPLATES
+from dispatcher import dispatch
+from reminders import ReminderSubscriptions
+
+
+def reminder_help() -> str:
+    """Usage text listing the event types that can be reminded about."""
+    event_types = ", ".join(sorted(DM_REMINDER_TEMPLATES))
+    return (
+        "Get a DM before scheduled events:\n"
+        f"`!remind <event> <minutes>` (1-{REMINDER_MAX_LEAD_MINUTES} minutes before)\n"
+        "`!unremind <event>`\n"
+        "`!reminders` to list yours\n"
+        f"Events: {event_types}"
+    )
+
+
+def refresh_reminders(bot, event_type):
+    """Let the scheduler add or drop DM reminder timers after subscriptions changed."""
+    scheduler = getattr(bot, 'scheduler', None)
+    if scheduler is not None:
+        scheduler.refresh_dm_reminders(event_type)
+
+
+async def handle_reminder_command(message, bot) -> bool:
+    """
+    Handle !remind, !unremind and !reminders.
+    
+    Args:
+        message: The Discord message object
+        bot: The Discord bot instance
+    
+    Returns:
+        bool: True if the message was a reminder command
+    """
+    words = message.content.lower().split()
+    if not words or words[0] not in ('!remind', '!unremind', '!reminders'):
+        return False
+    
+    reminders = getattr(bot, 'reminders', None)
+    if not isinstance(reminders, ReminderSubscriptions):
+        await dispatch(bot, message.channel, "Reminders aren't available right now. Please try again later.")
+        return True
+    
+    user_id = message.author.id
+    if words[0] == '!reminders':
+        subscriptions = reminders.for_user(user_id)
+        if not subscriptions:
+            await dispatch(bot, message.channel, "You don't have any reminders.\n\n" + reminder_help())
+            return True
+        lines = [f"**{event_type}**: {lead} minutes before" for event_type, lead in sorted(subscriptions.items())]
+        await dispatch(bot, message.channel, "Your reminders:\n" + "\n".join(lines))
+        return True
+    
+    event_type = words[1].replace('-', '_') if len(words) > 1 else None
+    if event_type not in DM_REMINDER_TEMPLATES:
+        await dispatch(bot, message.channel, reminder_help())
+        return True
+    
+    if words[0] == '!unremind':
+        if reminders.unsubscribe(user_id, event_type):
+            refresh_reminders(bot, event_type)
+            await dispatch(bot, message.channel, f"You won't get {event_type} reminders any more.")
+        else:
+            await dispatch(bot, message.channel, f"You don't have a {event_type} reminder.")
+        return True
+    
+    try:
+        lead_minutes = int(words[2])
+    except (IndexError, ValueError):
+        lead_minutes = 0
+    if not 1 <= lead_minutes <= REMINDER_MAX_LEAD_MINUTES:
+        await dispatch(bot, message.channel, reminder_help())
+        return True
+    
+    reminders.subscribe(user_id, event_type, lead_minutes)
+    refresh_reminders(bot, event_type)
+    await dispatch(bot, message.channel, f"I'll DM you {lead_minutes} minutes before every {event_type}!")
+    return True
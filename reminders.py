@@ -0,0 +1,127 @@
+"""Per-user DM reminder subscriptions for scheduled events."""
+import sqlite3
+from typing import Optional
+
+from constants import REMINDERS_FILE
+from writebehind import WriteBehind
+
+
+class ReminderSubscriptions:
+    """
+    Which users want a DM how many minutes before which event types.
+
+    Stored in SQLite and mirrored in memory, indexed by event type and lead
+    time, so the scheduler only needs one timer per distinct lead time and
+    can fetch everyone due at that instant in one lookup. With a writer,
+    the SQLite commits happen on its thread; the in-memory index is updated
+    at once either way.
+    """
+
+    def __init__(self, path: str = REMINDERS_FILE, writer: Optional[WriteBehind] = None):
+        """
+        Initialize the store, loading existing subscriptions.
+
+        Args:
+            path: SQLite database file
+            writer: Background writer for the commits (they run inline if omitted)
+        """
+        self.path = path
+        self.writer = writer
+        # written from the writer thread, which runs one write at a time
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL survives process crashes without an fsync per write
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        with self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS reminders ("
+                "user_id INTEGER NOT NULL, event_type TEXT NOT NULL, lead_minutes INTEGER NOT NULL, "
+                "PRIMARY KEY (user_id, event_type)) WITHOUT ROWID"
+            )
+        self._by_user: dict[int, dict[str, int]] = {}
+        self._by_event: dict[str, dict[int, set[int]]] = {}
+        for user_id, event_type, lead_minutes in self._db.execute("SELECT * FROM reminders"):
+            self._index(user_id, event_type, lead_minutes)
+
+    def __len__(self):
+        return sum(len(events) for events in self._by_user.values())
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.wait()
+        self._db.close()
+
+    def _persist(self, user_id: int, event_type: str, write):
+        """Run a write for one subscription, in the background if there is a writer."""
+        if self.writer is None:
+            write()
+        else:
+            # a newer change to the same subscription replaces one still waiting
+            self.writer.submit((self.path, user_id, event_type), write)
+
+    def _write_subscribe(self, user_id: int, event_type: str, lead_minutes: int):
+        with self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reminders (user_id, event_type, lead_minutes) VALUES (?, ?, ?)",
+                (user_id, event_type, lead_minutes)
+            )
+
+    def _write_unsubscribe(self, user_id: int, event_type: str):
+        with self._db:
+            self._db.execute(
+                "DELETE FROM reminders WHERE user_id = ? AND event_type = ?", (user_id, event_type)
+            )
+
+    def _index(self, user_id: int, event_type: str, lead_minutes: int):
+        self._by_user.setdefault(user_id, {})[event_type] = lead_minutes
+        self._by_event.setdefault(event_type, {}).setdefault(lead_minutes, set()).add(user_id)
+
+    def _unindex(self, user_id: int, event_type: str) -> bool:
+        events = self._by_user.get(user_id, {})
+        lead_minutes = events.pop(event_type, None)
+        if lead_minutes is None:
+            return False
+        if not events:
+            del self._by_user[user_id]
+        leads = self._by_event[event_type]
+        leads[lead_minutes].discard(user_id)
+        if not leads[lead_minutes]:
+            del leads[lead_minutes]
+        return True
+
+    def subscribe(self, user_id: int, event_type: str, lead_minutes: int):
+        """
+        Remind a user before an event type, replacing their previous lead time.
+
+        Args:
+            user_id: The Discord user id
+            event_type: Type of event (e.g., "big_santa")
+            lead_minutes: Minutes before the event to send the DM
+        """
+        self._unindex(user_id, event_type)
+        self._index(user_id, event_type, lead_minutes)
+        self._persist(user_id, event_type, lambda: self._write_subscribe(user_id, event_type, lead_minutes))
+
+    def unsubscribe(self, user_id: int, event_type: str) -> bool:
+        """
+        Stop reminding a user before an event type.
+
+        Returns:
+            bool: True if the user was subscribed
+        """
+        if not self._unindex(user_id, event_type):
+            return False
+        self._persist(user_id, event_type, lambda: self._write_unsubscribe(user_id, event_type))
+        return True
+
+    def for_user(self, user_id: int) -> dict[str, int]:
+        """A user's subscriptions, as event type to lead minutes."""
+        return dict(self._by_user.get(user_id, {}))
+
+    def leads(self, event_type: str) -> set[int]:
+        """Every lead time someone wants for an event type."""
+        return set(self._by_event.get(event_type, {}))
+
+    def users(self, event_type: str, lead_minutes: int) -> list[int]:
+        """Everyone to DM the given minutes before an event type."""
+        return list(self._by_event.get(event_type, {}).get(lead_minutes, ()))
@@ -0,0 +1,168 @@
+"""Alert role changes from the setup message, each applied with one member edit."""
+import asyncio
+from dataclasses import dataclass, field
+
+import discord
+from constants import ROLE_UPDATE_DEBOUNCE_SECONDS
+from dm_worker import notify
+from metrics import metrics
+
+
+@dataclass
+class PendingRoleChanges:
+    """The alert roles one member asked to add or remove during a debounce window."""
+    guild: discord.Guild
+    member: discord.Member
+    # role name -> (role, readable name, whether the member wants it)
+    changes: dict[str, tuple] = field(default_factory=dict)
+
+
+class RoleUpdateBatcher:
+    """
+    Collects a member's subscribe/unsubscribe reactions and applies them together.
+
+    The first reaction opens a window; every reaction by the same member in
+    the same guild during it just updates the wanted state of that role, so
+    toggling an emoji back and forth cancels out. When the window closes the
+    net change is applied with one member edit and confirmed with one queued DM.
+    """
+
+    def __init__(self, bot, window: float = ROLE_UPDATE_DEBOUNCE_SECONDS):
+        """
+        Initialize the batcher.
+
+        Args:
+            bot: The Discord bot instance (for the dispatcher, routes and subscriber index)
+            window: Seconds to wait for more reactions before applying
+        """
+        self.bot = bot
+        self.window = window
+        self._pending: dict[tuple[int, int], PendingRoleChanges] = {}
+        self._timers: dict[tuple[int, int], asyncio.Task] = {}
+
+    def pending(self, guild_id: int, member_id: int) -> dict:
+        """The changes waiting for one member, as role name -> wanted."""
+        pending = self._pending.get((guild_id, member_id))
+        return {name: wanted for name, (_, _, wanted) in pending.changes.items()} if pending else {}
+
+    def submit(self, guild, member, role, readable_name: str, wanted: bool):
+        """
+        Record that a member wants a role added or removed.
+
+        Args:
+            guild: The Discord guild object
+            member: The member who reacted
+            role: The alert role
+            readable_name: Name of the alerts, for the confirmation DM
+            wanted: True to subscribe, False to unsubscribe
+        """
+        key = (guild.id, member.id)
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = PendingRoleChanges(guild=guild, member=member)
+        else:
+            metrics.increment("role_updates_coalesced")
+        # the newest member object has the freshest role list
+        pending.member = member
+        pending.changes[role.name] = (role, readable_name, wanted)
+        if key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._apply_later(key))
+
+    async def _apply_later(self, key):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            self._timers.pop(key, None)
+        pending = self._pending.pop(key, None)
+        if pending is not None:
+            await self.apply(pending)
+
+    async def flush(self):
+        """Apply every pending change now."""
+        for timer in list(self._timers.values()):
+            timer.cancel()
+        self._timers = {}
+        pending, self._pending = self._pending, {}
+        for changes in pending.values():
+            await self.apply(changes)
+
+    async def apply(self, pending: PendingRoleChanges):
+        """
+        Apply one member's net role changes with a single edit and confirm them.
+
+        Args:
+            pending: The member's collected changes
+        """
+        guild, member = pending.guild, pending.member
+        try:
+            added, removed = await edit_alert_roles(self.bot, guild, member, pending.changes.values())
+        except discord.Forbidden:
+            await notify(self.bot, member, f"Sorry, I don't have permission to change your alert roles in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission.")
+            return
+        except Exception as e:
+            await notify(self.bot, member, f"Sorry, there was an error changing your alert roles in {guild.name}. Please try again later.")
+            print(f"Error changing roles in {guild.name}: {e}")
+            return
+        if added or removed:
+            await notify(self.bot, member, describe_changes(added, removed, guild), key=("subscription", guild.id))
+
+
+async def edit_alert_roles(bot, guild, member, changes) -> tuple[list, list]:
+    """
+    Give a member exactly the wanted alert roles with one member edit.
+
+    Roles already in the wanted state are left alone, and nothing is sent if
+    none of them change. The subscriber index is updated after the edit.
+
+    Args:
+        bot: The Discord bot instance
+        guild: The Discord guild object
+        member: The member whose roles change (re-read from the guild's cache if it's there)
+        changes: Iterable of (role, readable name, wanted) tuples
+
+    Returns:
+        tuple: (added, removed) lists of (role, readable name)
+
+    Raises:
+        discord.HTTPException: The edit failed (on Forbidden the cached
+            permission checks for the guild are cleared first)
+    """
+    # the member passed in may be a snapshot from a reaction event, taken
+    # before roles given elsewhere since; editing from it would undo them
+    member = guild.get_member(member.id) or member
+    held = {role.id for role in member.roles}
+    added = [(role, name) for role, name, wanted in changes if wanted and role.id not in held]
+    removed = [(role, name) for role, name, wanted in changes if not wanted and role.id in held]
+    if not added and not removed:
+        metrics.increment("role_updates_noop")
+        return added, removed
+
+    removed_ids = {role.id for role, _ in removed}
+    roles = [role for role in member.roles if not role.is_default() and role.id not in removed_ids]
+    roles.extend(role for role, _ in added)
+    try:
+        await member.edit(roles=roles, reason="rm2 alerts subscription change")
+    except discord.Forbidden:
+        routes = getattr(bot, 'routes', None)
+        if routes is not None:
+            routes.invalidate_permissions(guild.id)
+        raise
+    metrics.increment("role_updates_applied")
+
+    subscribers = getattr(bot, 'subscribers', None)
+    if subscribers is not None:
+        for role, _ in added:
+            subscribers.add(guild.id, role.name, member.id)
+        for role, _ in removed:
+            subscribers.remove(guild.id, role.name, member.id)
+    return added, removed
+
+
+def describe_changes(added: list, removed: list, guild) -> str:
+    """Confirmation message for the (role, readable name) lists returned by edit_alert_roles."""
+    parts = []
+    if added:
+        parts.append("subscribed to " + ", ".join(name for _, name in added))
+    if removed:
+        parts.append("unsubscribed from " + ", ".join(name for _, name in removed))
+    return f"You have {' and '.join(parts)} alerts in {guild.name}!"
@@ -0,0 +1,164 @@
+"""Per-guild routing table for alert channels and role mentions."""
+from dataclasses import dataclass, field
+from typing import Optional
+
+import discord
+from constants import ALERTS_CHANNEL_NAME, ROLE_CONFIGS
+
+
+# names of every role an alert can mention
+ALERT_ROLE_NAMES = frozenset(role_name for role_name, _, _, _ in ROLE_CONFIGS)
+
+# whether the bot can add and remove an alert role (see manage_status)
+MANAGEABLE = "manageable"
+MISSING_PERMISSION = "missing_permission"
+ROLE_TOO_HIGH = "role_too_high"
+
+
+@dataclass
+class GuildRoute:
+    """Where alerts go in one guild, and its alert roles and their mentions."""
+    alert_channel: Optional[discord.abc.GuildChannel]
+    mentions: dict[str, str] = field(default_factory=dict)
+    # discord.py updates cached Role objects in place, so these stay current
+    roles: dict[str, discord.Role] = field(default_factory=dict)
+    # role name -> MANAGEABLE / MISSING_PERMISSION / ROLE_TOO_HIGH, filled on first use
+    manage: dict[str, str] = field(default_factory=dict)
+
+
+class GuildRoutingTable:
+    """
+    Maps guild id to the guild's alerts channel and alert role mentions.
+
+    Built when the bot is ready and kept up to date from the channel, role
+    and guild events, so fan-out only needs a dict lookup per guild instead
+    of scanning the guild's channels and roles for every alert.
+    """
+
+    def __init__(self):
+        self._routes: dict[int, GuildRoute] = {}
+
+    def __len__(self):
+        return len(self._routes)
+
+    def __contains__(self, guild_id):
+        return guild_id in self._routes
+
+    def rebuild(self, guilds):
+        """
+        Rebuild the routes for every guild from scratch.
+
+        Args:
+            guilds: Iterable of Discord guild objects
+        """
+        self._routes = {}
+        for guild in guilds:
+            self.refresh(guild)
+
+    def refresh(self, guild) -> GuildRoute:
+        """
+        Rebuild the route for a single guild.
+
+        Args:
+            guild: The Discord guild object
+
+        Returns:
+            GuildRoute: The new route for the guild
+        """
+        alert_channel = discord.utils.get(guild.channels, name=ALERTS_CHANNEL_NAME)
+        roles = {}
+        for role in guild.roles:
+            # keep the first role with a given name, like discord.utils.get
+            if role.name in ALERT_ROLE_NAMES and role.name not in roles:
+                roles[role.name] = role
+        mentions = {name: role.mention for name, role in roles.items()}
+        route = GuildRoute(alert_channel=alert_channel, mentions=mentions, roles=roles)
+        self._routes[guild.id] = route
+        return route
+
+    def remove(self, guild_id: int):
+        """Forget the route for a guild the bot has left."""
+        self._routes.pop(guild_id, None)
+
+    def route(self, guild) -> GuildRoute:
+        """Get the route for a guild, building it on first use."""
+        route = self._routes.get(guild.id)
+        if route is None:
+            route = self.refresh(guild)
+        return route
+
+    def alert_channel(self, guild):
+        """Get the guild's alerts channel, or None if it doesn't have one."""
+        return self.route(guild).alert_channel
+
+    def role_mention(self, guild, role_name: str) -> str:
+        """Get the mention for one of the guild's alert roles, or @role_name as a fallback."""
+        mention = self.route(guild).mentions.get(role_name)
+        if mention is None:
+            if role_name in ALERT_ROLE_NAMES:
+                return f"@{role_name}"
+            # not an alert role, so it isn't tracked; look it up directly
+            role = discord.utils.get(guild.roles, name=role_name)
+            return role.mention if role else f"@{role_name}"
+        return mention
+
+    def alert_role(self, guild, role_name: str) -> Optional[discord.Role]:
+        """Get one of the guild's alert roles, or None if it doesn't exist."""
+        return self.route(guild).roles.get(role_name)
+
+    def manage_status(self, guild, role_name: str) -> str:
+        """
+        Whether the bot can add and remove one of the guild's alert roles.
+
+        Worked out from the bot's permissions and role position the first
+        time it's needed, then cached until a role or the bot's roles change.
+
+        Args:
+            guild: The Discord guild object
+            role_name: Name of an alert role that exists in the guild
+
+        Returns:
+            str: MANAGEABLE, MISSING_PERMISSION or ROLE_TOO_HIGH
+        """
+        route = self.route(guild)
+        status = route.manage.get(role_name)
+        if status is None:
+            if not guild.me.guild_permissions.manage_roles:
+                status = MISSING_PERMISSION
+            elif route.roles[role_name].position >= guild.me.top_role.position:
+                status = ROLE_TOO_HIGH
+            else:
+                status = MANAGEABLE
+            route.manage[role_name] = status
+        return status
+
+    def invalidate_permissions(self, guild_id: int):
+        """Forget which roles the bot can manage in a guild, after its roles or their permissions changed."""
+        route = self._routes.get(guild_id)
+        if route is not None:
+            route.manage.clear()
+
+    def on_channel_change(self, channel, before_name: Optional[str] = None):
+        """
+        Refresh a guild's route if a channel event touched its alerts channel.
+
+        Args:
+            channel: The created, updated or deleted channel
+            before_name: The channel's name before an update, if any
+        """
+        if ALERTS_CHANNEL_NAME in (channel.name, before_name) and channel.guild.id in self._routes:
+            self.refresh(channel.guild)
+
+    def on_role_change(self, role, before_name: Optional[str] = None):
+        """
+        Refresh a guild's route if a role event touched one of its alert roles.
+
+        Args:
+            role: The created, updated or deleted role
+            before_name: The role's name before an update, if any
+        """
+        if (role.name in ALERT_ROLE_NAMES or before_name in ALERT_ROLE_NAMES) and role.guild.id in self._routes:
+            self.refresh(role.guild)
+        else:
+            # any role change can move positions or change the bot's permissions
+            self.invalidate_permissions(role.guild.id)
@@ -1,32 +1,61 @@
 """Scheduler for sending announcements before events occur."""
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
+import heapq
+import itertools
 import json
-import os
+import uuid
 import discord
 from discord.ext import tasks
-from constants import ALERTS_CHANNEL_NAME, RM2_SERVER_ID
 from utils import get_role_mention, get_next_event_time
+from fanout import fan_out, report_results
+from routing import GuildRoutingTable
+from dispatcher import OutboundDispatcher
+from guild_health import GuildHealthRegistry
+from subscribers import SubscriberIndex
+from alerts import priority_for_lead
+from metrics import metrics
+from constants import SCHEDULER_IDLE_SECONDS, CATCH_UP_GRACE_MINUTES, DEFAULT_CATCH_UP_GRACE_MINUTES
+from journal import AnnouncementJournal
+from writebehind import WriteBehind
+from recurrence import rule_from_dict
+from reminders import ReminderSubscriptions
+from dm_worker import DMWorkerPool
+from upcoming import UpcomingEvents
+from announcement_templates import DM_REMINDER_TEMPLATES
 
 
-@dataclass
+@dataclass(slots=True)
 class ScheduledAnnouncement:
-    """Represents a scheduled announcement."""
+    """Represents a scheduled announcement (slotted, since schedules can hold many thousands)."""
     event_type: str
     announcement_time: datetime
     event_time: datetime
     role_name: str
     message_template: str
+    guild_id: Optional[int] = None  # None announces to every guild
+    recurrence: Optional[object] = None  # rule from recurrence.py; the next occurrence is armed on firing
+    group_id: Optional[str] = None  # shared by the reminders of one logical event
+    kind: str = "channel"  # "channel" posts in alerts channels, "dm" DMs the users subscribed to this lead time
+    templates: Optional[dict] = None  # the group's lead time -> template map, so a rescheduled event gets every lead back
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
     
     def to_dict(self):
         """Convert to dictionary for JSON serialization."""
         return {
+            "id": self.id,
             "event_type": self.event_type,
             "announcement_time": self.announcement_time.isoformat(),
             "event_time": self.event_time.isoformat(),
             "role_name": self.role_name,
-            "message_template": self.message_template
+            "message_template": self.message_template,
+            "guild_id": self.guild_id,
+            "recurrence": self.recurrence.to_dict() if self.recurrence else None,
+            "group_id": self.group_id,
+            "kind": self.kind,
+            "templates": [[lead, template] for lead, template in self.templates.items()] if self.templates else None
         }
     
     @classmethod
@@ -37,8 +66,147 @@ class ScheduledAnnouncement:
             announcement_time=datetime.fromisoformat(data["announcement_time"]),
             event_time=datetime.fromisoformat(data["event_time"]),
             role_name=data["role_name"],
-            message_template=data["message_template"]
+            message_template=data["message_template"],
+            guild_id=data.get("guild_id"),
+            recurrence=rule_from_dict(data["recurrence"]) if data.get("recurrence") else None,
+            group_id=data.get("group_id"),
+            kind=data.get("kind", "channel"),
+            templates={lead: template for lead, template in data["templates"]} if data.get("templates") else None,
+            # announcements saved before ids existed get a fresh one
+            id=data.get("id") or uuid.uuid4().hex
         )
+    
+    @property
+    def lead_minutes(self) -> float:
+        """Minutes between the announcement and the event."""
+        return (self.event_time - self.announcement_time).total_seconds() / 60
+
+
+class AnnouncementQueue:
+    """
+    Scheduled announcements indexed by id, event type and target guild.
+
+    A min-heap ordered by announcement time finds and pops due announcements
+    in O(log n) each. Removal only drops the announcement from the indexes;
+    its heap entry is skipped when it reaches the top, and the heap is
+    rebuilt once more than half of it is stale. Also supports the list
+    operations callers use (len, indexing in due order, iteration, append).
+    ``version`` changes whenever an announcement is added or removed, so
+    views built from the queue know when to rebuild.
+    """
+
+    def __init__(self, announcements=()):
+        self._seq = itertools.count()
+        self._heap = []
+        self._by_id: dict[str, ScheduledAnnouncement] = {}
+        self._by_event_type: dict[str, set[str]] = {}
+        self._by_guild: dict[Optional[int], set[str]] = {}
+        self._by_group: dict[str, set[str]] = {}
+        # sequence number of each announcement's current heap entry
+        self._live_seq: dict[str, int] = {}
+        self.version = 0
+        for announcement in announcements:
+            self._heap.append(self._index(announcement))
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def __iter__(self):
+        return (entry[2] for entry in sorted(self._heap) if self._is_live(entry))
+
+    def __getitem__(self, index):
+        if index == 0:
+            self._drop_stale_top()
+            if self._heap:
+                return self._heap[0][2]
+        return list(self)[index]
+
+    def __contains__(self, announcement_id: str):
+        return announcement_id in self._by_id
+
+    def values(self):
+        """Every announcement in no particular order, without sorting the heap."""
+        return self._by_id.values()
+
+    def _is_live(self, entry) -> bool:
+        return self._live_seq.get(entry[2].id) == entry[1]
+
+    def _index(self, announcement: ScheduledAnnouncement):
+        """Add an announcement to the indexes and return its new heap entry."""
+        seq = next(self._seq)
+        self.version += 1
+        self._live_seq[announcement.id] = seq
+        self._by_id[announcement.id] = announcement
+        self._by_event_type.setdefault(announcement.event_type, set()).add(announcement.id)
+        self._by_guild.setdefault(announcement.guild_id, set()).add(announcement.id)
+        if announcement.group_id is not None:
+            self._by_group.setdefault(announcement.group_id, set()).add(announcement.id)
+        return (announcement.announcement_time, seq, announcement)
+
+    def _unindex(self, announcement: ScheduledAnnouncement):
+        self.version += 1
+        del self._by_id[announcement.id]
+        del self._live_seq[announcement.id]
+        indexes = [(self._by_event_type, announcement.event_type), (self._by_guild, announcement.guild_id)]
+        if announcement.group_id is not None:
+            indexes.append((self._by_group, announcement.group_id))
+        for index, key in indexes:
+            ids = index[key]
+            ids.discard(announcement.id)
+            if not ids:
+                del index[key]
+
+    def _drop_stale_top(self):
+        while self._heap and not self._is_live(self._heap[0]):
+            heapq.heappop(self._heap)
+
+    def append(self, announcement: ScheduledAnnouncement):
+        """Add an announcement, replacing any with the same id."""
+        if announcement.id in self._by_id:
+            self.remove(self._by_id[announcement.id])
+        heapq.heappush(self._heap, self._index(announcement))
+
+    def remove(self, announcement: ScheduledAnnouncement):
+        """Remove an announcement; raises ValueError if it isn't scheduled."""
+        if self._by_id.get(announcement.id) is not announcement:
+            raise ValueError("announcement not scheduled")
+        self._unindex(announcement)
+        if len(self._heap) > 2 * len(self._by_id) + 64:
+            self._heap = [entry for entry in self._heap if self._is_live(entry)]
+            heapq.heapify(self._heap)
+
+    def get(self, announcement_id: str) -> Optional[ScheduledAnnouncement]:
+        """Get an announcement by id."""
+        return self._by_id.get(announcement_id)
+
+    def with_event_type(self, event_type: str) -> list[ScheduledAnnouncement]:
+        """Every announcement for an event type."""
+        return [self._by_id[i] for i in self._by_event_type.get(event_type, ())]
+
+    def for_guild(self, guild_id: Optional[int]) -> list[ScheduledAnnouncement]:
+        """Every announcement targeting one guild (None for announcements to all guilds)."""
+        return [self._by_id[i] for i in self._by_guild.get(guild_id, ())]
+
+    def in_group(self, group_id: str) -> list[ScheduledAnnouncement]:
+        """Every pending reminder of one logical event."""
+        return [self._by_id[i] for i in self._by_group.get(group_id, ())]
+
+    def next_time(self) -> Optional[datetime]:
+        """Announcement time of the earliest announcement, or None if empty."""
+        self._drop_stale_top()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: datetime) -> list[ScheduledAnnouncement]:
+        """Remove and return every announcement due at or before now, earliest first."""
+        due = []
+        self._drop_stale_top()
+        while self._heap and self._heap[0][0] <= now:
+            announcement = heapq.heappop(self._heap)[2]
+            self._unindex(announcement)
+            due.append(announcement)
+            self._drop_stale_top()
+        return due
 
 
 class AnnouncementScheduler:
@@ -46,15 +214,40 @@ class AnnouncementScheduler:
     
     STORAGE_FILE = "scheduled_announcements.json"
     
-    def __init__(self, bot: discord.Client):
+    def __init__(
+        self,
+        bot: discord.Client,
+        routes: Optional[GuildRoutingTable] = None,
+        dispatcher: Optional[OutboundDispatcher] = None,
+        health: Optional[GuildHealthRegistry] = None,
+        subscribers: Optional[SubscriberIndex] = None,
+        reminders: Optional[ReminderSubscriptions] = None,
+        dm_workers: Optional[DMWorkerPool] = None,
+        writer: Optional[WriteBehind] = None
+    ):
         """
         Initialize the scheduler.
         
         Args:
             bot: The Discord bot client
+            routes: Routing table shared with the alert fan-out (a private one is built if omitted)
+            dispatcher: Outbound dispatcher shared with the alert fan-out (a private one is built if omitted)
+            health: Guild health registry shared with the alert fan-out (a private one is built if omitted)
+            subscribers: Optional subscriber index used to skip guilds where nobody holds the role
+            reminders: Optional per-user DM reminder subscriptions
+            dm_workers: Worker pool that sends reminder DMs (a private one is built if omitted)
+            writer: Background writer for the schedule files (a private one is built if omitted)
         """
         self.bot = bot
-        self.announcements: list[ScheduledAnnouncement] = []
+        self.routes = routes if routes is not None else GuildRoutingTable()
+        self.dispatcher = dispatcher if dispatcher is not None else OutboundDispatcher()
+        self.health = health if health is not None else GuildHealthRegistry()
+        self.subscribers = subscribers
+        self.reminders = reminders
+        self.dm_workers = dm_workers if dm_workers is not None else DMWorkerPool(bot)
+        self.announcements = AnnouncementQueue()
+        self.upcoming = UpcomingEvents(self)
+        self.journal = AnnouncementJournal(self.STORAGE_FILE, writer=writer)
         self.load_from_file()
         self.check_announcements.start()
     
@@ -64,8 +257,11 @@ class AnnouncementScheduler:
         announcement_time: datetime,
         event_time: datetime,
         role_name: str,
-        message_template: str
-    ):
+        message_template: str,
+        guild_id: Optional[int] = None,
+        replace: bool = True,
+        recurrence=None
+    ) -> ScheduledAnnouncement:
         """
         Schedule an announcement.
         
@@ -74,92 +270,437 @@ class AnnouncementScheduler:
             announcement_time: When to send the announcement
             event_time: When the actual event occurs
             role_name: Role to mention in the announcement
-            message_template: Message template (can include {role} and {timestamp} placeholders)
+            message_template: Message template (can include {role}, {timestamp} and
+                {minutes} placeholders; {minutes} is the time left when it's sent)
+            guild_id: Only announce in this guild (defaults to every guild)
+            replace: Cancel the event type's other announcements first; pass
+                False to keep several pending at once
+            recurrence: Optional rule from recurrence.py; each time the
+                announcement fires, one for the rule's next occurrence is
+                scheduled with the same lead time
+        
+        Returns:
+            ScheduledAnnouncement: The new announcement, whose id can be passed to cancel_id
         """
-        # Remove any existing announcement for this event type
-        self.cancel(event_type)
+        if replace:
+            self.cancel(event_type)
         
         announcement = ScheduledAnnouncement(
             event_type=event_type,
             announcement_time=announcement_time,
             event_time=event_time,
             role_name=role_name,
-            message_template=message_template
+            message_template=message_template,
+            guild_id=guild_id,
+            recurrence=recurrence
+        )
+        self._add(announcement)
+        return announcement
+    
+    def schedule_recurring(
+        self,
+        event_type: str,
+        rule,
+        lead_minutes: float,
+        role_name: str,
+        message_template: str,
+        guild_id: Optional[int] = None,
+        replace: bool = True
+    ) -> Optional[ScheduledAnnouncement]:
+        """
+        Schedule an announcement before every occurrence of a recurring event.
+        
+        Only the next occurrence is ever pending; firing it schedules the one
+        after, so a rule costs one entry no matter how far ahead it runs.
+        
+        Args:
+            event_type: Type of event (e.g., "big_santa")
+            rule: IntervalRule, DailyRule or SeasonalRule from recurrence.py
+            lead_minutes: Minutes before each occurrence to announce it
+            role_name: Role to mention in the announcement
+            message_template: Message template (can include {role} and {timestamp} placeholders)
+            guild_id: Only announce in this guild (defaults to every guild)
+            replace: Cancel the event type's other announcements first
+        
+        Returns:
+            ScheduledAnnouncement for the next occurrence, or None if the rule has none left
+        """
+        lead = timedelta(minutes=lead_minutes)
+        event_time = rule.next_after(datetime.now() + lead)
+        if event_time is None:
+            print(f"No upcoming occurrences of {event_type} to schedule")
+            return None
+        return self.schedule(
+            event_type=event_type,
+            announcement_time=event_time - lead,
+            event_time=event_time,
+            role_name=role_name,
+            message_template=message_template,
+            guild_id=guild_id,
+            replace=replace,
+            recurrence=rule
+        )
+    
+    def schedule_event(
+        self,
+        event_type: str,
+        event_time: datetime,
+        role_name: str,
+        templates: dict,
+        guild_id: Optional[int] = None,
+        replace: bool = True,
+        recurrence=None,
+        group_id: Optional[str] = None
+    ) -> str:
+        """
+        Schedule one reminder per lead time for an event, as one logical event.
+        
+        The reminders share a group id, so cancel_group and reschedule_event
+        update all of them at once through the group index, and the change
+        is journaled as a single record.
+        
+        Args:
+            event_type: Type of event (e.g., "big_santa")
+            event_time: When the event occurs
+            role_name: Role to mention in the reminders
+            templates: Mapping of lead time in minutes to message template
+            guild_id: Only announce in this guild (defaults to every guild)
+            replace: Cancel the event type's other announcements first
+            recurrence: Optional rule from recurrence.py that every reminder follows
+            group_id: Group to (re)use; a new one is created if omitted
+        
+        Returns:
+            str: The group id
+        """
+        if replace:
+            self.cancel(event_type)
+        group_id = group_id or uuid.uuid4().hex
+        
+        now = datetime.now()
+        reminders = []
+        for lead_minutes, template in templates.items():
+            reminder = ScheduledAnnouncement(
+                event_type=event_type,
+                announcement_time=event_time - timedelta(minutes=lead_minutes),
+                event_time=event_time,
+                role_name=role_name,
+                message_template=template,
+                guild_id=guild_id,
+                recurrence=recurrence,
+                group_id=group_id,
+                templates=templates
+            )
+            # a lead time that has already passed waits for the next occurrence, if any
+            if reminder.announcement_time <= now:
+                reminder = self._next_occurrence(reminder)
+            if reminder is not None:
+                reminders.append(reminder)
+        reminders += self._dm_reminders(event_type, event_time, role_name, guild_id, recurrence, group_id, templates)
+        self._replace_group(group_id, reminders)
+        return group_id
+    
+    def reschedule_event(self, group_id: str, event_time: datetime) -> bool:
+        """
+        Move every reminder of a logical event to a new event time.
+        
+        Args:
+            group_id: The id returned by schedule_event
+            event_time: The event's new time
+        
+        Returns:
+            bool: True if the event had pending reminders
+        """
+        reminders = self.announcements.in_group(group_id)
+        if not reminders:
+            return False
+        # DM reminders carry no role, so take the event's details from a channel reminder
+        channel_reminders = [a for a in reminders if a.kind == "channel"]
+        first = min(channel_reminders or reminders, key=lambda a: a.announcement_time)
+        # every lead time comes back, including ones already sent or skipped;
+        # DM reminders are rebuilt from the current subscriptions
+        templates = first.templates
+        if templates is None:
+            # reminders saved before groups kept their templates
+            templates = {a.lead_minutes: a.message_template for a in channel_reminders}
+        self.schedule_event(
+            event_type=first.event_type,
+            event_time=event_time,
+            role_name=first.role_name,
+            templates=templates,
+            guild_id=first.guild_id,
+            replace=False,
+            recurrence=first.recurrence,
+            group_id=group_id
+        )
+        return True
+    
+    def cancel_group(self, group_id: str) -> bool:
+        """
+        Cancel every reminder of a logical event.
+        
+        Args:
+            group_id: The id returned by schedule_event
+        
+        Returns:
+            bool: True if the event had pending reminders
+        """
+        if not self.announcements.in_group(group_id):
+            return False
+        self._replace_group(group_id, [])
+        return True
+    
+    def _dm_reminders(self, event_type, event_time, role_name, guild_id, recurrence, group_id, templates=None) -> list:
+        """One DM reminder per lead time anyone is subscribed to, however many users share it."""
+        if self.reminders is None or event_type not in DM_REMINDER_TEMPLATES or guild_id is not None:
+            return []
+        now = datetime.now()
+        reminders = []
+        for lead_minutes in sorted(self.reminders.leads(event_type)):
+            reminder = ScheduledAnnouncement(
+                event_type=event_type,
+                announcement_time=event_time - timedelta(minutes=lead_minutes),
+                event_time=event_time,
+                # not mentioned in DMs; kept so the group can be rebuilt from any reminder
+                role_name=role_name,
+                message_template=DM_REMINDER_TEMPLATES[event_type],
+                recurrence=recurrence,
+                group_id=group_id,
+                kind="dm",
+                templates=templates
+            )
+            if reminder.announcement_time <= now:
+                reminder = self._next_occurrence(reminder)
+            if reminder is not None:
+                reminders.append(reminder)
+        return reminders
+    
+    def refresh_dm_reminders(self, event_type: str):
+        """
+        Rebuild the DM reminders of an event type's pending events after subscriptions changed.
+        
+        Args:
+            event_type: Type of event whose subscriptions changed
+        """
+        # per group, the channel reminder for the soonest occurrence; in a recurring
+        # group, lead times already passed wait for the next one
+        groups = {}
+        for announcement in self.announcements.with_event_type(event_type):
+            if announcement.group_id is not None and announcement.kind == "channel":
+                first = groups.get(announcement.group_id)
+                if first is None or announcement.event_time < first.event_time:
+                    groups[announcement.group_id] = announcement
+        for group_id, first in groups.items():
+            channel_reminders = [a for a in self.announcements.in_group(group_id) if a.kind == "channel"]
+            dm_reminders = self._dm_reminders(
+                event_type, first.event_time, first.role_name, first.guild_id, first.recurrence, group_id,
+                first.templates
+            )
+            self._replace_group(group_id, channel_reminders + dm_reminders)
+    
+    def _replace_group(self, group_id: str, reminders: list):
+        """Swap a group's pending reminders for new ones, journaled as one record."""
+        for announcement in self.announcements.in_group(group_id):
+            self.announcements.remove(announcement)
+        for announcement in reminders:
+            self.announcements.append(announcement)
+        self.journal.append(
+            "replace_group",
+            group_id=group_id,
+            announcements=[announcement.to_dict() for announcement in reminders]
         )
+        self._maybe_compact()
+        self._arm_timer()
+    
+    def _add(self, announcement: ScheduledAnnouncement):
+        """Add an announcement to the queue and the journal."""
         self.announcements.append(announcement)
-        self.save_to_file()
+        self.journal.append("add", announcement=announcement.to_dict())
+        self._maybe_compact()
+        # wake the loop early if this is now the earliest announcement
+        self._arm_timer()
+    
+    def _next_occurrence(self, announcement: ScheduledAnnouncement) -> Optional[ScheduledAnnouncement]:
+        """
+        The announcement for a recurring announcement's next occurrence.
+        
+        Occurrences whose announcement time has already passed (e.g. while
+        the bot was down) are skipped.
+        
+        Returns:
+            ScheduledAnnouncement, or None if it doesn't recur or the rule has ended
+        """
+        if announcement.recurrence is None:
+            return None
+        if announcement.kind == "dm" and not self._dm_recipients(announcement):
+            return None
+        lead = announcement.event_time - announcement.announcement_time
+        after = max(announcement.event_time, datetime.now() + lead)
+        event_time = announcement.recurrence.next_after(after)
+        if event_time is None:
+            return None
+        return ScheduledAnnouncement(
+            event_type=announcement.event_type,
+            announcement_time=event_time - lead,
+            event_time=event_time,
+            role_name=announcement.role_name,
+            message_template=announcement.message_template,
+            guild_id=announcement.guild_id,
+            recurrence=announcement.recurrence,
+            group_id=announcement.group_id,
+            kind=announcement.kind,
+            templates=announcement.templates
+        )
+    
+    def _dm_recipients(self, announcement: ScheduledAnnouncement) -> list[int]:
+        """Users subscribed to a DM reminder's event type at its lead time."""
+        if self.reminders is None:
+            return []
+        return self.reminders.users(announcement.event_type, round(announcement.lead_minutes))
     
     def cancel(self, event_type: str):
         """
-        Cancel a scheduled announcement.
+        Cancel every scheduled announcement for an event type.
         
         Args:
             event_type: Type of event to cancel
         """
-        self.announcements = [
-            a for a in self.announcements if a.event_type != event_type
-        ]
-        self.save_to_file()
+        cancelled = self.announcements.with_event_type(event_type)
+        for announcement in cancelled:
+            self.announcements.remove(announcement)
+        if cancelled:
+            self.journal.append("cancel", event_type=event_type)
     
-    @tasks.loop(minutes=1)
+    def cancel_id(self, announcement_id: str) -> bool:
+        """
+        Cancel one scheduled announcement.
+        
+        Args:
+            announcement_id: The id returned by schedule
+        
+        Returns:
+            bool: True if the announcement was pending
+        """
+        announcement = self.announcements.get(announcement_id)
+        if announcement is None:
+            return False
+        self.announcements.remove(announcement)
+        self.journal.append("remove", id=announcement_id)
+        return True
+    
+    @tasks.loop(seconds=SCHEDULER_IDLE_SECONDS)
     async def check_announcements(self):
-        """Check for due announcements and send them."""
+        """Send the announcements that are due, then sleep until the next one."""
         now = datetime.now()
         
-        # Find announcements that are due (should be sent now)
-        due_announcements = [
-            a for a in self.announcements
-            if a.announcement_time <= now
-        ]
+        # Popped before sending, so an overlapping run can't pick them up
+        # again while the fan-out is in progress
+        due_announcements = self.announcements.pop_due(now)
+        for announcement in due_announcements:
+            self.journal.append("fired", id=announcement.id)
+            next_occurrence = self._next_occurrence(announcement)
+            if next_occurrence is not None:
+                self._add(next_occurrence)
         
-        # Send and remove due announcements
+        fresh = []
         for announcement in due_announcements:
-            await self.send_announcement(announcement)
-            self.announcements.remove(announcement)
+            if self.is_stale(announcement, now):
+                self._drop_stale(announcement)
+                continue
+            lag = (now - announcement.announcement_time).total_seconds()
+            metrics.observe("announcement_lag_seconds", lag)
+            fresh.append(announcement)
         
-        # Clean up any past announcements that weren't caught (safety measure)
-        # This handles edge cases where announcements might have been missed
-        past_announcements = [
-            a for a in self.announcements
-            if a.announcement_time < now
-        ]
+        # Several due at once (e.g. catching up after a restart) go out together
+        await asyncio.gather(*(self.send_announcement(a) for a in fresh))
         
-        for announcement in past_announcements:
-            print(f"Removing past announcement for {announcement.event_type} (announcement_time: {announcement.announcement_time})")
-            self.announcements.remove(announcement)
+        self._maybe_compact()
+        self._arm_timer()
+    
+    @staticmethod
+    def is_stale(announcement: ScheduledAnnouncement, now: datetime) -> bool:
+        """
+        Whether an overdue announcement is no longer worth sending.
         
-        # Save if we made any changes
-        if due_announcements or past_announcements:
-            self.save_to_file()
+        It's stale once its event has started, or once it's overdue by more
+        than its event type's catch-up grace window.
+        """
+        grace = CATCH_UP_GRACE_MINUTES.get(announcement.event_type, DEFAULT_CATCH_UP_GRACE_MINUTES)
+        return (
+            announcement.event_time <= now
+            or now - announcement.announcement_time > timedelta(minutes=grace)
+        )
+    
+    def _drop_stale(self, announcement: ScheduledAnnouncement):
+        print(f"Dropping stale announcement for {announcement.event_type} (announcement_time: {announcement.announcement_time})")
+        metrics.increment("announcements_dropped_stale")
+    
+    def _arm_timer(self):
+        """
+        Set the loop's next iteration to the earliest announcement time.
+        
+        The loop sleeps on the event loop's monotonic clock, and the delay is
+        recomputed from the heap on every run, so neither a long sleep nor
+        a slow fan-out lets the wakeup drift. With nothing scheduled it falls
+        back to waking every SCHEDULER_IDLE_SECONDS.
+        """
+        loop = self.check_announcements
+        if not isinstance(loop, tasks.Loop) or not loop.is_running() or loop.next_iteration is None:
+            return
+        
+        next_time = self.announcements.next_time()
+        delay = SCHEDULER_IDLE_SECONDS
+        if next_time is not None:
+            delay = min(max((next_time - datetime.now()).total_seconds(), 0), SCHEDULER_IDLE_SECONDS)
+        
+        # change_interval measures from the start of the current iteration
+        interval = timedelta(hours=loop.hours, minutes=loop.minutes, seconds=loop.seconds)
+        last_iteration = loop.next_iteration - interval
+        target = discord.utils.utcnow() + timedelta(seconds=delay)
+        loop.change_interval(seconds=max((target - last_iteration).total_seconds(), 0))
     
     async def send_announcement(self, announcement: ScheduledAnnouncement):
         """
-        Send an announcement to all guilds with proper role mentions.
+        Send an announcement to its guild, or all guilds, with proper role mentions.
         
         Args:
             announcement: The scheduled announcement to send
         """
         event_timestamp = get_next_event_time(announcement.event_time, 0)
+        lead_minutes = (announcement.event_time - datetime.now()).total_seconds() / 60
+        priority = priority_for_lead(max(lead_minutes, 0))
+        # rendered at send time, so a caught-up announcement says how long is actually left
+        minutes_left = max(round(lead_minutes), 0)
         
-        for guild in self.bot.guilds:
-            if guild.id == RM2_SERVER_ID:
-                continue
-            
-            alert_channel = discord.utils.get(guild.channels, name=ALERTS_CHANNEL_NAME)
-            if alert_channel:
-                try:
-                    role_mention = get_role_mention(guild, announcement.role_name)
-                    message = announcement.message_template.format(
-                        role=role_mention,
-                        timestamp=event_timestamp
-                    )
-                    await alert_channel.send(message)
-                except discord.Forbidden:
-                    print(f"Bot doesn't have permission to send messages in {guild.name}'s alerts channel")
-                except Exception as e:
-                    print(f"Error sending announcement to {guild.name}: {e}")
-            else:
-                print(f"Could not find '{ALERTS_CHANNEL_NAME}' channel in guild: {guild.name}")
+        if announcement.kind == "dm":
+            recipients = self._dm_recipients(announcement)
+            if recipients:
+                content = announcement.message_template.format(timestamp=event_timestamp, minutes=minutes_left)
+                self.dm_workers.send_batch(recipients, content, expires_in=max(lead_minutes, 0) * 60)
+                print(f"Queued {announcement.event_type} reminder DMs for {len(recipients)} user(s)")
+            return
+        
+        async def deliver(guild, alert_channel):
+            role_mention = get_role_mention(guild, announcement.role_name, self.routes)
+            message = announcement.message_template.format(
+                role=role_mention,
+                timestamp=event_timestamp,
+                minutes=minutes_left
+            )
+            await self.dispatcher.send(alert_channel, message, priority=priority)
+        
+        guilds = self.bot.guilds
+        if announcement.guild_id is not None:
+            guilds = [guild for guild in guilds if guild.id == announcement.guild_id]
+        
+        results = await fan_out(
+            guilds,
+            deliver,
+            self.routes,
+            self.health,
+            role_name=announcement.role_name,
+            subscribers=self.subscribers
+        )
+        report_results(f"Announcement for {announcement.event_type}", results)
     
     @check_announcements.before_loop
     async def before_check_announcements(self):
@@ -167,49 +708,66 @@ class AnnouncementScheduler:
         await self.bot.wait_until_ready()
     
     def load_from_file(self):
-        """Load scheduled announcements from JSON file."""
-        if not os.path.exists(self.STORAGE_FILE):
+        """Load scheduled announcements from the snapshot and journal."""
+        if not self.journal.exists():
             print(f"Storage file {self.STORAGE_FILE} not found, starting with empty schedule")
             return
         
         try:
-            with open(self.STORAGE_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                loaded_announcements = [
-                    ScheduledAnnouncement.from_dict(item) for item in data
-                ]
+            loaded_announcements = [
+                ScheduledAnnouncement.from_dict(item) for item in self.journal.load()
+            ]
             
-            # Filter out past announcements (in case bot was down)
+            # Keep overdue announcements still inside their catch-up grace
+            # window (the first run sends them right away) and drop stale
+            # ones, moving recurring ones on to their next occurrence
             now = datetime.now()
-            self.announcements = [
-                a for a in loaded_announcements if a.announcement_time > now
-            ]
+            upcoming = []
+            removed_count = 0
+            rearmed_count = 0
+            for announcement in loaded_announcements:
+                if announcement.announcement_time <= now and self.is_stale(announcement, now):
+                    self._drop_stale(announcement)
+                    announcement = self._next_occurrence(announcement)
+                    if announcement is None:
+                        removed_count += 1
+                    else:
+                        rearmed_count += 1
+                if announcement is not None:
+                    upcoming.append(announcement)
+            self.announcements = AnnouncementQueue(upcoming)
             
-            removed_count = len(loaded_announcements) - len(self.announcements)
             if removed_count > 0:
                 print(f"Removed {removed_count} past announcement(s) when loading")
+            if rearmed_count > 0:
+                print(f"Moved {rearmed_count} past recurring announcement(s) to their next occurrence when loading")
+            if removed_count > 0 or rearmed_count > 0:
                 self.save_to_file()  # Save the cleaned list
             
             print(f"Loaded {len(self.announcements)} scheduled announcement(s) from {self.STORAGE_FILE}")
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON from {self.STORAGE_FILE}: {e}")
             print("Starting with empty schedule")
-            self.announcements = []
+            self.announcements = AnnouncementQueue()
         except Exception as e:
             print(f"Error loading announcements from {self.STORAGE_FILE}: {e}")
             print("Starting with empty schedule")
-            self.announcements = []
+            self.announcements = AnnouncementQueue()
     
     def save_to_file(self):
-        """Save scheduled announcements to JSON file."""
+        """Write a compacted snapshot of the whole schedule, replacing the journal."""
         try:
-            data = [announcement.to_dict() for announcement in self.announcements]
-            with open(self.STORAGE_FILE, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            self.journal.compact([announcement.to_dict() for announcement in self.announcements.values()])
         except Exception as e:
             print(f"Error saving announcements to {self.STORAGE_FILE}: {e}")
     
+    def _maybe_compact(self):
+        """Fold the journal into a snapshot once it has grown long enough."""
+        if self.journal.needs_compaction(len(self.announcements)):
+            self.save_to_file()
+    
     def cleanup(self):
-        """Clean up the scheduler (stop the background task)."""
+        """Clean up the scheduler (stop the background task and DM workers)."""
         self.check_announcements.cancel()
+        self.dm_workers.close()
 
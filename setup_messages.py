@@ -0,0 +1,106 @@
+"""Index of each guild's role setup message, for filtering reaction events."""
+from types import MappingProxyType
+from typing import NamedTuple, Optional
+
+from constants import ALERTS_SETUP_CHANNEL_NAME, ROLE_CONFIGS
+
+
+class EmojiRole(NamedTuple):
+    """The alert role a setup message reaction stands for."""
+    role_name: str
+    readable_name: str
+
+
+# setup message emoji -> role, built once; read-only so handlers can't change it
+EMOJI_ROLES = MappingProxyType({
+    emoji: EmojiRole(role_name, reason) for role_name, reason, _, emoji in ROLE_CONFIGS
+})
+
+
+class SetupMessageIndex:
+    """
+    Ids of every guild's setup message, so reaction events elsewhere are dropped at once.
+
+    A guild's setup message is registered when its infrastructure is set
+    up. Until then, its setup channel is indexed instead and any reaction in
+    that channel is let through, as before the index existed. Kept current
+    from the channel and guild events.
+    """
+
+    def __init__(self):
+        self._messages: dict[int, tuple[int, int]] = {}  # message id -> (guild id, channel id)
+        self._by_guild: dict[int, int] = {}  # guild id -> message id
+        self._channels: dict[int, int] = {}  # setup channel id -> guild id, for guilds without a known message
+
+    def __len__(self):
+        return len(self._messages)
+
+    def accepts(self, message_id: int, channel_id: Optional[int]) -> bool:
+        """
+        Whether a reaction event could be aimed at a setup message.
+
+        Args:
+            message_id: The message reacted to
+            channel_id: The channel it is in
+
+        Returns:
+            bool: True if it is a known setup message, or is in a setup channel whose message isn't known yet
+        """
+        return message_id in self._messages or channel_id in self._channels
+
+    def rebuild(self, guilds):
+        """
+        Index the setup channels of guilds whose setup message isn't known.
+
+        Args:
+            guilds: Iterable of Discord guild objects
+        """
+        self._channels = {}
+        for guild in guilds:
+            if guild.id in self._by_guild:
+                continue
+            for channel in guild.channels:
+                if channel.name == ALERTS_SETUP_CHANNEL_NAME:
+                    self._channels[channel.id] = guild.id
+
+    def add_message(self, message):
+        """
+        Register a guild's setup message, replacing any earlier one.
+
+        Args:
+            message: The setup message, as returned by create_setup_message
+        """
+        guild_id = message.guild.id
+        self.remove_guild(guild_id)
+        self._messages[message.id] = (guild_id, message.channel.id)
+        self._by_guild[guild_id] = message.id
+
+    def remove_guild(self, guild_id: int):
+        """Forget a guild's setup message and channels."""
+        message_id = self._by_guild.pop(guild_id, None)
+        if message_id is not None:
+            del self._messages[message_id]
+        self._channels = {
+            channel_id: owner for channel_id, owner in self._channels.items() if owner != guild_id
+        }
+
+    def on_channel_change(self, channel, before_name: Optional[str] = None, deleted: bool = False):
+        """
+        Update the index after a channel was created, renamed or deleted.
+
+        Args:
+            channel: The channel
+            before_name: The channel's name before an update, if any
+            deleted: Whether the channel was deleted
+        """
+        if ALERTS_SETUP_CHANNEL_NAME not in (channel.name, before_name):
+            return
+        guild_id = channel.guild.id
+        message_id = self._by_guild.get(guild_id)
+        is_setup_channel = channel.name == ALERTS_SETUP_CHANNEL_NAME and not deleted
+        if not is_setup_channel:
+            self._channels.pop(channel.id, None)
+            if message_id is not None and self._messages[message_id][1] == channel.id:
+                self.remove_guild(guild_id)
+        elif message_id is None:
+            self._channels[channel.id] = guild_id
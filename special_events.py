@@ -4,125 +4,198 @@ from datetime import datetime, timedelta
 from constants import GIANT_KASHAM, SEASONAL_EVENT_ROLE_NAME, HALLOWEEN, THANKSGIVING, CHRISTMAS, EASTER
 from utils import get_next_event_time, get_role_mention
 from announcement_templates import ANNOUNCEMENT_TEMPLATES
+from alerts import AlertEvent
+from recurrence import IntervalRule
 
 
-async def handle_friendly_hallowvern(message, guild, alert_channel):
+# Minutes between Big Santa spawns
+BIG_SANTA_RESPAWN_MINUTES = 60 * 7
+
+# Keep announcing Big Santa on the respawn rotation for this long after the
+# last spawn seen, so a missed shout doesn't skip an announcement but the
+# announcements stop once the event is over
+BIG_SANTA_RECURRENCE_HOURS = 24
+
+
+def parse_friendly_hallowvern(content, lowered):
     """
-    Handle the "friendly hallowvern appeared" special event.
-    
+    Parse the "friendly hallowvern appeared" special event.
+
     Args:
-        message: The Discord message object
-        guild: The Discord guild object
-        alert_channel: The channel to send the alert to
+        content: The raw message content
+        lowered: The lowercased message content
+
+    Returns:
+        AlertEvent or None if the message isn't this event
     """
-    if message.content.lower().startswith("**friendly hallowvern appeared in"):
-        try:
-            words = message.content.split()
-            # Find the index of "in" and extract everything after it until the trailing "!**"
-            in_index = -1
-            for i, word in enumerate(words):
-                if word.lower() == "in":
-                    in_index = i
-                    break
-            if in_index != -1 and in_index + 1 < len(words):
-                map_words = words[in_index + 1:]
-                map = " ".join(map_words).replace("!**", "")  # Exclude the trailing "!**"
-                role_mention = get_role_mention(guild, SEASONAL_EVENT_ROLE_NAME)
-                await alert_channel.send(f"{role_mention} Friendly Hallowvern appeared in {map}!")
-            else:
-                print(f"Could not parse map from message: {message.content}")
-        except Exception as e:
-            print(f"Error parsing friendly hallowvern map: {e}")
+    if not lowered.startswith("**friendly hallowvern appeared in"):
+        return None
+    try:
+        words = content.split()
+        # Find the index of "in" and extract everything after it until the trailing "!**"
+        in_index = -1
+        for i, word in enumerate(words):
+            if word.lower() == "in":
+                in_index = i
+                break
+        if in_index != -1 and in_index + 1 < len(words):
+            map_words = words[in_index + 1:]
+            map = " ".join(map_words).replace("!**", "")  # Exclude the trailing "!**"
+            return AlertEvent(
+                "friendly_hallowvern",
+                SEASONAL_EVENT_ROLE_NAME,
+                f"Friendly Hallowvern appeared in {map}!",
+                map=map,
+            )
+        print(f"Could not parse map from message: {content}")
+    except Exception as e:
+        print(f"Error parsing friendly hallowvern map: {e}")
+    return None
 
 
-async def handle_feast(message, guild, alert_channel):
+def parse_feast(content, lowered):
     """
-    Handle the "feast appeared" special event.
-    
+    Parse the "feast appeared" special event.
+
     Args:
-        message: The Discord message object
-        guild: The Discord guild object
-        alert_channel: The channel to send the alert to
+        content: The raw message content
+        lowered: The lowercased message content
+
+    Returns:
+        AlertEvent or None if the message isn't this event
     """
-    if not message.content.lower().startswith("**a thanksgiving feast has been started by"):
-        return
-    role_mention = get_role_mention(guild, SEASONAL_EVENT_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} A Thanksgiving Feast has been started!")
+    if not lowered.startswith("**a thanksgiving feast has been started by"):
+        return None
+    return AlertEvent("thanksgiving_feast", SEASONAL_EVENT_ROLE_NAME, "A Thanksgiving Feast has been started!")
 
 
-async def handle_santa(message, guild, alert_channel, scheduler=None):
+def parse_santa(content, lowered):
     """
-    Handle the "big santa spawned" special event.
-    
+    Parse the "big santa spawned" special event.
+
+    The event carries the time of the next spawn so the follow-up
+    announcement can be scheduled once per shout.
+
     Args:
-        message: The Discord message object
-        guild: The Discord guild object
-        alert_channel: The channel to send the alert to
-        scheduler: Optional AnnouncementScheduler instance for scheduling announcements
+        content: The raw message content
+        lowered: The lowercased message content
+
+    Returns:
+        AlertEvent or None if the message isn't this event
     """
-    if not message.content.lower().startswith("**a big santa spawned in street 1"):
-        return
+    if not lowered.startswith("**a big santa spawned in street 1"):
+        return None
     current_time = datetime.now()
-    minutes_until_next = 60 * 7
-    role_mention = get_role_mention(guild, SEASONAL_EVENT_ROLE_NAME)
-    next_event_time_str = get_next_event_time(current_time, minutes_until_next)
-    await alert_channel.send(f"{role_mention} Big Santa spawned in Street 1!  Next Big Santa at {next_event_time_str}")
-    
-    # Schedule 15-minute advance announcement
-    if scheduler:
-        next_event_time = current_time + timedelta(minutes=minutes_until_next)
-        announcement_time = next_event_time - timedelta(minutes=15)
-        event_type = "big_santa"
-        
-        if event_type in ANNOUNCEMENT_TEMPLATES:
-            scheduler.schedule(
-                event_type=event_type,
-                announcement_time=announcement_time,
-                event_time=next_event_time,
-                role_name=SEASONAL_EVENT_ROLE_NAME,
-                message_template=ANNOUNCEMENT_TEMPLATES[event_type]
-            )
+    next_event_time_str = get_next_event_time(current_time, BIG_SANTA_RESPAWN_MINUTES)
+    return AlertEvent(
+        "big_santa",
+        SEASONAL_EVENT_ROLE_NAME,
+        f"Big Santa spawned in Street 1!  Next Big Santa at {next_event_time_str}",
+        map="Street 1",
+        next_event_time=current_time + timedelta(minutes=BIG_SANTA_RESPAWN_MINUTES),
+    )
 
 
-async def handle_giant_kasham(message, guild, alert_channel):
+def parse_giant_kasham(content, lowered):
     """
-    Handle the "giant kasham appeared" special event.
-    
+    Parse the "giant kasham appeared" special event.
+
     Args:
-        message: The Discord message object
-        guild: The Discord guild object
-        alert_channel: The channel to send the alert to
+        content: The raw message content
+        lowered: The lowercased message content
+
+    Returns:
+        AlertEvent or None if the message isn't this event
     """
-    if not message.content.lower().startswith("**kasham event is here to defeat the sun!"):
+    if not lowered.startswith("**kasham event is here to defeat the sun!"):
+        return None
+    return AlertEvent("giant_kasham", SEASONAL_EVENT_ROLE_NAME, "Kasham Shadow appeared in Battle Arena!")
+
+
+def classify_seasonal_event(content, lowered):
+    """
+    Classify a message as the currently active seasonal event.
+
+    Args:
+        content: The raw message content
+        lowered: The lowercased message content
+
+    Returns:
+        AlertEvent or None if the message isn't the active seasonal event
+    """
+    if HALLOWEEN:
+        return parse_friendly_hallowvern(content, lowered)
+    elif THANKSGIVING:
+        return parse_feast(content, lowered)
+    elif CHRISTMAS:
+        return parse_santa(content, lowered)
+    elif GIANT_KASHAM:
+        return parse_giant_kasham(content, lowered)
+    return None
+
+
+def schedule_follow_up(event, scheduler=None):
+    """
+    Schedule any advance announcement that follows from a seasonal event.
+
+    Args:
+        event: The classified AlertEvent
+        scheduler: Optional AnnouncementScheduler instance for scheduling announcements
+    """
+    if not scheduler or event.event_type != "big_santa":
+        return
+
+    # Schedule the advance announcements on the respawn rotation,
+    # re-anchored to every spawn that is actually seen
+    if event.event_type in ANNOUNCEMENT_TEMPLATES:
+        rule = IntervalRule(
+            minutes=BIG_SANTA_RESPAWN_MINUTES,
+            anchor=event.next_event_time,
+            until=event.next_event_time + timedelta(hours=BIG_SANTA_RECURRENCE_HOURS)
+        )
+        scheduler.schedule_event(
+            event_type=event.event_type,
+            event_time=event.next_event_time,
+            role_name=event.role_name,
+            templates=ANNOUNCEMENT_TEMPLATES[event.event_type],
+            recurrence=rule
+        )
+
+
+async def send_seasonal_alert(event, guild, alert_channel):
+    """Send a seasonal AlertEvent to a guild's alert channel."""
+    if event is None:
         return
-    role_mention = get_role_mention(guild, SEASONAL_EVENT_ROLE_NAME)
-    await alert_channel.send(f"{role_mention} Kasham Shadow appeared in Battle Arena!")
+    role_mention = get_role_mention(guild, event.role_name)
+    await alert_channel.send(event.render(role_mention))
 
 
-async def handle_halloween(message, guild, alert_channel):
-    await handle_friendly_hallowvern(message, guild, alert_channel)
+async def handle_friendly_hallowvern(message, guild, alert_channel):
+    await send_seasonal_alert(parse_friendly_hallowvern(message.content, message.content.lower()), guild, alert_channel)
+
+async def handle_feast(message, guild, alert_channel):
+    await send_seasonal_alert(parse_feast(message.content, message.content.lower()), guild, alert_channel)
 
-async def handle_thanksgiving(message, guild, alert_channel):
-    await handle_feast(message, guild, alert_channel)
+async def handle_santa(message, guild, alert_channel, scheduler=None):
+    event = parse_santa(message.content, message.content.lower())
+    await send_seasonal_alert(event, guild, alert_channel)
+    if event:
+        schedule_follow_up(event, scheduler)
 
-async def handle_christmas(message, guild, alert_channel, scheduler=None):
-    await handle_santa(message, guild, alert_channel, scheduler)
+async def handle_giant_kasham(message, guild, alert_channel):
+    await send_seasonal_alert(parse_giant_kasham(message.content, message.content.lower()), guild, alert_channel)
 
 async def handle_seasonal_event(message, guild, alert_channel, scheduler=None):
     """
     Handle the seasonal event.
-    
+
     Args:
         message: The Discord message object
         guild: The Discord guild object
         alert_channel: The channel to send the alert to
         scheduler: Optional AnnouncementScheduler instance for scheduling announcements
     """
-    if HALLOWEEN:
-        await handle_halloween(message, guild, alert_channel)
-    elif THANKSGIVING:
-        await handle_thanksgiving(message, guild, alert_channel)
-    elif CHRISTMAS:
-        await handle_christmas(message, guild, alert_channel, scheduler)
-    elif GIANT_KASHAM:
-        await handle_giant_kasham(message, guild, alert_channel)
\ No newline at end of file
+    event = classify_seasonal_event(message.content, message.content.lower())
+    await send_seasonal_alert(event, guild, alert_channel)
+    if event:
+        schedule_follow_up(event, scheduler)
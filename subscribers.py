@@ -0,0 +1,75 @@
+"""In-memory index of who is subscribed to each alert role in each guild."""
+from typing import Optional
+
+from routing import ALERT_ROLE_NAMES
+
+
+class SubscriberIndex:
+    """
+    Tracks the members holding each alert role, per guild.
+
+    Built from the member cache when the bot is ready and kept current from
+    the reaction handlers and member role updates. Members are stored as
+    id sets so the same change reported by both paths is only counted once.
+    """
+
+    def __init__(self):
+        self._members: dict[tuple[int, str], set[int]] = {}
+        self._guilds: set[int] = set()
+
+    def rebuild(self, guilds):
+        """
+        Rebuild the index for every guild from scratch.
+
+        Args:
+            guilds: Iterable of Discord guild objects
+        """
+        self._members = {}
+        self._guilds = set()
+        for guild in guilds:
+            self.refresh(guild)
+
+    def refresh(self, guild):
+        """Rebuild the index for one guild from its roles' cached members."""
+        self.remove_guild(guild.id)
+        for role in guild.roles:
+            if role.name in ALERT_ROLE_NAMES:
+                members = self._members.setdefault((guild.id, role.name), set())
+                members.update(member.id for member in role.members)
+        self._guilds.add(guild.id)
+
+    def remove_guild(self, guild_id: int):
+        """Forget every subscription in a guild."""
+        self._guilds.discard(guild_id)
+        for key in [key for key in self._members if key[0] == guild_id]:
+            del self._members[key]
+
+    def add(self, guild_id: int, role_name: str, member_id: int):
+        """Record that a member now holds an alert role."""
+        self._members.setdefault((guild_id, role_name), set()).add(member_id)
+
+    def remove(self, guild_id: int, role_name: str, member_id: int):
+        """Record that a member no longer holds an alert role."""
+        members = self._members.get((guild_id, role_name))
+        if members is not None:
+            members.discard(member_id)
+
+    def on_member_update(self, before, after):
+        """Apply the alert role changes from a member update."""
+        before_roles = {role.name for role in before.roles} & ALERT_ROLE_NAMES
+        after_roles = {role.name for role in after.roles} & ALERT_ROLE_NAMES
+        for role_name in after_roles - before_roles:
+            self.add(after.guild.id, role_name, after.id)
+        for role_name in before_roles - after_roles:
+            self.remove(after.guild.id, role_name, after.id)
+
+    def count(self, guild_id: int, role_name: str) -> Optional[int]:
+        """
+        Number of members subscribed to a role in a guild.
+
+        Returns:
+            int, or None if the guild hasn't been indexed yet
+        """
+        if guild_id not in self._guilds:
+            return None
+        return len(self._members.get((guild_id, role_name), ()))
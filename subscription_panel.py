@@ -0,0 +1,111 @@
+"""Select-menu subscription panel for the setup message."""
+import discord
+from constants import ROLE_CONFIGS
+from role_updates import edit_alert_roles, describe_changes
+from routing import GuildRoutingTable, MISSING_PERMISSION, ROLE_TOO_HIGH
+
+
+# fixed so the view keeps working on messages posted before a restart
+SUBSCRIPTION_SELECT_ID = "rm2_alerts:subscriptions"
+
+SETUP_MENU_HEADER = "Choose the rm2 alerts you want to get"
+
+
+def setup_menu_content() -> str:
+    """Text of the setup message when it carries the select menu."""
+    return (
+        f"{SETUP_MENU_HEADER}. Your choice replaces your current subscriptions; "
+        "choose nothing to unsubscribe from everything:\n"
+        + "\n".join(f"{emoji} - {reason}" for _, reason, _, emoji in ROLE_CONFIGS)
+    )
+
+
+class SubscriptionSelect(discord.ui.Select):
+    """Multi-select of every alert role; the selection becomes the member's full subscription set."""
+
+    def __init__(self, bot):
+        super().__init__(
+            custom_id=SUBSCRIPTION_SELECT_ID,
+            placeholder="Select the alerts you want",
+            min_values=0,
+            max_values=len(ROLE_CONFIGS),
+            options=[
+                discord.SelectOption(label=reason, value=role_name, emoji=emoji)
+                for role_name, reason, _, emoji in ROLE_CONFIGS
+            ],
+        )
+        self.bot = bot
+
+    async def callback(self, interaction: discord.Interaction):
+        # the role edit can outlast the 3 second interaction deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        reply = await set_subscriptions(self.bot, interaction.guild, interaction.user, self.values)
+        await interaction.followup.send(reply, ephemeral=True)
+
+
+class SubscriptionView(discord.ui.View):
+    """
+    Persistent view holding the subscription select menu.
+
+    Register it once per process with ``bot.add_view`` so selections on
+    setup messages posted before a restart are still handled.
+    """
+
+    def __init__(self, bot):
+        super().__init__(timeout=None)
+        self.add_item(SubscriptionSelect(bot))
+
+
+async def set_subscriptions(bot, guild, member, role_names) -> str:
+    """
+    Give a member exactly the chosen alert roles, with at most one role edit.
+
+    Args:
+        bot: The Discord bot instance
+        guild: The Discord guild object
+        member: The member who made the selection
+        role_names: Names of the alert roles they chose
+
+    Returns:
+        str: The reply to show them
+    """
+    if guild is None:
+        return "Subscriptions can only be changed in a server."
+    chosen = set(role_names)
+    routes = getattr(bot, 'routes', None)
+    if not isinstance(routes, GuildRoutingTable):
+        routes = GuildRoutingTable()
+        routes.refresh(guild)
+
+    changes = []
+    missing = []
+    for role_name, reason, _, _ in ROLE_CONFIGS:
+        role = routes.alert_role(guild, role_name)
+        if role is None:
+            if role_name in chosen:
+                missing.append(role_name)
+            continue
+        changes.append((role, reason, role_name in chosen))
+    if missing:
+        return f"Sorry, the {', '.join(missing)} role(s) don't exist in {guild.name}. Please ask an administrator to create them."
+
+    held = {role.id for role in member.roles}
+    for role, _, wanted in changes:
+        if wanted == (role.id in held):
+            continue
+        status = routes.manage_status(guild, role.name)
+        if status == MISSING_PERMISSION:
+            return f"Sorry, I don't have the 'Manage Roles' permission in {guild.name}. Please ask an administrator to give me this permission."
+        if status == ROLE_TOO_HIGH:
+            return f"Sorry, I can't assign the {role.name} role in {guild.name} because it's higher than my role. Please ask an administrator to move my role higher in the role list."
+
+    try:
+        added, removed = await edit_alert_roles(bot, guild, member, changes)
+    except discord.Forbidden:
+        return f"Sorry, I don't have permission to change your alert roles in {guild.name}. Please ask an administrator to give me the 'Manage Roles' permission."
+    except Exception as e:
+        print(f"Error changing roles in {guild.name}: {e}")
+        return f"Sorry, there was an error changing your alert roles in {guild.name}. Please try again later."
+    if not added and not removed:
+        return "Your subscriptions are already up to date."
+    return describe_changes(added, removed, guild)
@@ -0,0 +1,100 @@
+"""Tests for coalescer.py"""
+import asyncio
+import pytest
+
+from coalescer import AlertCoalescer
+from outbox import AlertOutbox
+from alerts import AlertEvent, merge_alert_events
+from constants import OUTLAW_ROLE_NAME, HQWAR_ROLE_NAME
+
+
+def outlaw(player, map):
+    """Create an outlaw AlertEvent"""
+    return AlertEvent("outlaw", OUTLAW_ROLE_NAME, f"{player} became an outlaw at {map}!", map=map, player=player)
+
+
+class TestMergeAlertEvents:
+    """Tests for merge_alert_events"""
+
+    def test_single_event_is_unchanged(self):
+        event = outlaw("A", "X")
+
+        assert merge_alert_events([event]) is event
+
+    def test_merges_outlaws_into_digest(self):
+        merged = merge_alert_events([outlaw("A", "X"), outlaw("B", "Y"), outlaw("C", "Z")])
+
+        assert merged.body == "3 players became outlaws: A at X, B at Y, C at Z!"
+        assert merged.role_name == OUTLAW_ROLE_NAME
+
+    def test_truncates_long_digest(self):
+        events = [outlaw(f"Player{i}", "Downtown 4") for i in range(200)]
+
+        merged = merge_alert_events(events)
+
+        assert len(merged.body) < 2000
+        assert merged.body.endswith("more!")
+
+
+class TestAlertCoalescer:
+    """Tests for AlertCoalescer"""
+
+    @pytest.mark.asyncio
+    async def test_burst_becomes_first_alert_plus_one_digest(self):
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.body)
+
+        coalescer = AlertCoalescer(deliver, windows={OUTLAW_ROLE_NAME: 0.05})
+        await coalescer.submit(outlaw("A", "X"))
+        await coalescer.submit(outlaw("B", "Y"))
+        await coalescer.submit(outlaw("C", "Z"))
+
+        assert delivered == ["A became an outlaw at X!"]
+        assert coalescer.pending(OUTLAW_ROLE_NAME) == 2
+
+        await asyncio.sleep(0.15)
+
+        assert delivered == ["A became an outlaw at X!", "2 players became outlaws: B at Y, C at Z!"]
+
+    @pytest.mark.asyncio
+    async def test_roles_without_window_are_delivered_immediately(self):
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event)
+
+        coalescer = AlertCoalescer(deliver, windows={OUTLAW_ROLE_NAME: 0.05})
+        event = AlertEvent("hq_war", HQWAR_ROLE_NAME, "HQ War starts in 5 minutes!")
+        await coalescer.submit(event)
+        await coalescer.submit(event)
+
+        assert delivered == [event, event]
+
+    @pytest.mark.asyncio
+    async def test_buffered_alerts_stay_in_outbox_until_digest_is_delivered(self, tmp_path):
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"))
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.body)
+
+        async def record(event):
+            return outbox.record(event, [1, 2])
+
+        async def discard(alert_ids):
+            outbox.discard(alert_ids)
+
+        coalescer = AlertCoalescer(deliver, windows={OUTLAW_ROLE_NAME: 0.05}, record=record, discard=discard)
+        await coalescer.submit(outlaw("A", "X"))
+        await coalescer.submit(outlaw("B", "Y"))
+        await coalescer.submit(outlaw("C", "Z"))
+
+        # a restart now would replay the buffered alerts
+        assert [event.player for _, event, _ in AlertOutbox(str(tmp_path / "outbox.db")).pending()] == ["B", "C"]
+
+        await asyncio.sleep(0.15)
+
+        assert delivered[-1] == "2 players became outlaws: B at Y, C at Z!"
+        assert AlertOutbox(str(tmp_path / "outbox.db")).pending() == []
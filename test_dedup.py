@@ -0,0 +1,54 @@
+"""Tests for dedup.py"""
+from dedup import RecentMessages, content_key
+
+
+class FakeClock:
+    """Manually advanced monotonic clock"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestRecentMessages:
+    """Tests for RecentMessages"""
+
+    def test_same_message_id_is_duplicate(self):
+        recent = RecentMessages()
+
+        assert recent.check_and_add(1, "HQ War starts in 5 minutes!") is False
+        assert recent.check_and_add(1, "HQ War starts in 5 minutes!") is True
+
+    def test_repeated_content_is_duplicate(self):
+        recent = RecentMessages()
+        recent.check_and_add(1, "HQ War starts in 5 minutes!")
+
+        assert recent.check_and_add(2, "  hq war starts in 5   minutes! ") is True
+
+    def test_different_content_is_not_duplicate(self):
+        recent = RecentMessages()
+        recent.check_and_add(1, "HQ War starts in 5 minutes!")
+
+        assert recent.check_and_add(2, "University Entrance Exam starts in 5 minutes!") is False
+
+    def test_entries_expire_after_ttl(self):
+        clock = FakeClock()
+        recent = RecentMessages(ttl=60, clock=clock)
+        recent.check_and_add(1, "HQ War starts in 5 minutes!")
+
+        clock.now = 61
+
+        assert recent.check_and_add(2, "HQ War starts in 5 minutes!") is False
+
+    def test_is_bounded(self):
+        recent = RecentMessages(max_entries=10)
+        for i in range(100):
+            recent.check_and_add(i, f"shout {i}")
+
+        assert len(recent) == 10
+        assert recent.check_and_add(99, "shout 99") is True
+
+    def test_content_key_normalizes_case_and_whitespace(self):
+        assert content_key("Outlaw  At X") == content_key("outlaw at x")
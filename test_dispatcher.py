@@ -0,0 +1,169 @@
+"""Tests for dispatcher.py"""
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from dispatcher import OutboundDispatcher, TokenBucket, DeliveryShed, dispatch
+from constants import PRIORITY_URGENT, PRIORITY_LATER, PRIORITY_BULK
+
+
+def make_channel(channel_id, log=None):
+    """Create a mock channel that records the order of sends"""
+    channel = MagicMock()
+    channel.id = channel_id
+
+    async def send(content, **kwargs):
+        if log is not None:
+            log.append((channel_id, content))
+
+    channel.send = AsyncMock(side_effect=send)
+    return channel
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket"""
+
+    def test_allows_capacity_then_waits(self):
+        bucket = TokenBucket(2, 1.0, now=0.0)
+
+        bucket.consume(0.0)
+        bucket.consume(0.0)
+
+        assert bucket.delay(0.0) == pytest.approx(0.5)
+        assert bucket.delay(0.5) == 0.0
+
+
+class TestOutboundDispatcher:
+    """Tests for OutboundDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_sends_immediately_with_budget(self):
+        dispatcher = OutboundDispatcher()
+        channel = make_channel(1)
+
+        await dispatcher.send(channel, "hello")
+
+        channel.send.assert_called_once_with("hello")
+        assert dispatcher.queue_depth == 0
+
+    @pytest.mark.asyncio
+    async def test_paces_sends_on_one_route(self):
+        dispatcher = OutboundDispatcher(route_limit=2, route_period=0.2)
+        channel = make_channel(1)
+
+        start = time.monotonic()
+        await asyncio.gather(*(dispatcher.send(channel, str(i)) for i in range(3)))
+
+        assert channel.send.call_count == 3
+        assert time.monotonic() - start >= 0.09
+        assert dispatcher.max_queue_depth == 1
+
+    @pytest.mark.asyncio
+    async def test_throttled_route_does_not_block_others(self):
+        log = []
+        dispatcher = OutboundDispatcher(route_limit=1, route_period=0.2)
+        busy = make_channel(1, log)
+        idle = make_channel(2, log)
+
+        await asyncio.gather(
+            dispatcher.send(busy, "first"),
+            dispatcher.send(busy, "second"),
+            dispatcher.send(idle, "other"),
+        )
+
+        assert log == [(1, "first"), (2, "other"), (1, "second")]
+
+    @pytest.mark.asyncio
+    async def test_new_send_to_idle_route_wakes_the_pump(self):
+        dispatcher = OutboundDispatcher(route_limit=1, route_period=5.0)
+        busy = make_channel(1)
+        idle = make_channel(2)
+        await dispatcher.send(busy, "first")
+        queued = asyncio.create_task(dispatcher.send(busy, "second"))
+        await asyncio.sleep(0.01)
+
+        start = time.monotonic()
+        await dispatcher.send(idle, "urgent", priority=PRIORITY_URGENT)
+
+        assert time.monotonic() - start < 0.1
+        assert dispatcher.queue_depth == 1
+        queued.cancel()
+
+    @pytest.mark.asyncio
+    async def test_global_budget_paces_all_routes(self):
+        dispatcher = OutboundDispatcher(global_limit=2, global_period=0.2)
+        channels = [make_channel(i) for i in range(4)]
+
+        start = time.monotonic()
+        await asyncio.gather(*(dispatcher.send(channel, "hi") for channel in channels))
+
+        assert time.monotonic() - start >= 0.15
+
+
+class TestPriorityDelivery:
+    """Tests for priority classes and shedding in OutboundDispatcher"""
+
+    @pytest.mark.asyncio
+    async def test_higher_priority_drains_first(self):
+        log = []
+        dispatcher = OutboundDispatcher(global_limit=1, global_period=0.05)
+        channels = [make_channel(i, log) for i in range(4)]
+
+        await asyncio.gather(
+            dispatcher.send(channels[0], "first", priority=PRIORITY_LATER),
+            dispatcher.send(channels[1], "later", priority=PRIORITY_LATER),
+            dispatcher.send(channels[2], "bulk", priority=PRIORITY_BULK),
+            dispatcher.send(channels[3], "urgent", priority=PRIORITY_URGENT),
+        )
+
+        assert [content for _, content in log] == ["first", "urgent", "later", "bulk"]
+
+    @pytest.mark.asyncio
+    async def test_rejects_new_bulk_send_when_overloaded(self):
+        dispatcher = OutboundDispatcher(global_limit=1, global_period=0.05, shed_depth=2)
+        channels = [make_channel(i) for i in range(4)]
+
+        results = await asyncio.gather(
+            *(dispatcher.send(channel, "x", priority=PRIORITY_BULK) for channel in channels),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[3], DeliveryShed)
+        assert channels[3].send.call_count == 0
+        assert all(not isinstance(result, Exception) for result in results[:3])
+
+    @pytest.mark.asyncio
+    async def test_never_sheds_higher_priority(self):
+        dispatcher = OutboundDispatcher(global_limit=1, global_period=0.02, shed_depth=1)
+        channels = [make_channel(i) for i in range(4)]
+
+        await asyncio.gather(*(dispatcher.send(channel, "x", priority=PRIORITY_URGENT) for channel in channels))
+
+        assert all(channel.send.call_count == 1 for channel in channels)
+
+    @pytest.mark.asyncio
+    async def test_drop_oldest_policy_sheds_queued_bulk_send(self):
+        dispatcher = OutboundDispatcher(global_limit=1, global_period=0.05, shed_depth=2, shed_policy="drop_oldest")
+        channels = [make_channel(i) for i in range(4)]
+
+        results = await asyncio.gather(
+            *(dispatcher.send(channel, "x", priority=PRIORITY_BULK) for channel in channels),
+            return_exceptions=True,
+        )
+
+        assert isinstance(results[1], DeliveryShed)
+        assert channels[3].send.call_count == 1
+
+
+class TestDispatch:
+    """Tests for dispatch"""
+
+    @pytest.mark.asyncio
+    async def test_falls_back_to_direct_send_without_dispatcher(self):
+        bot = MagicMock()
+        channel = make_channel(1)
+
+        await dispatch(bot, channel, "hello")
+
+        channel.send.assert_called_once_with("hello")
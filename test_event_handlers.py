@@ -15,6 +15,8 @@ from event_handlers import (
     handle_monster_invasion,
     handle_open_pvp_battle,
     handle_outlaw,
+    classify_message,
+    handle_guild_role_update,
 )
 from constants import (
     FSWAR_ROLE_NAME,
@@ -28,6 +30,10 @@ from constants import (
     MI_ROLE_NAME,
     PVP_BATTLE_ROLE_NAME,
     OUTLAW_ROLE_NAME,
+    SEASONAL_EVENT_ROLE_NAME,
+    PRIORITY_URGENT,
+    PRIORITY_LATER,
+    PRIORITY_BULK,
 )
 
 
@@ -470,3 +476,76 @@ class TestHandleOutlaw:
             # The exception should be caught and printed
             mock_print.assert_called()
 
+
+class TestClassifyMessage:
+    """Tests for classify_message"""
+
+    def test_classifies_exact_match_announcement(self):
+        event = classify_message("**HQ War starting in 5 minutes!**")
+
+        assert event.event_type == "hq_war"
+        assert event.role_name == HQWAR_ROLE_NAME
+        assert event.render("<@&1>") == "<@&1> HQ War starts in 5 minutes!"
+
+    def test_extracts_map_from_open_pvp_battle(self):
+        event = classify_message("**Open PvP Battle starts in 30 minutes in Downtown 4!**")
+
+        assert event.event_type == "open_pvp_battle"
+        assert event.role_name == PVP_BATTLE_ROLE_NAME
+        assert event.map == "Downtown 4"
+
+    def test_extracts_player_and_map_from_outlaw(self):
+        event = classify_message("**Player TestPlayer became an outlaw at street 2!**")
+
+        assert event.event_type == "outlaw"
+        assert event.player == "TestPlayer"
+        assert event.map == "street 2"
+        assert event.body == "TestPlayer became an outlaw at street 2!"
+
+    def test_classifies_active_seasonal_event(self):
+        with patch('special_events.GIANT_KASHAM', True):
+            event = classify_message("**Kasham event is here to defeat the Sun!**")
+
+        assert event.event_type == "giant_kasham"
+        assert event.role_name == SEASONAL_EVENT_ROLE_NAME
+
+    def test_returns_none_for_non_alert(self):
+        assert classify_message("Some random message") is None
+
+    def test_priority_follows_lead_time(self):
+        urgent = classify_message("**battle simulation opens in 5 minutes!**")
+        later = classify_message("**battle dimension starts in 30 minutes!**")
+        bulk = classify_message("**player TestPlayer became an outlaw at street 2!**")
+
+        assert urgent.priority == PRIORITY_URGENT
+        assert later.priority == PRIORITY_LATER
+        assert bulk.priority == PRIORITY_BULK
+
+    def test_event_is_immutable(self):
+        event = classify_message("**battle match opens in 30 minutes!**")
+
+        with pytest.raises(Exception):
+            event.body = "changed"
+
+
+class TestHandleGuildRoleUpdate:
+    """Tests for handle_guild_role_update"""
+
+    @pytest.mark.asyncio
+    async def test_revives_guild_only_for_the_bots_roles(self):
+        bot = MagicMock()
+        guild = MagicMock(id=7)
+        bot_role = MagicMock(guild=guild)
+        bot_role.name = "bot"
+        other_role = MagicMock(guild=guild)
+        other_role.name = "members"
+        guild.me.roles = [bot_role]
+        before = MagicMock(permissions=discord.Permissions.none())
+        before.name = "unchanged"
+        other_role.permissions = bot_role.permissions = discord.Permissions(send_messages=True)
+
+        await handle_guild_role_update(bot, before, other_role)
+        bot.guild_health.revive.assert_not_called()
+
+        await handle_guild_role_update(bot, before, bot_role)
+        bot.guild_health.revive.assert_called_once_with(7)
@@ -0,0 +1,142 @@
+"""Tests for fanout.py"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+import discord
+
+from fanout import fan_out, summarize_results, SENT, FORBIDDEN, MISSING_CHANNEL, ERROR, BACKOFF
+from guild_health import GuildHealthRegistry
+from constants import RM2_SERVER_ID, ALERTS_CHANNEL_NAME
+
+
+def make_guild(guild_id, with_channel=True):
+    """Create a mock guild, optionally with an alerts channel"""
+    guild = MagicMock()
+    guild.id = guild_id
+    guild.name = f"Guild {guild_id}"
+    guild.channels = []
+    if with_channel:
+        channel = AsyncMock()
+        channel.name = ALERTS_CHANNEL_NAME
+        guild.channels = [channel]
+    return guild
+
+
+class TestFanOut:
+    """Tests for fan_out"""
+
+    @pytest.mark.asyncio
+    async def test_delivers_to_every_guild(self):
+        guilds = [make_guild(i) for i in range(1, 6)]
+        deliver = AsyncMock()
+
+        results = await fan_out(guilds, deliver)
+
+        assert deliver.call_count == 5
+        assert {result.status for result in results.values()} == {SENT}
+
+    @pytest.mark.asyncio
+    async def test_skips_rm2_server(self):
+        guilds = [make_guild(RM2_SERVER_ID), make_guild(1)]
+        deliver = AsyncMock()
+
+        results = await fan_out(guilds, deliver)
+
+        assert list(results) == [1]
+        deliver.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_collects_result_per_guild(self):
+        forbidden = make_guild(1)
+        broken = make_guild(2)
+        missing = make_guild(3, with_channel=False)
+        ok = make_guild(4)
+
+        async def deliver(guild, alert_channel):
+            if guild is forbidden:
+                raise discord.Forbidden(MagicMock(), "test")
+            if guild is broken:
+                raise RuntimeError("boom")
+
+        results = await fan_out([forbidden, broken, missing, ok], deliver)
+
+        assert results[1].status == FORBIDDEN
+        assert results[2].status == ERROR
+        assert results[2].error == "boom"
+        assert results[3].status == MISSING_CHANNEL
+        assert results[4].status == SENT
+
+    @pytest.mark.asyncio
+    async def test_respects_concurrency_cap(self):
+        guilds = [make_guild(i) for i in range(1, 21)]
+        in_flight = 0
+        peak = 0
+
+        async def deliver(guild, alert_channel):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+
+        await fan_out(guilds, deliver, concurrency=4)
+
+        assert peak == 4
+
+
+class TestFanOutHealth:
+    """Tests for fan_out with a GuildHealthRegistry"""
+
+    @pytest.mark.asyncio
+    async def test_skips_broken_guild_until_reprobe(self):
+        now = [0.0]
+        health = GuildHealthRegistry(base_delay=60, max_delay=600, clock=lambda: now[0])
+        guild = make_guild(1, with_channel=False)
+
+        first = await fan_out([guild], AsyncMock(), health=health)
+        second = await fan_out([guild], AsyncMock(), health=health)
+        now[0] = 61
+        third = await fan_out([guild], AsyncMock(), health=health)
+
+        assert first[1].status == MISSING_CHANNEL
+        assert second[1].status == BACKOFF
+        assert third[1].status == MISSING_CHANNEL
+        assert health.get(1).failures == 2
+
+    @pytest.mark.asyncio
+    async def test_revive_probes_immediately(self):
+        health = GuildHealthRegistry(base_delay=60, max_delay=600, clock=lambda: 0.0)
+        guild = make_guild(1, with_channel=False)
+        await fan_out([guild], AsyncMock(), health=health)
+
+        guild.channels = make_guild(1).channels
+        health.revive(1)
+        results = await fan_out([guild], AsyncMock(), health=health)
+
+        assert results[1].status == SENT
+        assert health.get(1) is None
+
+    @pytest.mark.asyncio
+    async def test_precheck_skips_send_without_permission(self):
+        guild = make_guild(1, with_channel=False)
+        channel = MagicMock(spec=discord.TextChannel)
+        channel.name = ALERTS_CHANNEL_NAME
+        channel.permissions_for.return_value = discord.Permissions.none()
+        guild.channels = [channel]
+        deliver = AsyncMock()
+
+        results = await fan_out([guild], deliver)
+
+        assert results[1].status == FORBIDDEN
+        deliver.assert_not_called()
+
+
+class TestSummarizeResults:
+    """Tests for summarize_results"""
+
+    @pytest.mark.asyncio
+    async def test_counts_statuses(self):
+        guilds = [make_guild(1), make_guild(2), make_guild(3, with_channel=False)]
+        results = await fan_out(guilds, AsyncMock())
+
+        assert summarize_results(results) == "sent=2, missing_channel=1"
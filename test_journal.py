@@ -0,0 +1,149 @@
+"""Tests for journal.py"""
+import json
+import pytest
+
+from journal import AnnouncementJournal
+
+
+def item(event_type, announcement_time="2030-01-01T12:00:00"):
+    """Create an announcement dict"""
+    return {
+        "event_type": event_type,
+        "announcement_time": announcement_time,
+        "event_time": "2030-01-01T12:15:00",
+        "role_name": "test-role",
+        "message_template": "Test"
+    }
+
+
+class TestAnnouncementJournal:
+    """Tests for AnnouncementJournal"""
+
+    def test_replays_records_after_restart(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement=item("a"))
+        journal.append("add", announcement=item("b"))
+        journal.append("add", announcement=item("c"))
+        journal.append("cancel", event_type="b")
+        journal.append("fired", event_type="a", announcement_time="2030-01-01T12:00:00")
+
+        assert AnnouncementJournal(path).load() == [item("c")]
+
+    def test_appends_one_line_per_change(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.compact([item(f"event_{i}") for i in range(50)])
+        size = (tmp_path / "announcements.json").stat().st_size
+
+        journal.append("cancel", event_type="event_1")
+
+        assert (tmp_path / "announcements.json").stat().st_size == size
+        assert len((tmp_path / "announcements.json.journal").read_text().splitlines()) == 1
+
+    def test_ignores_torn_last_record(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement=item("a"))
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"seq": 2, "op": "add", "announ')
+
+        assert AnnouncementJournal(path).load() == [item("a")]
+
+    def test_appends_after_torn_record_survive_reload(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement=item("a"))
+        with open(journal.journal_path, 'a') as f:
+            f.write('{"seq": 2, "op": "add", "announ')
+
+        reopened = AnnouncementJournal(path)
+        assert reopened.load() == [item("a")]
+        reopened.append("add", announcement=item("b"))
+        reopened.append("add", announcement=item("c"))
+
+        assert AnnouncementJournal(path).load() == [item("a"), item("b"), item("c")]
+
+    def test_compaction_replaces_snapshot_and_empties_journal(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path, compact_after=2)
+        journal.append("add", announcement=item("a"))
+        journal.append("add", announcement=item("b"))
+        assert journal.needs_compaction()
+
+        journal.compact([item("a"), item("b")])
+
+        assert not journal.needs_compaction()
+        assert (tmp_path / "announcements.json.journal").read_text() == ""
+        assert AnnouncementJournal(path).load() == [item("a"), item("b")]
+
+    def test_compaction_threshold_grows_with_schedule(self, tmp_path):
+        journal = AnnouncementJournal(str(tmp_path / "announcements.json"), compact_after=2)
+        for name in "abc":
+            journal.append("add", announcement=item(name))
+
+        assert journal.needs_compaction(live_count=3)
+        assert not journal.needs_compaction(live_count=10)
+
+    def test_replays_removal_by_id(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement={**item("a"), "id": "1"})
+        journal.append("add", announcement={**item("a"), "id": "2"})
+        journal.append("remove", id="1")
+
+        assert [i["id"] for i in AnnouncementJournal(path).load()] == ["2"]
+
+    def test_records_already_in_snapshot_are_not_replayed(self, tmp_path):
+        """A crash between the snapshot rename and the journal truncation"""
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement=item("a"))
+        stale = (tmp_path / "announcements.json.journal").read_text()
+        journal.compact([item("a")])
+        (tmp_path / "announcements.json.journal").write_text(stale)
+
+        assert AnnouncementJournal(path).load() == [item("a")]
+
+    def test_loads_legacy_list_snapshot(self, tmp_path):
+        path = tmp_path / "announcements.json"
+        path.write_text(json.dumps([item("a")]))
+
+        assert AnnouncementJournal(str(path)).load() == [item("a")]
+
+    @pytest.mark.asyncio
+    async def test_batches_writes_off_the_event_loop(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        journal.append("add", announcement=item("a"))
+        journal.append("add", announcement=item("b"))
+
+        # nothing is written until the loop gets to run the flush
+        assert not (tmp_path / "announcements.json.journal").exists()
+
+        await journal.flush()
+
+        assert AnnouncementJournal(path).load() == [item("a"), item("b")]
+
+    @pytest.mark.asyncio
+    async def test_failed_background_write_is_retried_with_the_next(self, tmp_path):
+        path = str(tmp_path / "announcements.json")
+        journal = AnnouncementJournal(path)
+        write = journal._write
+        failures = [OSError("disk full")]
+
+        def flaky_write(snapshot, lines):
+            if failures:
+                raise failures.pop()
+            write(snapshot, lines)
+
+        journal._write = flaky_write
+        journal.compact([item("a")])
+        journal.append("add", announcement=item("b"))
+        await journal.flush()
+        assert not journal.exists()
+
+        journal.append("add", announcement=item("c"))
+        await journal.flush()
+
+        assert AnnouncementJournal(path).load() == [item("a"), item("b"), item("c")]
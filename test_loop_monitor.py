@@ -0,0 +1,34 @@
+"""Tests for loop_monitor.py"""
+import asyncio
+import time
+import pytest
+
+from loop_monitor import LoopLagMonitor
+from metrics import metrics
+
+
+class TestLoopLagMonitor:
+    """Tests for LoopLagMonitor"""
+
+    def test_only_lag_past_threshold_is_reported(self):
+        metrics.reset()
+        monitor = LoopLagMonitor(threshold=0.1)
+
+        monitor.record(0.01)
+        monitor.record(0.25)
+
+        assert metrics.counters["loop_lag_warnings"] == 1
+        assert metrics.timings["loop_lag_seconds"].count == 2
+
+    @pytest.mark.asyncio
+    async def test_detects_blocking_callback(self):
+        metrics.reset()
+        monitor = LoopLagMonitor(interval=0.01, threshold=0.05)
+        monitor.start()
+        await asyncio.sleep(0)
+
+        time.sleep(0.1)  # blocks the loop
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+        assert metrics.counters["loop_lag_warnings"] >= 1
@@ -0,0 +1,137 @@
+"""Tests for outbox.py"""
+import asyncio
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+from outbox import AlertOutbox, retime_event, useful_window, with_retries
+from alerts import AlertEvent
+from fanout import DeliveryResult, SENT, ERROR, FORBIDDEN
+from constants import HQWAR_ROLE_NAME, OUTLAW_ROLE_NAME, OUTBOX_MIN_WINDOW_SECONDS, OUTBOX_EVENT_MARGIN_SECONDS
+
+
+def hq_war():
+    """Create an HQ War AlertEvent"""
+    return AlertEvent("hq_war", HQWAR_ROLE_NAME, "HQ War starts in 5 minutes!")
+
+
+class FakeClock:
+    """Manually advanced wall clock"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestAlertOutbox:
+    """Tests for AlertOutbox"""
+
+    def test_undelivered_guilds_are_replayed_after_restart(self, tmp_path):
+        path = str(tmp_path / "outbox.db")
+        outbox = AlertOutbox(path)
+        alert_id = outbox.record(hq_war(), [1, 2, 3])
+        outbox.mark_done(alert_id, 1)
+        outbox.close()
+
+        restarted = AlertOutbox(path)
+        pending = restarted.pending()
+
+        assert len(pending) == 1
+        assert pending[0][1] == hq_war()
+        assert pending[0][2] == {2, 3}
+
+    def test_in_flight_alerts_are_not_pending(self, tmp_path):
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"))
+        outbox.record(hq_war(), [1, 2])
+
+        assert outbox.pending() == []
+
+    def test_finish_keeps_only_errored_guilds(self, tmp_path):
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"))
+        alert_id = outbox.record(hq_war(), [1, 2, 3])
+        outbox.finish(alert_id, {
+            1: DeliveryResult(1, "one", SENT),
+            2: DeliveryResult(2, "two", ERROR, "503"),
+            3: DeliveryResult(3, "three", FORBIDDEN),
+        })
+
+        assert [guilds for _, _, guilds in outbox.pending()] == [{2}]
+
+    def test_expired_alerts_are_dropped(self, tmp_path):
+        clock = FakeClock()
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"), clock=clock)
+        alert_id = outbox.record(hq_war(), [1])
+        outbox.finish(alert_id, {1: DeliveryResult(1, "one", ERROR, "timeout")})
+
+        clock.now += useful_window(hq_war()) + 1
+
+        assert outbox.pending() == []
+
+    def test_round_trips_next_event_time(self, tmp_path):
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"))
+        event = AlertEvent("big_santa", "Seasonal", "Big Santa spawned!",
+                           next_event_time=datetime(2025, 12, 24, 12, 0, tzinfo=timezone.utc))
+        alert_id = outbox.record(event, [1])
+        outbox.finish(alert_id, {1: DeliveryResult(1, "one", ERROR, "timeout")})
+
+        assert outbox.pending()[0][1] == event
+
+    def test_useful_window_has_a_floor(self):
+        outlaw = AlertEvent("outlaw", OUTLAW_ROLE_NAME, "A became an outlaw at X!")
+
+        assert useful_window(outlaw) == OUTBOX_MIN_WINDOW_SECONDS
+        assert useful_window(AlertEvent("battle_match", "BM", "...")) == 30 * 60 - OUTBOX_EVENT_MARGIN_SECONDS
+
+    def test_replays_say_how_long_is_left(self, tmp_path):
+        clock = FakeClock()
+        outbox = AlertOutbox(str(tmp_path / "outbox.db"), clock=clock)
+        alert_id = outbox.record(hq_war(), [1])
+        outbox.finish(alert_id, {1: DeliveryResult(1, "one", ERROR, "timeout")})
+
+        clock.now += 150
+
+        assert outbox.pending()[0][1].body == "HQ War starts in 3 minutes!"
+
+    def test_retime_event(self):
+        uni = AlertEvent("uni", "Uni", "Uni open for 5 minutes")
+
+        assert retime_event(uni, 30) is uni
+        assert retime_event(uni, 250).body == "Uni open for 1 minute"
+
+
+class TestWithRetries:
+    """Tests for with_retries"""
+
+    @pytest.mark.asyncio
+    async def test_retries_server_errors_then_succeeds(self):
+        response = MagicMock(status=503, reason="Service Unavailable")
+        send = AsyncMock(side_effect=[discord.DiscordServerError(response, "down"), asyncio.TimeoutError(), "ok"])
+
+        with patch('outbox.asyncio.sleep', new=AsyncMock()) as sleep:
+            assert await with_retries(send) == "ok"
+
+        assert send.await_count == 3
+        assert sleep.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_does_not_retry_client_errors(self):
+        response = MagicMock(status=403, reason="Forbidden")
+        send = AsyncMock(side_effect=discord.Forbidden(response, "no"))
+
+        with pytest.raises(discord.Forbidden):
+            await with_retries(send)
+
+        assert send.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_gives_up_after_attempts(self):
+        send = AsyncMock(side_effect=asyncio.TimeoutError())
+
+        with patch('outbox.asyncio.sleep', new=AsyncMock()):
+            with pytest.raises(asyncio.TimeoutError):
+                await with_retries(send, attempts=3)
+
+        assert send.await_count == 3
@@ -0,0 +1,58 @@
+"""Tests for recurrence.py"""
+from datetime import datetime, time
+
+from recurrence import IntervalRule, DailyRule, SeasonalRule, rule_from_dict
+
+
+class TestIntervalRule:
+    """Tests for IntervalRule"""
+
+    def test_next_after_steps_from_anchor(self):
+        rule = IntervalRule(minutes=420, anchor=datetime(2024, 12, 1, 12, 0))
+
+        assert rule.next_after(datetime(2024, 12, 1, 11, 0)) == datetime(2024, 12, 1, 12, 0)
+        assert rule.next_after(datetime(2024, 12, 1, 12, 0)) == datetime(2024, 12, 1, 19, 0)
+        assert rule.next_after(datetime(2024, 12, 3, 0, 0)) == datetime(2024, 12, 3, 6, 0)
+
+    def test_stops_after_until(self):
+        rule = IntervalRule(minutes=60, anchor=datetime(2024, 1, 1, 12, 0), until=datetime(2024, 1, 1, 13, 0))
+
+        assert rule.next_after(datetime(2024, 1, 1, 12, 30)) == datetime(2024, 1, 1, 13, 0)
+        assert rule.next_after(datetime(2024, 1, 1, 13, 0)) is None
+
+
+class TestDailyRule:
+    """Tests for DailyRule"""
+
+    def test_next_time_today_or_tomorrow(self):
+        rule = DailyRule(times=(time(20, 0), time(8, 0)))
+
+        assert rule.next_after(datetime(2024, 1, 1, 9, 0)) == datetime(2024, 1, 1, 20, 0)
+        assert rule.next_after(datetime(2024, 1, 1, 20, 0)) == datetime(2024, 1, 2, 8, 0)
+
+    def test_only_on_weekdays(self):
+        # 2024-01-01 is a Monday
+        rule = DailyRule(times=(time(18, 0),), weekdays=frozenset({5, 6}))
+
+        assert rule.next_after(datetime(2024, 1, 1, 0, 0)) == datetime(2024, 1, 6, 18, 0)
+
+
+class TestSeasonalRule:
+    """Tests for SeasonalRule"""
+
+    def test_skips_to_next_season(self):
+        rule = SeasonalRule(DailyRule(times=(time(12, 0),)), start=(12, 1), end=(1, 6))
+
+        assert rule.next_after(datetime(2024, 12, 31, 13, 0)) == datetime(2025, 1, 1, 12, 0)
+        assert rule.next_after(datetime(2025, 1, 6, 13, 0)) == datetime(2025, 12, 1, 12, 0)
+
+    def test_round_trips_through_dict(self):
+        rule = SeasonalRule(
+            IntervalRule(minutes=420, anchor=datetime(2024, 12, 1, 12, 0)),
+            start=(12, 1),
+            end=(1, 6)
+        )
+        daily = DailyRule(times=(time(8, 0), time(20, 0)), weekdays=frozenset({0, 2}))
+
+        assert rule_from_dict(rule.to_dict()) == rule
+        assert rule_from_dict(daily.to_dict()) == daily
@@ -0,0 +1,292 @@
+"""Tests for reminders.py, dm_worker.py and reminder_commands.py"""
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import discord
+from reminders import ReminderSubscriptions
+from dm_worker import DMWorkerPool
+from reminder_commands import handle_reminder_command
+from scheduler import AnnouncementScheduler
+from recurrence import IntervalRule
+from metrics import metrics
+from writebehind import WriteBehind
+
+
+class TestReminderSubscriptions:
+    """Tests for ReminderSubscriptions"""
+
+    def test_indexes_users_by_lead_time(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        reminders.subscribe(1, "big_santa", 30)
+        reminders.subscribe(2, "big_santa", 30)
+        reminders.subscribe(3, "big_santa", 10)
+
+        assert reminders.leads("big_santa") == {30, 10}
+        assert sorted(reminders.users("big_santa", 30)) == [1, 2]
+
+    def test_resubscribing_moves_the_user(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        reminders.subscribe(1, "big_santa", 30)
+        reminders.subscribe(1, "big_santa", 10)
+
+        assert reminders.leads("big_santa") == {10}
+        assert reminders.for_user(1) == {"big_santa": 10}
+
+    def test_persists_across_restarts(self, tmp_path):
+        path = str(tmp_path / "reminders.db")
+        reminders = ReminderSubscriptions(path)
+        reminders.subscribe(1, "big_santa", 30)
+        reminders.subscribe(2, "big_santa", 30)
+        assert reminders.unsubscribe(2, "big_santa") is True
+        assert reminders.unsubscribe(2, "big_santa") is False
+        reminders.close()
+
+        reloaded = ReminderSubscriptions(path)
+
+        assert reloaded.users("big_santa", 30) == [1]
+        assert len(reloaded) == 1
+
+    def test_writes_through_background_writer(self, tmp_path):
+        path = str(tmp_path / "reminders.db")
+        writer = WriteBehind()
+        reminders = ReminderSubscriptions(path, writer=writer)
+        reminders.subscribe(1, "big_santa", 30)
+        reminders.subscribe(1, "big_santa", 10)
+        reminders.subscribe(2, "big_santa", 30)
+        reminders.unsubscribe(2, "big_santa")
+
+        assert reminders.for_user(1) == {"big_santa": 10}
+        reminders.close()
+        writer.close()
+
+        reloaded = ReminderSubscriptions(path)
+        assert reloaded.for_user(1) == {"big_santa": 10}
+        assert len(reloaded) == 1
+
+
+class TestDMWorkerPool:
+    """Tests for DMWorkerPool"""
+
+    @pytest.mark.asyncio
+    async def test_sends_batch_and_counts_closed_dms(self):
+        users = {}
+        for user_id in range(1, 21):
+            user = MagicMock()
+            user.send = AsyncMock()
+            users[user_id] = user
+        response = MagicMock(status=403, reason="Forbidden")
+        users[5].send = AsyncMock(side_effect=discord.Forbidden(response, "Cannot send messages to this user"))
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=users.get)
+        metrics.reset()
+
+        pool = DMWorkerPool(bot, workers=4)
+        pool.send_batch(users.keys(), "Reminder!")
+        await pool.join()
+        pool.close()
+
+        for user_id, user in users.items():
+            user.send.assert_called_once_with("Reminder!")
+        assert metrics.counters["dm_sent"] == 19
+        assert metrics.counters["dm_forbidden"] == 1
+
+
+    @pytest.mark.asyncio
+    async def test_dedups_waiting_dms_and_skips_unreachable_users(self):
+        closed = MagicMock(id=1)
+        response = MagicMock(status=403, reason="Forbidden")
+        closed.send = AsyncMock(side_effect=discord.Forbidden(response, "Cannot send messages to this user"))
+        user = MagicMock(id=2)
+        user.send = AsyncMock()
+        metrics.reset()
+
+        pool = DMWorkerPool(MagicMock(), workers=1)
+        pool.send(user, "subscribed to A", key="subscription")
+        pool.send(user, "subscribed to A and B", key="subscription")
+        pool.send(closed, "hello")
+        await pool.join()
+        pool.send(closed, "hello again")
+        await pool.join()
+        pool.close()
+
+        user.send.assert_called_once_with("subscribed to A and B")
+        closed.send.assert_called_once()
+        assert pool.is_unreachable(1)
+        assert metrics.counters["dm_deduplicated"] == 1
+        assert metrics.counters["dm_skipped_unreachable"] == 1
+
+    @pytest.mark.asyncio
+    async def test_notices_share_one_rate_budget(self):
+        now = [0.0]
+        users = [MagicMock(id=i, send=AsyncMock()) for i in range(3)]
+        pool = DMWorkerPool(MagicMock(), notice_workers=3, rate_limit=2, rate_period=60, clock=lambda: now[0])
+
+        for user in users:
+            pool.send(user, "hi")
+        await asyncio.sleep(0.01)
+
+        assert sum(user.send.call_count for user in users) == 2
+        pool.close()
+
+    @pytest.mark.asyncio
+    async def test_reminder_batch_bypasses_notice_cap_and_budget(self):
+        users = {user_id: MagicMock(id=user_id, send=AsyncMock()) for user_id in range(50)}
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=users.get)
+        confirmed = MagicMock(id=100, send=AsyncMock())
+        pool = DMWorkerPool(bot, workers=4, max_queued=5, rate_limit=1, rate_period=60)
+
+        pool.send_batch(users.keys(), "Reminder!", expires_in=60)
+        pool.send(confirmed, "subscribed")
+        await pool.join()
+        pool.close()
+
+        assert all(user.send.call_count == 1 for user in users.values())
+        confirmed.send.assert_called_once_with("subscribed")
+
+    @pytest.mark.asyncio
+    async def test_drops_reminders_once_the_event_started(self):
+        now = [0.0]
+        users = {user_id: MagicMock(id=user_id, send=AsyncMock()) for user_id in range(3)}
+        bot = MagicMock()
+        bot.get_user = MagicMock(side_effect=users.get)
+        metrics.reset()
+        pool = DMWorkerPool(bot, workers=1, clock=lambda: now[0])
+
+        pool.send_batch(users.keys(), "Reminder!", expires_in=60)
+        now[0] = 61
+        await pool.join()
+        pool.close()
+
+        assert not any(user.send.called for user in users.values())
+        assert metrics.counters["dm_expired"] == 3
+
+
+class TestDMReminderScheduling:
+    """Tests for DM reminders in the scheduler"""
+
+    @pytest.mark.asyncio
+    async def test_one_timer_per_lead_time_and_batched_send(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        for user_id in range(1000):
+            reminders.subscribe(user_id, "big_santa", 30 if user_id % 2 else 10)
+        dm_workers = MagicMock()
+        bot = MagicMock()
+        bot.guilds = []
+        bot.wait_until_ready = AsyncMock()
+
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler.check_announcements, 'start', MagicMock()):
+                scheduler = AnnouncementScheduler(bot, reminders=reminders, dm_workers=dm_workers)
+            event_time = datetime.now() + timedelta(hours=1)
+            scheduler.schedule_event("big_santa", event_time, "test-role", {15: "{role} soon"})
+
+            dm_timers = [a for a in scheduler.announcements if a.kind == "dm"]
+            assert sorted(a.lead_minutes for a in dm_timers) == [10, 30]
+
+            await scheduler.send_announcement(dm_timers[0])
+
+        dm_workers.send_batch.assert_called_once()
+        recipients, content = dm_workers.send_batch.call_args.args
+        assert len(recipients) == 500
+        assert 0 < dm_workers.send_batch.call_args.kwargs["expires_in"] <= 60 * 60
+        assert content.startswith("Reminder: Big Santa will spawn in")
+
+    def test_refresh_adds_timer_for_new_lead_time(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        bot = MagicMock()
+        bot.guilds = []
+        bot.wait_until_ready = AsyncMock()
+
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                scheduler = AnnouncementScheduler(bot, reminders=reminders, dm_workers=MagicMock())
+            scheduler.schedule_event("big_santa", datetime.now() + timedelta(hours=1), "test-role", {15: "soon"})
+
+            reminders.subscribe(1, "big_santa", 45)
+            scheduler.refresh_dm_reminders("big_santa")
+
+        assert [(a.kind, a.lead_minutes) for a in scheduler.announcements] == [("dm", 45), ("channel", 15)]
+
+    def test_refresh_targets_the_current_occurrence(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        bot = MagicMock()
+        bot.guilds = []
+
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                scheduler = AnnouncementScheduler(bot, reminders=reminders, dm_workers=MagicMock())
+            event_time = datetime.now() + timedelta(minutes=30)
+            # the 60 minute reminder has passed and waits for the next occurrence
+            scheduler.schedule_event(
+                "big_santa", event_time, "test-role", {60: "in an hour", 15: "soon"},
+                recurrence=IntervalRule(minutes=420, anchor=event_time)
+            )
+
+            reminders.subscribe(1, "big_santa", 10)
+            scheduler.refresh_dm_reminders("big_santa")
+
+        dm_timers = [a for a in scheduler.announcements if a.kind == "dm"]
+        assert [a.event_time for a in dm_timers] == [event_time]
+
+
+    def test_reschedule_keeps_channel_role_with_dm_timers(self, tmp_path):
+        reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        for user_id, lead in enumerate((5, 10, 20, 30, 45)):
+            reminders.subscribe(user_id, "big_santa", lead)
+        bot = MagicMock()
+        bot.guilds = []
+
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                scheduler = AnnouncementScheduler(bot, reminders=reminders, dm_workers=MagicMock())
+            group_id = scheduler.schedule_event(
+                "big_santa", datetime.now() + timedelta(hours=1), "test-role", {15: "soon"}
+            )
+            scheduler.reschedule_event(group_id, datetime.now() + timedelta(hours=3))
+
+        channel = [a for a in scheduler.announcements if a.kind == "channel"]
+        assert [a.role_name for a in channel] == ["test-role"]
+
+
+class TestReminderCommands:
+    """Tests for handle_reminder_command"""
+
+    @pytest.fixture
+    def bot(self, tmp_path):
+        bot = MagicMock()
+        bot.reminders = ReminderSubscriptions(str(tmp_path / "reminders.db"))
+        bot.dispatcher = None
+        return bot
+
+    def make_message(self, content):
+        message = MagicMock()
+        message.content = content
+        message.author.id = 42
+        message.channel.send = AsyncMock()
+        return message
+
+    @pytest.mark.asyncio
+    async def test_remind_subscribes_and_refreshes_scheduler(self, bot):
+        message = self.make_message("!remind big_santa 20")
+
+        assert await handle_reminder_command(message, bot) is True
+
+        assert bot.reminders.for_user(42) == {"big_santa": 20}
+        bot.scheduler.refresh_dm_reminders.assert_called_once_with("big_santa")
+
+    @pytest.mark.asyncio
+    async def test_rejects_unknown_event_and_bad_lead(self, bot):
+        for content in ("!remind nothing 20", "!remind big_santa 0", "!remind big_santa soon"):
+            assert await handle_reminder_command(self.make_message(content), bot) is True
+
+        assert len(bot.reminders) == 0
+
+    @pytest.mark.asyncio
+    async def test_ignores_other_messages(self, bot):
+        assert await handle_reminder_command(self.make_message("hello"), bot) is False
@@ -0,0 +1,112 @@
+"""Tests for role_updates.py"""
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+import discord
+from role_updates import RoleUpdateBatcher
+from metrics import metrics
+
+
+def make_role(role_id, name, default=False):
+    """Create a mock role"""
+    role = MagicMock()
+    role.id = role_id
+    role.name = name
+    role.is_default.return_value = default
+    return role
+
+
+@pytest.fixture
+def roles():
+    return {
+        "everyone": make_role(1, "@everyone", default=True),
+        "war": make_role(2, "war-alerts"),
+        "uni": make_role(3, "uni-alerts"),
+        "pvp": make_role(4, "pvp-alerts"),
+    }
+
+
+@pytest.fixture
+def member(roles):
+    member = MagicMock()
+    member.id = 42
+    member.roles = [roles["everyone"], roles["pvp"]]
+    member.edit = AsyncMock()
+    member.send = AsyncMock()
+    return member
+
+
+@pytest.fixture
+def guild(member):
+    guild = MagicMock(id=7)
+    guild.name = "Test Guild"
+    guild.get_member = MagicMock(side_effect={member.id: member}.get)
+    return guild
+
+
+@pytest.fixture
+def bot():
+    bot = MagicMock()
+    bot.dispatcher = None
+    bot.subscribers = MagicMock()
+    return bot
+
+
+class TestRoleUpdateBatcher:
+    """Tests for RoleUpdateBatcher"""
+
+    @pytest.mark.asyncio
+    async def test_reactions_in_window_become_one_edit_and_one_dm(self, bot, guild, member, roles):
+        batcher = RoleUpdateBatcher(bot, window=0.01)
+
+        batcher.submit(guild, member, roles["war"], "War", wanted=True)
+        batcher.submit(guild, member, roles["uni"], "Uni", wanted=True)
+        batcher.submit(guild, member, roles["pvp"], "PvP", wanted=False)
+        await asyncio.sleep(0.05)
+
+        member.edit.assert_called_once()
+        assert member.edit.call_args.kwargs["roles"] == [roles["war"], roles["uni"]]
+        member.send.assert_called_once_with(
+            "You have subscribed to War, Uni and unsubscribed from PvP alerts in Test Guild!"
+        )
+        bot.subscribers.remove.assert_called_once_with(7, "pvp-alerts", 42)
+
+    @pytest.mark.asyncio
+    async def test_toggle_back_and_forth_does_nothing(self, bot, guild, member, roles):
+        metrics.reset()
+        batcher = RoleUpdateBatcher(bot, window=60)
+
+        batcher.submit(guild, member, roles["war"], "War", wanted=True)
+        batcher.submit(guild, member, roles["war"], "War", wanted=False)
+        assert batcher.pending(7, 42) == {"war-alerts": False}
+        await batcher.flush()
+
+        member.edit.assert_not_called()
+        member.send.assert_not_called()
+        assert metrics.counters["role_updates_noop"] == 1
+
+    @pytest.mark.asyncio
+    async def test_forbidden_sends_one_error(self, bot, guild, member, roles):
+        member.edit.side_effect = discord.Forbidden(MagicMock(status=403), "Missing Permissions")
+        batcher = RoleUpdateBatcher(bot, window=60)
+
+        batcher.submit(guild, member, roles["war"], "War", wanted=True)
+        await batcher.flush()
+
+        member.send.assert_called_once()
+        bot.routes.invalidate_permissions.assert_called_once_with(7)
+        bot.subscribers.add.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_edits_from_the_cached_member_not_the_event_snapshot(self, bot, guild, member, roles):
+        # the reaction carried a copy taken before the member got uni-alerts
+        snapshot = MagicMock(id=42, roles=[roles["everyone"], roles["pvp"]], send=AsyncMock())
+        member.roles = [roles["everyone"], roles["pvp"], roles["uni"]]
+        batcher = RoleUpdateBatcher(bot, window=60)
+
+        batcher.submit(guild, snapshot, roles["war"], "War", wanted=True)
+        await batcher.flush()
+
+        snapshot.edit.assert_not_called()
+        assert member.edit.call_args.kwargs["roles"] == [roles["pvp"], roles["uni"], roles["war"]]
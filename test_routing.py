@@ -0,0 +1,133 @@
+"""Tests for routing.py"""
+import pytest
+from unittest.mock import MagicMock
+
+from routing import GuildRoutingTable, MANAGEABLE, MISSING_PERMISSION, ROLE_TOO_HIGH
+from constants import ALERTS_CHANNEL_NAME, FSWAR_ROLE_NAME, HQWAR_ROLE_NAME
+
+
+def make_role(name, mention):
+    """Create a mock role"""
+    role = MagicMock()
+    role.name = name
+    role.mention = mention
+    return role
+
+
+def make_channel(name):
+    """Create a mock channel"""
+    channel = MagicMock()
+    channel.name = name
+    return channel
+
+
+@pytest.fixture
+def mock_guild():
+    """Create a mock guild with an alerts channel and one alert role"""
+    guild = MagicMock()
+    guild.id = 12345
+    guild.channels = [make_channel("general"), make_channel(ALERTS_CHANNEL_NAME)]
+    guild.roles = [make_role("everyone", "@everyone"), make_role(FSWAR_ROLE_NAME, "<@&1>")]
+    for item in guild.channels + guild.roles:
+        item.guild = guild
+    return guild
+
+
+class TestGuildRoutingTable:
+    """Tests for GuildRoutingTable"""
+
+    def test_routes_alert_channel_and_mentions(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+
+        assert routes.alert_channel(mock_guild) is mock_guild.channels[1]
+        assert routes.role_mention(mock_guild, FSWAR_ROLE_NAME) == "<@&1>"
+        assert routes.role_mention(mock_guild, HQWAR_ROLE_NAME) == f"@{HQWAR_ROLE_NAME}"
+
+    def test_builds_route_lazily(self, mock_guild):
+        routes = GuildRoutingTable()
+
+        assert mock_guild.id not in routes
+        assert routes.alert_channel(mock_guild) is mock_guild.channels[1]
+        assert mock_guild.id in routes
+
+    def test_lookups_do_not_rescan_guild(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+        mock_guild.channels = []
+        mock_guild.roles = []
+
+        assert routes.alert_channel(mock_guild) is not None
+        assert routes.role_mention(mock_guild, FSWAR_ROLE_NAME) == "<@&1>"
+
+    def test_channel_delete_refreshes_route(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+        alerts_channel = mock_guild.channels.pop()
+
+        routes.on_channel_change(alerts_channel)
+
+        assert routes.alert_channel(mock_guild) is None
+
+    def test_unrelated_channel_change_is_ignored(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+        mock_guild.channels = []
+
+        routes.on_channel_change(make_channel("general"), before_name="general")
+
+        assert routes.alert_channel(mock_guild) is not None
+
+    def test_role_rename_refreshes_route(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+        role = mock_guild.roles[1]
+        role.name = HQWAR_ROLE_NAME
+
+        routes.on_role_change(role, before_name=FSWAR_ROLE_NAME)
+
+        assert routes.role_mention(mock_guild, HQWAR_ROLE_NAME) == "<@&1>"
+        assert routes.role_mention(mock_guild, FSWAR_ROLE_NAME) == f"@{FSWAR_ROLE_NAME}"
+
+    def test_remove_forgets_guild(self, mock_guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([mock_guild])
+
+        routes.remove(mock_guild.id)
+
+        assert mock_guild.id not in routes
+
+
+class TestManageStatus:
+    """Tests for the cached can-manage checks"""
+
+    @pytest.fixture
+    def guild(self, mock_guild):
+        mock_guild.roles[1].position = 3
+        mock_guild.me.top_role.position = 5
+        mock_guild.me.guild_permissions.manage_roles = True
+        return mock_guild
+
+    def test_status_is_cached_until_invalidated(self, guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([guild])
+
+        assert routes.manage_status(guild, FSWAR_ROLE_NAME) == MANAGEABLE
+        guild.me.top_role.position = 2
+        assert routes.manage_status(guild, FSWAR_ROLE_NAME) == MANAGEABLE
+
+        routes.invalidate_permissions(guild.id)
+        assert routes.manage_status(guild, FSWAR_ROLE_NAME) == ROLE_TOO_HIGH
+
+    def test_any_role_change_invalidates(self, guild):
+        routes = GuildRoutingTable()
+        routes.rebuild([guild])
+        routes.manage_status(guild, FSWAR_ROLE_NAME)
+        guild.me.guild_permissions.manage_roles = False
+
+        bot_role = make_role("bot role", "<@&9>")
+        bot_role.guild = guild
+        routes.on_role_change(bot_role)
+
+        assert routes.alert_role(guild, FSWAR_ROLE_NAME) is guild.roles[1]
+        assert routes.manage_status(guild, FSWAR_ROLE_NAME) == MISSING_PERMISSION
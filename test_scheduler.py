@@ -1,12 +1,15 @@
 """Tests for scheduler.py"""
+import asyncio
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch, mock_open
 from datetime import datetime, timedelta
 import json
 import os
 
-from scheduler import ScheduledAnnouncement, AnnouncementScheduler
+from scheduler import ScheduledAnnouncement, AnnouncementScheduler, AnnouncementQueue
 from constants import RM2_SERVER_ID, ALERTS_CHANNEL_NAME
+from recurrence import IntervalRule
+from metrics import metrics
 
 
 class TestScheduledAnnouncement:
@@ -487,3 +490,429 @@ class TestAnnouncementScheduler:
                         # Should not raise an exception
                         await scheduler.send_announcement(announcement)
 
+
+
+class TestAnnouncementQueue:
+    """Tests for AnnouncementQueue"""
+    
+    def make_announcement(self, event_type, minutes):
+        """Create an announcement due the given number of minutes from a fixed time"""
+        announcement_time = datetime(2024, 1, 1, 12, 0, 0) + timedelta(minutes=minutes)
+        return ScheduledAnnouncement(
+            event_type=event_type,
+            announcement_time=announcement_time,
+            event_time=announcement_time + timedelta(minutes=15),
+            role_name="test-role",
+            message_template="Test"
+        )
+    
+    def test_orders_by_announcement_time(self):
+        """Test that indexing and iteration follow announcement time"""
+        queue = AnnouncementQueue()
+        for event_type, minutes in [("c", 30), ("a", 10), ("b", 20)]:
+            queue.append(self.make_announcement(event_type, minutes))
+        
+        assert queue[0].event_type == "a"
+        assert [a.event_type for a in queue] == ["a", "b", "c"]
+        assert queue.next_time() == datetime(2024, 1, 1, 12, 10, 0)
+    
+    def test_pop_due_only_returns_due_announcements(self):
+        """Test that pop_due removes due announcements and leaves the rest"""
+        queue = AnnouncementQueue(
+            self.make_announcement(event_type, minutes) for event_type, minutes in [("a", 10), ("b", 20), ("c", 30)]
+        )
+        
+        due = queue.pop_due(datetime(2024, 1, 1, 12, 20, 0))
+        
+        assert [a.event_type for a in due] == ["a", "b"]
+        assert [a.event_type for a in queue] == ["c"]
+    
+    def test_remove(self):
+        """Test that remove takes out exactly the given announcement"""
+        first = self.make_announcement("a", 10)
+        second = self.make_announcement("b", 20)
+        queue = AnnouncementQueue([first, second])
+        
+        queue.remove(first)
+        
+        assert list(queue) == [second]
+        with pytest.raises(ValueError):
+            queue.remove(first)
+    
+    def test_indexes_by_event_type_and_guild(self):
+        """Test the event type and guild indexes track appends and removals"""
+        everyone = self.make_announcement("big_santa", 10)
+        guild_reminder = self.make_announcement("big_santa", 5)
+        guild_reminder.guild_id = 42
+        queue = AnnouncementQueue([everyone, guild_reminder])
+        
+        assert {a.id for a in queue.with_event_type("big_santa")} == {everyone.id, guild_reminder.id}
+        assert queue.for_guild(42) == [guild_reminder]
+        
+        queue.remove(guild_reminder)
+        
+        assert queue.with_event_type("big_santa") == [everyone]
+        assert queue.for_guild(42) == []
+        assert queue[0] is everyone
+        assert queue.get(guild_reminder.id) is None
+    
+    def test_removed_entries_are_skipped_when_due(self):
+        """Test that lazily deleted heap entries are never returned"""
+        announcements = [self.make_announcement(f"event_{i}", i) for i in range(1000)]
+        queue = AnnouncementQueue(announcements)
+        for announcement in announcements[:900]:
+            queue.remove(announcement)
+        
+        due = queue.pop_due(datetime(2030, 1, 1))
+        
+        assert due == announcements[900:]
+        assert len(queue) == 0
+
+
+class TestMultipleAnnouncements:
+    """Tests for keeping several announcements per event type"""
+    
+    @pytest.fixture
+    def scheduler(self, tmp_path):
+        """Create a scheduler with its background task disabled"""
+        bot = MagicMock()
+        bot.guilds = []
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                yield AnnouncementScheduler(bot)
+    
+    def schedule_lead(self, scheduler, minutes, **kwargs):
+        """Schedule a big_santa announcement the given minutes before the event"""
+        event_time = datetime.now() + timedelta(hours=1)
+        return scheduler.schedule(
+            event_type="big_santa",
+            announcement_time=event_time - timedelta(minutes=minutes),
+            event_time=event_time,
+            role_name="test-role",
+            message_template=f"{minutes} minutes",
+            replace=False,
+            **kwargs
+        )
+    
+    def test_schedule_without_replace_keeps_both(self, scheduler):
+        """Test that replace=False keeps earlier announcements for the event type"""
+        self.schedule_lead(scheduler, 15)
+        self.schedule_lead(scheduler, 5)
+        
+        assert [a.message_template for a in scheduler.announcements] == ["15 minutes", "5 minutes"]
+    
+    def test_cancel_id_removes_only_that_announcement(self, scheduler):
+        """Test that cancel_id leaves the event type's other announcements"""
+        first = self.schedule_lead(scheduler, 15)
+        second = self.schedule_lead(scheduler, 5)
+        
+        assert scheduler.cancel_id(first.id) is True
+        assert scheduler.cancel_id(first.id) is False
+        assert list(scheduler.announcements) == [second]
+    
+    def test_ids_and_cancellations_survive_reload(self, scheduler):
+        """Test that per-id cancellations are replayed from the journal"""
+        first = self.schedule_lead(scheduler, 15)
+        second = self.schedule_lead(scheduler, 5, guild_id=42)
+        scheduler.cancel_id(first.id)
+        
+        with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+            mock_task.start = MagicMock()
+            reloaded = AnnouncementScheduler(scheduler.bot)
+        
+        assert [(a.id, a.guild_id) for a in reloaded.announcements] == [(second.id, 42)]
+    
+    @pytest.mark.asyncio
+    async def test_guild_announcement_only_goes_to_that_guild(self, scheduler):
+        """Test that an announcement with a guild_id isn't sent to other guilds"""
+        channels = {}
+        for guild_id in (1, 2):
+            guild = MagicMock()
+            guild.id = guild_id
+            guild.name = f"Guild {guild_id}"
+            channel = AsyncMock()
+            channel.name = ALERTS_CHANNEL_NAME
+            guild.channels = [channel]
+            scheduler.bot.guilds.append(guild)
+            channels[guild_id] = channel
+        
+        announcement = ScheduledAnnouncement(
+            event_type="test_event",
+            announcement_time=datetime.now(),
+            event_time=datetime.now() + timedelta(minutes=15),
+            role_name="test-role",
+            message_template="{role} Test {timestamp}",
+            guild_id=2
+        )
+        
+        with patch('scheduler.get_role_mention', return_value="<@&1>"):
+            await scheduler.send_announcement(announcement)
+        
+        channels[1].send.assert_not_called()
+        channels[2].send.assert_called_once()
+
+
+class TestRecurringAnnouncements:
+    """Tests for recurring announcements"""
+    
+    @pytest.fixture
+    def scheduler(self, tmp_path):
+        """Create a scheduler with its background task disabled"""
+        bot = MagicMock()
+        bot.guilds = []
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                yield AnnouncementScheduler(bot)
+    
+    def test_only_next_occurrence_is_pending(self, scheduler):
+        """Test that a recurring schedule stores a single entry"""
+        anchor = datetime.now() + timedelta(hours=1)
+        announcement = scheduler.schedule_recurring(
+            event_type="big_santa",
+            rule=IntervalRule(minutes=420, anchor=anchor),
+            lead_minutes=15,
+            role_name="test-role",
+            message_template="Soon"
+        )
+        
+        assert len(scheduler.announcements) == 1
+        assert announcement.event_time == anchor
+        assert announcement.announcement_time == anchor - timedelta(minutes=15)
+    
+    @pytest.mark.asyncio
+    async def test_firing_arms_next_occurrence(self, tmp_path):
+        """Test that firing an occurrence schedules the following one"""
+        bot = MagicMock()
+        bot.guilds = []
+        bot.wait_until_ready = AsyncMock()
+        anchor = datetime.now() + timedelta(minutes=10)
+        
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler.check_announcements, 'start', MagicMock()):
+                scheduler = AnnouncementScheduler(bot)
+            scheduler.schedule(
+                event_type="big_santa",
+                announcement_time=anchor - timedelta(minutes=15),
+                event_time=anchor,
+                role_name="test-role",
+                message_template="Soon",
+                recurrence=IntervalRule(minutes=420, anchor=anchor)
+            )
+            
+            await scheduler.check_announcements()
+        
+        assert len(scheduler.announcements) == 1
+        assert scheduler.announcements[0].event_time == anchor + timedelta(minutes=420)
+        assert scheduler.announcements[0].announcement_time == anchor + timedelta(minutes=405)
+    
+    def test_missed_occurrences_move_on_when_loading(self, scheduler, capsys):
+        """Test that a recurring announcement missed while down is re-armed, not dropped"""
+        anchor = datetime.now() - timedelta(hours=2)
+        scheduler.schedule(
+            event_type="big_santa",
+            announcement_time=anchor - timedelta(minutes=15),
+            event_time=anchor,
+            role_name="test-role",
+            message_template="Soon",
+            recurrence=IntervalRule(minutes=60, anchor=anchor)
+        )
+        
+        with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+            mock_task.start = MagicMock()
+            reloaded = AnnouncementScheduler(scheduler.bot)
+        
+        assert len(reloaded.announcements) == 1
+        assert reloaded.announcements[0].announcement_time > datetime.now()
+        assert reloaded.announcements[0].event_time == anchor + timedelta(hours=3)
+        output = capsys.readouterr().out
+        assert "Moved 1 past recurring announcement(s)" in output
+        assert "Removed" not in output
+
+
+class TestMultiLeadReminders:
+    """Tests for events with several lead-time reminders"""
+    
+    @pytest.fixture
+    def scheduler(self, tmp_path):
+        """Create a scheduler with its background task disabled"""
+        bot = MagicMock()
+        bot.guilds = []
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                yield AnnouncementScheduler(bot)
+    
+    TEMPLATES = {60: "in an hour", 15: "in 15 minutes", 5: "in 5 minutes"}
+    
+    def test_expands_one_reminder_per_lead_time(self, scheduler):
+        """Test that each lead time gets its own reminder and template"""
+        event_time = datetime.now() + timedelta(hours=2)
+        group_id = scheduler.schedule_event("big_santa", event_time, "test-role", self.TEMPLATES)
+        
+        assert [(a.announcement_time, a.message_template) for a in scheduler.announcements] == [
+            (event_time - timedelta(minutes=60), "in an hour"),
+            (event_time - timedelta(minutes=15), "in 15 minutes"),
+            (event_time - timedelta(minutes=5), "in 5 minutes"),
+        ]
+        assert len(scheduler.announcements.in_group(group_id)) == 3
+    
+    def test_skips_lead_times_already_passed(self, scheduler):
+        """Test that reminders whose time has passed aren't scheduled"""
+        event_time = datetime.now() + timedelta(minutes=30)
+        scheduler.schedule_event("big_santa", event_time, "test-role", self.TEMPLATES)
+        
+        assert [a.message_template for a in scheduler.announcements] == ["in 15 minutes", "in 5 minutes"]
+    
+    def test_reschedule_moves_every_reminder(self, scheduler):
+        """Test that rescheduling moves all reminders of the event"""
+        group_id = scheduler.schedule_event(
+            "big_santa", datetime.now() + timedelta(hours=2), "test-role", self.TEMPLATES
+        )
+        new_time = datetime.now() + timedelta(hours=5)
+        
+        assert scheduler.reschedule_event(group_id, new_time) is True
+        
+        assert len(scheduler.announcements) == 3
+        assert {a.event_time for a in scheduler.announcements} == {new_time}
+        assert scheduler.announcements[0].announcement_time == new_time - timedelta(minutes=60)
+    
+    def test_reschedule_restores_lead_times_already_sent(self, scheduler):
+        """Test that a lead time that already fired comes back when the event moves later"""
+        group_id = scheduler.schedule_event(
+            "big_santa", datetime.now() + timedelta(minutes=30), "test-role", self.TEMPLATES
+        )
+        assert len(scheduler.announcements) == 2
+        
+        scheduler.reschedule_event(group_id, datetime.now() + timedelta(hours=2))
+        
+        assert sorted(round(a.lead_minutes) for a in scheduler.announcements) == [5, 15, 60]
+    
+    def test_cancel_group_leaves_other_events(self, scheduler):
+        """Test that cancelling one logical event keeps the others"""
+        group_id = scheduler.schedule_event(
+            "big_santa", datetime.now() + timedelta(hours=2), "test-role", self.TEMPLATES
+        )
+        other = scheduler.schedule_event(
+            "big_santa", datetime.now() + timedelta(hours=9), "test-role", self.TEMPLATES, replace=False
+        )
+        
+        assert scheduler.cancel_group(group_id) is True
+        
+        assert {a.group_id for a in scheduler.announcements} == {other}
+    
+    def test_group_changes_survive_reload(self, scheduler):
+        """Test that group records are replayed from the journal"""
+        group_id = scheduler.schedule_event(
+            "big_santa", datetime.now() + timedelta(hours=2), "test-role", self.TEMPLATES
+        )
+        new_time = datetime.now() + timedelta(hours=5)
+        scheduler.reschedule_event(group_id, new_time)
+        
+        with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+            mock_task.start = MagicMock()
+            reloaded = AnnouncementScheduler(scheduler.bot)
+        
+        assert len(reloaded.announcements) == 3
+        assert {a.event_time for a in reloaded.announcements} == {new_time}
+
+
+class TestCatchUp:
+    """Tests for announcements that became due while the bot was down"""
+    
+    @pytest.fixture
+    def mock_bot_factory(self):
+        """Create mock bots"""
+        def factory():
+            bot = MagicMock()
+            bot.guilds = []
+            bot.wait_until_ready = AsyncMock()
+            return bot
+        return factory
+    
+    def write_schedule(self, storage_file, announcements):
+        """Write announcements to the storage file"""
+        with open(storage_file, 'w') as f:
+            json.dump([a.to_dict() for a in announcements], f)
+    
+    def make_announcement(self, event_type, overdue_minutes, event_in_minutes):
+        """Create an announcement overdue by the given minutes"""
+        return ScheduledAnnouncement(
+            event_type=event_type,
+            announcement_time=datetime.now() - timedelta(minutes=overdue_minutes),
+            event_time=datetime.now() + timedelta(minutes=event_in_minutes),
+            role_name="test-role",
+            message_template="{role} starts in {minutes} minutes"
+        )
+    
+    def test_load_keeps_announcements_inside_grace_window(self, mock_bot_factory, tmp_path):
+        """Test that a reminder missed by a short restart is kept and stale ones are dropped"""
+        storage_file = tmp_path / "test_announcements.json"
+        self.write_schedule(storage_file, [
+            self.make_announcement("recent", overdue_minutes=3, event_in_minutes=12),
+            self.make_announcement("too_late", overdue_minutes=30, event_in_minutes=5),
+            self.make_announcement("started", overdue_minutes=3, event_in_minutes=-1),
+        ])
+        metrics.reset()
+        
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(storage_file)):
+            with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+                mock_task.start = MagicMock()
+                scheduler = AnnouncementScheduler(mock_bot_factory())
+        
+        assert [a.event_type for a in scheduler.announcements] == ["recent"]
+        assert metrics.counters["announcements_dropped_stale"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_overdue_announcement_is_sent_with_time_left(self, mock_bot_factory, tmp_path):
+        """Test that a caught-up announcement renders the minutes actually left"""
+        bot = mock_bot_factory()
+        guild = MagicMock()
+        guild.id = 1
+        guild.name = "Guild"
+        channel = AsyncMock()
+        channel.name = ALERTS_CHANNEL_NAME
+        guild.channels = [channel]
+        bot.guilds = [guild]
+        storage_file = tmp_path / "test_announcements.json"
+        self.write_schedule(storage_file, [self.make_announcement("recent", overdue_minutes=3, event_in_minutes=12)])
+        
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(storage_file)):
+            with patch.object(AnnouncementScheduler.check_announcements, 'start', MagicMock()):
+                scheduler = AnnouncementScheduler(bot)
+            with patch('scheduler.get_role_mention', return_value="<@&1>"):
+                await scheduler.check_announcements()
+        
+        channel.send.assert_called_once()
+        assert channel.send.call_args.args[0] == "<@&1> starts in 12 minutes"
+
+
+class TestExactWakeup:
+    """Tests for the scheduler waking exactly when an announcement is due"""
+    
+    @pytest.mark.asyncio
+    async def test_fires_when_due_instead_of_next_poll(self, tmp_path):
+        """Test that scheduling an earlier announcement wakes the sleeping loop"""
+        bot = MagicMock()
+        bot.guilds = []
+        bot.wait_until_ready = AsyncMock()
+        
+        with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+            scheduler = AnnouncementScheduler(bot)
+            try:
+                # let the first iteration run and go to sleep for the idle interval
+                await asyncio.sleep(0.05)
+                
+                scheduler.schedule(
+                    event_type="soon_event",
+                    announcement_time=datetime.now() + timedelta(seconds=0.2),
+                    event_time=datetime.now() + timedelta(minutes=15),
+                    role_name="test-role",
+                    message_template="Soon"
+                )
+                await asyncio.sleep(0.6)
+                
+                assert len(scheduler.announcements) == 0
+            finally:
+                scheduler.cleanup()
@@ -0,0 +1,96 @@
+"""Tests for setup_messages.py"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from constants import ALERTS_SETUP_CHANNEL_NAME, FSWAR_ROLE_NAME
+from setup_messages import SetupMessageIndex, EMOJI_ROLES
+from event_handlers import handle_raw_reaction_add
+
+
+def make_channel(channel_id, name, guild_id=1):
+    channel = MagicMock()
+    channel.id = channel_id
+    channel.name = name
+    channel.guild.id = guild_id
+    return channel
+
+
+def make_message(message_id, channel):
+    message = MagicMock()
+    message.id = message_id
+    message.channel = channel
+    message.guild = channel.guild
+    return message
+
+
+class TestSetupMessageIndex:
+    """Tests for SetupMessageIndex"""
+
+    def test_emoji_table_is_read_only(self):
+        assert EMOJI_ROLES["🍔"].role_name == FSWAR_ROLE_NAME
+        with pytest.raises(TypeError):
+            EMOJI_ROLES["🍔"] = None
+
+    def test_setup_channel_accepted_until_message_is_known(self):
+        setup_channel = make_channel(10, ALERTS_SETUP_CHANNEL_NAME)
+        guild = MagicMock(id=1, channels=[setup_channel, make_channel(11, "general")])
+        index = SetupMessageIndex()
+        index.rebuild([guild])
+
+        assert index.accepts(500, 10)
+        assert not index.accepts(500, 11)
+
+        index.add_message(make_message(100, setup_channel))
+
+        assert index.accepts(100, 10)
+        assert not index.accepts(500, 10)
+
+    def test_deleting_setup_channel_forgets_message(self):
+        setup_channel = make_channel(10, ALERTS_SETUP_CHANNEL_NAME)
+        index = SetupMessageIndex()
+        index.add_message(make_message(100, setup_channel))
+
+        index.on_channel_change(setup_channel, deleted=True)
+
+        assert not index.accepts(100, 10)
+        assert len(index) == 0
+
+
+class TestSetupReactionFilter:
+    """Tests for reaction handling with the index"""
+
+    @pytest.mark.asyncio
+    async def test_reaction_elsewhere_is_dropped_without_lookups(self):
+        bot = MagicMock()
+        bot.setup_messages = SetupMessageIndex()
+        payload = MagicMock(message_id=500, channel_id=11)
+        payload.emoji.name = "🍔"
+
+        await handle_raw_reaction_add(bot, payload)
+
+        bot.get_channel.assert_not_called()
+        bot.get_guild.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_reaction_on_setup_message_assigns_role(self):
+        setup_channel = make_channel(10, ALERTS_SETUP_CHANNEL_NAME)
+        bot = MagicMock()
+        bot.dispatcher = None
+        bot.setup_messages = SetupMessageIndex()
+        bot.setup_messages.add_message(make_message(100, setup_channel))
+        role = MagicMock(position=1)
+        role.name = FSWAR_ROLE_NAME
+        guild = bot.get_guild.return_value
+        guild.roles = [role]
+        guild.channels = []
+        guild.me.top_role.position = 5
+        member = MagicMock()
+        member.add_roles = AsyncMock()
+        member.send = AsyncMock()
+        payload = MagicMock(message_id=100, channel_id=10, member=member)
+        payload.emoji.name = "🍔"
+
+        await handle_raw_reaction_add(bot, payload)
+
+        member.add_roles.assert_called_once_with(role)
+        guild.get_member.assert_not_called()
@@ -0,0 +1,104 @@
+"""Tests for subscribers.py"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from subscribers import SubscriberIndex
+from fanout import fan_out, SENT, NO_SUBSCRIBERS
+from constants import ALERTS_CHANNEL_NAME, OUTLAW_ROLE_NAME, BM_ROLE_NAME
+
+
+def make_member(member_id, roles=()):
+    """Create a mock member holding the given roles"""
+    member = MagicMock()
+    member.id = member_id
+    member.roles = list(roles)
+    return member
+
+
+def make_guild(guild_id, role_members):
+    """Create a mock guild with an alerts channel and alert roles holding the given member ids"""
+    guild = MagicMock()
+    guild.id = guild_id
+    guild.name = f"Guild {guild_id}"
+    channel = AsyncMock()
+    channel.name = ALERTS_CHANNEL_NAME
+    guild.channels = [channel]
+    guild.roles = []
+    for role_name, member_ids in role_members.items():
+        role = MagicMock()
+        role.name = role_name
+        role.members = [make_member(member_id) for member_id in member_ids]
+        guild.roles.append(role)
+    return guild
+
+
+class TestSubscriberIndex:
+    """Tests for SubscriberIndex"""
+
+    def test_counts_members_from_cache(self):
+        index = SubscriberIndex()
+        index.rebuild([make_guild(1, {OUTLAW_ROLE_NAME: [10, 11], BM_ROLE_NAME: []})])
+
+        assert index.count(1, OUTLAW_ROLE_NAME) == 2
+        assert index.count(1, BM_ROLE_NAME) == 0
+        assert index.count(2, OUTLAW_ROLE_NAME) is None
+
+    def test_reaction_and_member_update_are_not_double_counted(self):
+        index = SubscriberIndex()
+        guild = make_guild(1, {OUTLAW_ROLE_NAME: []})
+        index.rebuild([guild])
+        role = guild.roles[0]
+
+        index.add(1, OUTLAW_ROLE_NAME, 10)
+        before = make_member(10)
+        after = make_member(10, [role])
+        before.guild = after.guild = guild
+        index.on_member_update(before, after)
+
+        assert index.count(1, OUTLAW_ROLE_NAME) == 1
+
+        index.on_member_update(after, before)
+
+        assert index.count(1, OUTLAW_ROLE_NAME) == 0
+
+
+class TestSubscriberAwareFanOut:
+    """Tests for fan_out with a SubscriberIndex"""
+
+    @pytest.mark.asyncio
+    async def test_skip_policy_skips_empty_guilds(self):
+        guilds = [make_guild(1, {OUTLAW_ROLE_NAME: [10]}), make_guild(2, {OUTLAW_ROLE_NAME: []})]
+        index = SubscriberIndex()
+        index.rebuild(guilds)
+        deliver = AsyncMock()
+
+        results = await fan_out(guilds, deliver, role_name=OUTLAW_ROLE_NAME, subscribers=index, empty_role_policy="skip")
+
+        assert results[1].status == SENT
+        assert results[2].status == NO_SUBSCRIBERS
+        deliver.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_demote_policy_delivers_empty_guilds_last(self):
+        guilds = [make_guild(1, {OUTLAW_ROLE_NAME: []}), make_guild(2, {OUTLAW_ROLE_NAME: [10]})]
+        index = SubscriberIndex()
+        index.rebuild(guilds)
+        order = []
+
+        async def deliver(guild, alert_channel):
+            order.append(guild.id)
+
+        results = await fan_out(guilds, deliver, role_name=OUTLAW_ROLE_NAME, subscribers=index, empty_role_policy="demote")
+
+        assert order == [2, 1]
+        assert {result.status for result in results.values()} == {SENT}
+
+    @pytest.mark.asyncio
+    async def test_off_policy_delivers_everywhere(self):
+        guilds = [make_guild(1, {OUTLAW_ROLE_NAME: []})]
+        index = SubscriberIndex()
+        index.rebuild(guilds)
+
+        results = await fan_out(guilds, AsyncMock(), role_name=OUTLAW_ROLE_NAME, subscribers=index, empty_role_policy="off")
+
+        assert results[1].status == SENT
@@ -0,0 +1,152 @@
+"""Tests for subscription_panel.py"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock, PropertyMock, patch
+
+import discord
+
+from constants import ROLE_CONFIGS, FSWAR_ROLE_NAME, HQWAR_ROLE_NAME, UNI_ROLE_NAME
+from channel_manager import create_setup_message
+from routing import GuildRoutingTable
+from subscription_panel import SubscriptionView, set_subscriptions, SUBSCRIPTION_SELECT_ID
+
+
+@pytest.fixture
+def guild():
+    """Create a mock guild with every alert role, which the bot can manage"""
+    guild = MagicMock()
+    guild.id = 7
+    guild.name = "Test Guild"
+    guild.channels = []
+    guild.roles = []
+    # members aren't cached, so the one passed in is used as is
+    guild.get_member.return_value = None
+    for position, (role_name, _, _, _) in enumerate(ROLE_CONFIGS, start=1):
+        role = MagicMock(id=position, position=position)
+        role.name = role_name
+        role.is_default.return_value = False
+        guild.roles.append(role)
+    guild.me.top_role.position = 100
+    guild.me.guild_permissions.manage_roles = True
+    return guild
+
+
+@pytest.fixture
+def bot(guild):
+    bot = MagicMock()
+    bot.routes = GuildRoutingTable()
+    bot.routes.rebuild([guild])
+    bot.subscribers = MagicMock()
+    return bot
+
+
+def role(guild, role_name):
+    return next(r for r in guild.roles if r.name == role_name)
+
+
+class TestSetSubscriptions:
+    """Tests for set_subscriptions"""
+
+    @pytest.mark.asyncio
+    async def test_selection_becomes_role_set_in_one_edit(self, bot, guild):
+        member = MagicMock(id=42, roles=[role(guild, FSWAR_ROLE_NAME), role(guild, HQWAR_ROLE_NAME)])
+        member.edit = AsyncMock()
+
+        reply = await set_subscriptions(bot, guild, member, [HQWAR_ROLE_NAME, UNI_ROLE_NAME])
+
+        member.edit.assert_called_once()
+        assert member.edit.call_args.kwargs["roles"] == [role(guild, HQWAR_ROLE_NAME), role(guild, UNI_ROLE_NAME)]
+        assert reply == "You have subscribed to Uni / Uni Dungeon and unsubscribed from Food Shop War alerts in Test Guild!"
+
+    @pytest.mark.asyncio
+    async def test_unchanged_selection_makes_no_call(self, bot, guild):
+        member = MagicMock(id=42, roles=[role(guild, UNI_ROLE_NAME)])
+        member.edit = AsyncMock()
+
+        reply = await set_subscriptions(bot, guild, member, [UNI_ROLE_NAME])
+
+        member.edit.assert_not_called()
+        assert reply == "Your subscriptions are already up to date."
+
+    @pytest.mark.asyncio
+    async def test_role_above_bot_is_refused(self, bot, guild):
+        guild.me.top_role.position = 2
+        member = MagicMock(id=42, roles=[])
+        member.edit = AsyncMock()
+
+        reply = await set_subscriptions(bot, guild, member, [UNI_ROLE_NAME])
+
+        member.edit.assert_not_called()
+        assert "higher than my role" in reply
+
+    @pytest.mark.asyncio
+    async def test_callback_defers_before_editing_roles(self, guild):
+        select = SubscriptionView(MagicMock()).children[0]
+        interaction = MagicMock(guild=guild)
+        interaction.response.defer = AsyncMock()
+        interaction.followup.send = AsyncMock()
+
+        async def edit_roles(*args):
+            interaction.response.defer.assert_called_once_with(ephemeral=True, thinking=True)
+            return "done"
+
+        with patch('subscription_panel.set_subscriptions', side_effect=edit_roles), \
+                patch.object(type(select), 'values', new_callable=PropertyMock, return_value=[UNI_ROLE_NAME]):
+            await select.callback(interaction)
+
+        interaction.followup.send.assert_called_once_with("done", ephemeral=True)
+
+
+class TestSetupMenuMessage:
+    """Tests for posting the menu with create_setup_message"""
+
+    @pytest.mark.asyncio
+    async def test_view_is_persistent_and_offers_every_role(self):
+        view = SubscriptionView(MagicMock())
+        select = view.children[0]
+
+        assert view.is_persistent()
+        assert select.custom_id == SUBSCRIPTION_SELECT_ID
+        assert [option.value for option in select.options] == [name for name, _, _, _ in ROLE_CONFIGS]
+
+    @pytest.mark.asyncio
+    async def test_converts_reaction_message_to_menu(self):
+        view = SubscriptionView(MagicMock())
+        channel = MagicMock()
+        old = MagicMock()
+        old.author = channel.guild.me
+        old.content = "React to subscribe/unsubscribe to different rm2 alerts:\n..."
+        old.components = []
+        old.reactions = []
+        converted = MagicMock(reactions=[MagicMock()])
+        converted.clear_reactions = AsyncMock()
+        old.edit = AsyncMock(return_value=converted)
+
+        async def history(limit):
+            yield old
+        channel.history = history
+
+        message = await create_setup_message(channel, view)
+
+        assert message is converted
+        assert old.edit.call_args.kwargs["view"] is view
+        converted.clear_reactions.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_conversion_survives_missing_manage_messages(self):
+        view = SubscriptionView(MagicMock())
+        channel = MagicMock()
+        old = MagicMock()
+        old.author = channel.guild.me
+        old.content = "React to subscribe/unsubscribe to different rm2 alerts:\n..."
+        old.components = []
+        converted = MagicMock(reactions=[MagicMock()])
+        converted.clear_reactions = AsyncMock(
+            side_effect=discord.Forbidden(MagicMock(status=403), "Missing Permissions")
+        )
+        old.edit = AsyncMock(return_value=converted)
+
+        async def history(limit):
+            yield old
+        channel.history = history
+
+        assert await create_setup_message(channel, view) is converted
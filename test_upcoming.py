@@ -0,0 +1,93 @@
+"""Tests for upcoming.py"""
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from scheduler import AnnouncementScheduler
+from upcoming import handle_upcoming_command
+from recurrence import IntervalRule
+from metrics import metrics
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    """Create a scheduler with its background task disabled"""
+    bot = MagicMock()
+    bot.guilds = []
+    with patch('scheduler.AnnouncementScheduler.STORAGE_FILE', str(tmp_path / "test_announcements.json")):
+        with patch.object(AnnouncementScheduler, 'check_announcements') as mock_task:
+            mock_task.start = MagicMock()
+            yield AnnouncementScheduler(bot)
+
+
+class TestUpcomingEvents:
+    """Tests for UpcomingEvents"""
+
+    def test_lists_each_event_once_in_start_order(self, scheduler):
+        later = datetime.now() + timedelta(hours=5)
+        sooner = datetime.now() + timedelta(hours=2)
+        scheduler.schedule_event("big_santa", later, "test-role", {60: "hour", 15: "soon"})
+        scheduler.schedule_event(
+            "monster_invasion", sooner, "test-role", {15: "soon"}, replace=False,
+            recurrence=IntervalRule(minutes=60, anchor=sooner)
+        )
+
+        assert [(e[0], e[1], e[3]) for e in scheduler.upcoming.events()] == [
+            (sooner, "monster_invasion", True),
+            (later, "big_santa", False),
+        ]
+        reply = scheduler.upcoming.render()
+        assert reply.index("Monster Invasion") < reply.index("Big Santa")
+        assert f"<t:{int(later.timestamp())}:R>" in reply
+
+    def test_guild_events_only_shown_in_that_guild(self, scheduler):
+        event_time = datetime.now() + timedelta(hours=2)
+        scheduler.schedule("big_santa", event_time - timedelta(minutes=15), event_time, "test-role", "soon")
+        scheduler.schedule(
+            "uni_events", event_time - timedelta(minutes=15), event_time, "test-role", "soon", guild_id=7
+        )
+
+        assert [e[1] for e in scheduler.upcoming.events(7)] == ["big_santa", "uni_events"]
+        assert [e[1] for e in scheduler.upcoming.events(8)] == ["big_santa"]
+        assert [e[1] for e in scheduler.upcoming.events()] == ["big_santa"]
+
+    def test_reply_is_cached_until_schedule_changes(self, scheduler):
+        metrics.reset()
+        event_time = datetime.now() + timedelta(hours=2)
+        scheduler.schedule_event("big_santa", event_time, "test-role", {15: "soon"})
+
+        first = scheduler.upcoming.render(1)
+        assert scheduler.upcoming.render(1) is first
+        assert metrics.counters["upcoming_renders"] == 1
+
+        scheduler.cancel("big_santa")
+
+        assert scheduler.upcoming.render(1) == "No events are scheduled right now."
+        assert metrics.counters["upcoming_renders"] == 2
+
+
+class TestUpcomingCommand:
+    """Tests for handle_upcoming_command"""
+
+    def make_message(self, content, guild_id=None):
+        message = MagicMock()
+        message.content = content
+        message.guild = MagicMock(id=guild_id) if guild_id is not None else None
+        message.channel.send = AsyncMock()
+        return message
+
+    @pytest.mark.asyncio
+    async def test_replies_with_rendered_schedule(self, scheduler):
+        bot = MagicMock()
+        bot.scheduler = scheduler
+        bot.dispatcher = None
+        scheduler.schedule_event("big_santa", datetime.now() + timedelta(hours=2), "test-role", {15: "soon"})
+        message = self.make_message("!upcoming", guild_id=5)
+
+        assert await handle_upcoming_command(message, bot) is True
+
+        message.channel.send.assert_called_once_with(scheduler.upcoming.render(5))
+
+    @pytest.mark.asyncio
+    async def test_ignores_other_messages(self):
+        assert await handle_upcoming_command(self.make_message("!upcomingx"), MagicMock()) is False
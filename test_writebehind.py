@@ -0,0 +1,45 @@
+"""Tests for writebehind.py"""
+import threading
+import pytest
+
+from writebehind import WriteBehind
+
+
+class TestWriteBehind:
+    """Tests for WriteBehind"""
+
+    def test_runs_writes_in_order(self):
+        writer = WriteBehind()
+        done = []
+        for i in range(5):
+            writer.submit(i, lambda i=i: done.append(i))
+
+        writer.close()
+
+        assert done == [0, 1, 2, 3, 4]
+
+    def test_queued_write_with_same_key_is_replaced(self):
+        writer = WriteBehind()
+        release = threading.Event()
+        done = []
+        writer.submit("blocker", release.wait)
+        writer.submit("state", lambda: done.append("old"))
+        writer.submit("other", lambda: done.append("other"))
+        writer.submit("state", lambda: done.append("new"))
+
+        release.set()
+        writer.close()
+
+        assert done == ["new", "other"]
+
+    @pytest.mark.asyncio
+    async def test_flush_waits_without_blocking_and_survives_errors(self):
+        writer = WriteBehind()
+        done = []
+        writer.submit("bad", lambda: 1 / 0)
+        writer.submit("good", lambda: done.append(True))
+
+        await writer.flush()
+
+        assert done == [True]
+        writer.close()
@@ -0,0 +1,125 @@
+"""The !upcoming command, answered from a cached view of the scheduler's queue."""
+from typing import Optional
+
+from constants import UPCOMING_MAX_EVENTS
+from announcement_templates import EVENT_NAMES
+from dispatcher import dispatch
+from metrics import metrics
+
+
+def event_name(event_type: str) -> str:
+    """Display name for an event type."""
+    return EVENT_NAMES.get(event_type, event_type.replace('_', ' ').title())
+
+
+class UpcomingEvents:
+    """
+    Upcoming events, sorted by start time, with the rendered reply cached per guild.
+
+    The reminders of one event (several lead times, channel and DM) collapse
+    into a single entry. The sorted list and the rendered replies are only
+    rebuilt after the scheduler's queue changes, so answering !upcoming
+    again costs a dict lookup. Replies use Discord timestamps, which the
+    client shows relative to now, so they don't go stale between changes.
+    """
+
+    def __init__(self, scheduler, limit: int = UPCOMING_MAX_EVENTS):
+        """
+        Initialize the view.
+
+        Args:
+            scheduler: The AnnouncementScheduler whose queue is listed
+            limit: Most events to list in one reply
+        """
+        self.scheduler = scheduler
+        self.limit = limit
+        self._queue = None
+        self._version = None
+        self._events = []
+        self._rendered: dict[Optional[int], str] = {}
+
+    def _refresh(self):
+        """Rebuild the sorted events if the queue changed since the last build."""
+        queue = self.scheduler.announcements
+        if queue is self._queue and queue.version == self._version:
+            return
+        events = {}
+        for announcement in queue.values():
+            key = (announcement.event_type, announcement.event_time, announcement.guild_id)
+            events[key] = events.get(key, False) or announcement.recurrence is not None
+        self._events = sorted(
+            (event_time, event_type, guild_id, recurring)
+            for (event_type, event_time, guild_id), recurring in events.items()
+        )
+        self._queue = queue
+        self._version = queue.version
+        self._rendered = {}
+
+    def events(self, guild_id: Optional[int] = None) -> list[tuple]:
+        """
+        Upcoming events visible in a guild, earliest first.
+
+        Args:
+            guild_id: The guild asking, or None for a DM (only events for every guild)
+
+        Returns:
+            list: (event_time, event_type, guild_id, recurring) tuples
+        """
+        self._refresh()
+        return [event for event in self._events if event[2] is None or event[2] == guild_id]
+
+    def render(self, guild_id: Optional[int] = None) -> str:
+        """
+        The !upcoming reply for a guild, or for a DM if guild_id is None.
+
+        Args:
+            guild_id: The guild asking, or None for a DM
+
+        Returns:
+            str: The message to send
+        """
+        self._refresh()
+        if guild_id not in self._rendered:
+            metrics.increment("upcoming_renders")
+            self._rendered[guild_id] = self._format(self.events(guild_id))
+        return self._rendered[guild_id]
+
+    def _format(self, events: list[tuple]) -> str:
+        if not events:
+            return "No events are scheduled right now."
+        lines = ["**Upcoming events**"]
+        for event_time, event_type, _, recurring in events[:self.limit]:
+            timestamp = int(event_time.timestamp())
+            line = f"**{event_name(event_type)}** <t:{timestamp}:F> (<t:{timestamp}:R>)"
+            if recurring:
+                line += ", repeating"
+            lines.append(line)
+        if len(events) > self.limit:
+            lines.append(f"...and {len(events) - self.limit} more")
+        return "\n".join(lines)
+
+
+async def handle_upcoming_command(message, bot) -> bool:
+    """
+    Handle !upcoming, in a guild channel or by DM.
+
+    Args:
+        message: The Discord message object
+        bot: The Discord bot instance
+
+    Returns:
+        bool: True if the message was the !upcoming command
+    """
+    words = message.content.lower().split()
+    if not words or words[0] != '!upcoming':
+        return False
+
+    scheduler = getattr(bot, 'scheduler', None)
+    upcoming = getattr(scheduler, 'upcoming', None)
+    if not isinstance(upcoming, UpcomingEvents):
+        await dispatch(bot, message.channel, "The schedule isn't available right now. Please try again later.")
+        return True
+
+    guild = getattr(message, 'guild', None)
+    await dispatch(bot, message.channel, upcoming.render(guild.id if guild is not None else None))
+    return True
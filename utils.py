@@ -3,8 +3,10 @@ import discord
 from datetime import datetime, timedelta
 
 
-def get_role_mention(guild, role_name):
+def get_role_mention(guild, role_name, routes=None):
     """Helper function to get role mention or fallback to @role_name"""
+    if routes is not None:
+        return routes.role_mention(guild, role_name)
     role = discord.utils.get(guild.roles, name=role_name)
     return role.mention if role else f"@{role_name}"
 
@@ -0,0 +1,97 @@
+"""Background thread that does the bot's state writes off the event loop."""
+import asyncio
+import threading
+
+
+class WriteBehind:
+    """
+    Runs blocking writes on one background thread, coalescing repeats.
+
+    Writes are submitted under a key; a write submitted while another with
+    the same key is still waiting replaces it (keeping its place in line),
+    so a burst of changes to one file costs one write. Writes run one at a
+    time in submission order, so a file never sees two writers at once.
+    """
+
+    def __init__(self, name: str = "write-behind"):
+        """
+        Initialize the writer; its thread starts with the first write.
+
+        Args:
+            name: Name of the background thread
+        """
+        self.name = name
+        self._pending: dict = {}
+        self._busy = False
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+
+    def submit(self, key, write):
+        """
+        Queue a write.
+
+        Args:
+            key: Identifies what is written (e.g. a file path); a queued write with the same key is replaced
+            write: Function taking no arguments that does the write
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("write-behind is closed")
+            self._pending[key] = write
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def backlog(self) -> int:
+        """Number of writes waiting to run."""
+        with self._cond:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                key = next(iter(self._pending))
+                write = self._pending.pop(key)
+                self._busy = True
+            try:
+                write()
+            except Exception as e:
+                print(f"Error in background write for {key}: {e}")
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+    def wait(self, timeout: float = None) -> bool:
+        """
+        Block until every write submitted so far has run.
+
+        Args:
+            timeout: Seconds to wait at most, or None to wait as long as it takes
+
+        Returns:
+            bool: False if the timeout passed first
+        """
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    async def flush(self):
+        """Wait, without blocking the event loop, until every write submitted so far has run."""
+        with self._cond:
+            idle = not self._pending and not self._busy
+        if not idle:
+            await asyncio.to_thread(self.wait)
+
+    def close(self, timeout: float = None):
+        """Finish the queued writes and stop the thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)